@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.core import checks
+
+
+class AirportApiConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "airport_api"
+
+    def ready(self):
+        from .throttling import check_throttle_backend
+
+        checks.register(
+            check_throttle_backend, checks.Tags.caches, deploy=True
+        )
@@ -0,0 +1,146 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .renderers import FastJSONRenderer
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(
+        FastJSONRenderer().render(data),
+        content_type="application/json",
+        status=status_code,
+    )
+
+
+def get_throttles():
+    return [
+        throttle_class()
+        for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES
+    ]
+
+
+def _authenticate_and_throttle(request):
+    """
+    Set request.user with the project's authentication classes and apply
+    its throttles. The throttles here read no view, as the default
+    anonymous and user throttles do.
+    """
+    request.user = AnonymousUser()
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        result = authentication_class().authenticate(request)
+        if result is not None:
+            request.user, request.auth = result
+            break
+
+    waits = [
+        throttle.wait()
+        for throttle in get_throttles()
+        if not throttle.allow_request(request, None)
+    ]
+    if waits:
+        raise exceptions.Throttled(
+            max((wait for wait in waits if wait is not None), default=None)
+        )
+
+
+def async_api_view(view):
+    """
+    Serve a read-only async view with the authentication, throttling and
+    error responses of the DRF views. DRF views cannot be async, so the
+    async views are plain Django views that answer JSON only.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            if request.method not in ("GET", "HEAD"):
+                raise exceptions.MethodNotAllowed(request.method)
+            await sync_to_async(_authenticate_and_throttle)(request)
+            return await view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            detail = exc.detail
+            if not isinstance(detail, (list, dict)):
+                detail = {"detail": detail}
+            response = json_response(detail, exc.status_code)
+            if isinstance(exc, exceptions.MethodNotAllowed):
+                response["Allow"] = "GET, HEAD"
+            if isinstance(
+                exc,
+                (exceptions.NotAuthenticated, exceptions.AuthenticationFailed),
+            ):
+                authenticator = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]
+                response["WWW-Authenticate"] = (
+                    authenticator().authenticate_header(request)
+                )
+            if getattr(exc, "wait", None):
+                response["Retry-After"] = str(int(exc.wait))
+            return response
+
+    return wrapper
+
+
+async def aget_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise exceptions.NotFound(
+            f"No {queryset.model._meta.object_name} matches the given query."
+        )
+
+
+class AsyncPageNumberPagination:
+    """
+    The page number pagination of the DRF views, with the same ?page
+    parameter and response, reading the page with the async ORM.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_query_param = "page"
+
+    def __init__(self, request):
+        self.request = request
+        try:
+            self.page_number = int(
+                request.GET.get(self.page_query_param, 1)
+            )
+        except ValueError:
+            self.page_number = 0
+        self.count = 0
+
+    def page_slice(self, count):
+        """Return the slice of the page among `count` objects."""
+        self.count = count
+        start = (self.page_number - 1) * self.page_size
+        if self.page_number < 1 or (self.page_number > 1 and start >= count):
+            raise exceptions.NotFound("Invalid page.")
+        return slice(start, start + self.page_size)
+
+    async def paginate_queryset(self, queryset):
+        page = queryset[self.page_slice(await queryset.acount())]
+        return [obj async for obj in page.aiterator(chunk_size=self.page_size)]
+
+    def get_paginated_data(self, data):
+        url = self.request.build_absolute_uri()
+        next_link = previous_link = None
+        if self.page_number * self.page_size < self.count:
+            next_link = replace_query_param(
+                url, self.page_query_param, self.page_number + 1
+            )
+        if self.page_number == 2:
+            previous_link = remove_query_param(url, self.page_query_param)
+        elif self.page_number > 2:
+            previous_link = replace_query_param(
+                url, self.page_query_param, self.page_number - 1
+            )
+        return {
+            "count": self.count,
+            "next": next_link,
+            "previous": previous_link,
+            "results": data,
+        }
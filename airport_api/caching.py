@@ -0,0 +1,108 @@
+import hashlib
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+STATE_KEY = "reference:state"
+
+
+def get_reference_cache():
+    return caches[settings.REFERENCE_CACHE_ALIAS]
+
+
+def get_reference_state():
+    """
+    Return the current (version, last_modified) pair of the reference data.
+
+    Every response is cached under the version, so bumping it drops all of
+    them at once, which is what the related strings of airports and routes
+    need anyway.
+    """
+    cache = get_reference_cache()
+    state = cache.get(STATE_KEY)
+    if state is None:
+        state = (uuid.uuid4().hex, int(time.time()))
+        cache.add(STATE_KEY, state, timeout=None)
+        state = cache.get(STATE_KEY, state)
+    return state
+
+
+def invalidate_reference_cache(*args, **kwargs):
+    """
+    Drop the cached reference responses. Works as a signal receiver.
+
+    The version is bumped again once the transaction commits, so that no
+    response built from the rows before the commit stays cached under it.
+
+    With the default local-memory backend this only reaches the current
+    process, and the other workers keep serving their entries for up to
+    REFERENCE_CACHE_TIMEOUT seconds. Point REFERENCE_CACHE_BACKEND to a
+    shared backend to invalidate all of them.
+    """
+    def bump():
+        get_reference_cache().set(
+            STATE_KEY, (uuid.uuid4().hex, int(time.time())), timeout=None
+        )
+
+    bump()
+    transaction.on_commit(bump)
+
+
+class ReferenceCacheMixin:
+    """
+    Serve list and retrieve of rarely changing reference data from the cache.
+
+    A hit runs no database query and no serializer, and every response
+    carries ETag and Last-Modified headers for conditional requests.
+    Only the JSON format is cached, the browsable API always renders live.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format != "json":
+            return handler(request, *args, **kwargs)
+
+        cache = get_reference_cache()
+        version, last_modified = get_reference_state()
+        url_hash = hashlib.md5(
+            request.build_absolute_uri().encode(), usedforsecurity=False
+        ).hexdigest()
+        key = f"reference:{version}:{type(self).__name__}:{url_hash}"
+
+        entry = cache.get(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            content = JSONRenderer().render(response.data)
+            etag = quote_etag(
+                hashlib.md5(content, usedforsecurity=False).hexdigest()
+            )
+            entry = (json.loads(content), etag)
+            cache.set(key, entry)
+
+        data, etag = entry
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = Response(data)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
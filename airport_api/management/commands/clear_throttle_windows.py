@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airport_api.models import ThrottleWindow
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the expired windows counted by DatabaseThrottleBackend. Run "
+        "it periodically, e.g. from cron, as the requests never do."
+    )
+
+    def handle(self, *args, **options):
+        deleted, _ = ThrottleWindow.objects.filter(
+            expires_at__lt=timezone.now()
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} expired throttle windows.")
+        )
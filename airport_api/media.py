@@ -0,0 +1,169 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def media_path(path):
+    """Return the file under MEDIA_ROOT at `path`, or raise Http404."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Invalid media path.")
+    if not os.path.isfile(full_path):
+        raise Http404("No such media file.")
+    return full_path
+
+
+def parse_range(header, size):
+    """
+    Return the (start, end) bytes of a single-range Range header, None
+    when the whole file should be served, e.g. for multiple ranges, which
+    are rarely used for media and may be ignored. Raises ValueError when
+    the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.replace(" ", ""))
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        # The last `end` bytes
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end or size - 1), size - 1)
+    if start > end or start >= size:
+        raise ValueError("Unsatisfiable range.")
+    return start, end
+
+
+def read_range(full_path, start, length):
+    with open(full_path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _range_requested(request, etag, last_modified):
+    """Whether a Range applies, given the If-Range validator if any."""
+    if "HTTP_RANGE" not in request.META:
+        return False
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range is None:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _file_response(request, full_path, stat):
+    """
+    Serve the file from this process, with ETag and Last-Modified for
+    conditional requests and single byte ranges. Whole files go through
+    FileResponse, which servers such as gunicorn send with sendfile().
+    """
+    etag = quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is not None:
+        return response
+
+    content_type = mimetypes.guess_type(full_path)[0]
+    content_type = content_type or "application/octet-stream"
+    size = stat.st_size
+    byte_range = None
+    if _range_requested(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.META["HTTP_RANGE"], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if request.method == "HEAD":
+        response = HttpResponse(content_type=content_type)
+    elif byte_range is not None:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(full_path, start, end - start + 1),
+            content_type=content_type,
+        )
+    else:
+        response = FileResponse(
+            open(full_path, "rb"), content_type=content_type
+        )
+
+    if byte_range is not None:
+        start, end = byte_range
+        response.status_code = 206
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        size = end - start + 1
+    response["Content-Length"] = str(size)
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve an uploaded media file as MEDIA_SERVING says:
+
+    * "django" streams it from this process with range and conditional
+      request support
+    * "x-accel-redirect" hands it to nginx through an internal location
+      at MEDIA_ACCEL_REDIRECT_PREFIX
+    * "x-sendfile" hands it to Apache or lighttpd by its path
+
+    With the last two the worker only checks that the file exists. Every
+    response may be cached for MEDIA_CACHE_MAX_AGE, as uploads are named
+    after their content and a URL never serves another file.
+    """
+    full_path = media_path(path)
+    mode = settings.MEDIA_SERVING
+    if mode == "x-accel-redirect":
+        response = HttpResponse()
+        # Let nginx set the type of the file
+        del response["Content-Type"]
+        response["X-Accel-Redirect"] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+        )
+    elif mode == "x-sendfile":
+        response = HttpResponse(
+            content_type=mimetypes.guess_type(full_path)[0]
+        )
+        response["X-Sendfile"] = full_path
+    else:
+        response = _file_response(request, full_path, os.stat(full_path))
+
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=settings.MEDIA_CACHE_MAX_AGE,
+        immutable=True,
+    )
+    return response
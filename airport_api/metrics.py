@@ -0,0 +1,340 @@
+import functools
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.views import APIView
+
+from .renderers import PrometheusTextRenderer
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+MICROSECONDS = 1_000_000
+
+
+class Histogram:
+    """
+    A log-linear histogram of non-negative integers in the manner of
+    HdrHistogram.
+
+    Values below 2 ** sub_bucket_bits are counted exactly. Above that, every
+    power of two is split into 2 ** (sub_bucket_bits - 1) equal buckets, so
+    a reported quantile is at most 1 / 2 ** (sub_bucket_bits - 1) above the
+    true value, 3% with the default 6 bits. Buckets are created on first use
+    and there are at most a few hundred of them.
+    """
+
+    def __init__(self, sub_bucket_bits=6):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.buckets = defaultdict(int)
+        self.count = 0
+        self.total = 0
+
+    def _bucket(self, value):
+        shift = max(value.bit_length() - self.sub_bucket_bits, 0)
+        return shift, value >> shift
+
+    def record(self, value):
+        value = max(int(value), 0)
+        self.buckets[self._bucket(value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        """
+        Return the highest value equivalent to the q-quantile, 0 when
+        nothing was recorded.
+        """
+        if not self.count:
+            return 0
+        rank = max(q * self.count, 1)
+        seen = 0
+        for shift, bucket in sorted(self.buckets):
+            seen += self.buckets[shift, bucket]
+            if seen >= rank:
+                break
+        return ((bucket + 1) << shift) - 1
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.duration = Histogram()
+        self.sql_duration = Histogram()
+        self.serialize_duration = Histogram()
+        self.render_duration = Histogram()
+        self.queries = Histogram()
+
+
+class MetricsRegistry:
+    """
+    Histograms of the sampled requests of this process, by view and method.
+
+    Each worker process keeps its own, so a scrape sees the worker that
+    answers it.
+    """
+
+    # (name, attribute, description, scale)
+    summaries = (
+        (
+            "request_duration_seconds",
+            "duration",
+            "Time spent in the middleware stack and the view.",
+            MICROSECONDS,
+        ),
+        (
+            "sql_duration_seconds",
+            "sql_duration",
+            "Time spent executing SQL.",
+            MICROSECONDS,
+        ),
+        (
+            "serialize_duration_seconds",
+            "serialize_duration",
+            "Time spent in serializer.data, without its SQL queries.",
+            MICROSECONDS,
+        ),
+        (
+            "render_duration_seconds",
+            "render_duration",
+            "Time spent rendering the response data to bytes.",
+            MICROSECONDS,
+        ),
+        ("db_queries", "queries", "SQL queries executed.", 1),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._endpoints = defaultdict(EndpointMetrics)
+
+    def record(self, view, method, sample):
+        with self._lock:
+            metrics = self._endpoints[view, method]
+            metrics.duration.record(sample.duration * MICROSECONDS)
+            metrics.sql_duration.record(sample.sql_duration * MICROSECONDS)
+            metrics.serialize_duration.record(
+                sample.serialize_duration * MICROSECONDS
+            )
+            metrics.render_duration.record(
+                sample.render_duration * MICROSECONDS
+            )
+            metrics.queries.record(sample.queries)
+
+    def to_prometheus(self, sample_rate):
+        """Render the histograms as Prometheus summaries."""
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = [
+                "# HELP airport_api_metrics_sample_rate Share of the "
+                "requests that are measured.",
+                "# TYPE airport_api_metrics_sample_rate gauge",
+                f"airport_api_metrics_sample_rate {sample_rate}",
+            ]
+            for name, attribute, description, scale in self.summaries:
+                name = f"airport_api_{name}"
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} summary")
+                for (view, method), metrics in endpoints:
+                    histogram = getattr(metrics, attribute)
+                    labels = (
+                        f'view="{_escape(view)}",method="{_escape(method)}"'
+                    )
+                    for q in QUANTILES:
+                        lines.append(
+                            f'{name}{{{labels},quantile="{q}"}} '
+                            f"{histogram.quantile(q) / scale}"
+                        )
+                    lines.append(
+                        f"{name}_sum{{{labels}}} {histogram.total / scale}"
+                    )
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+
+
+registry = MetricsRegistry()
+
+
+current_sample = ContextVar("current_sample", default=None)
+
+
+class RequestSample:
+    def __init__(self):
+        self.started = 0
+        self.duration = 0
+        self.sql_duration = 0
+        self.serialize_duration = 0
+        self.render_duration = 0
+        self.queries = 0
+        self.serializing = False
+
+    def execute(self, execute, sql, params, many, context):
+        """Time every query of the request. Works as an execute wrapper."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_duration += time.perf_counter() - started
+            self.queries += 1
+
+
+def _timed_data(fget):
+    """
+    Wrap the getter of BaseSerializer.data to time the serialization of
+    the sampled requests. Serializers read inside another one's data,
+    e.g. in a method field, count as part of it, and the SQL queries run
+    meanwhile are left to the SQL time.
+    """
+
+    @functools.wraps(fget)
+    def data(serializer):
+        sample = current_sample.get()
+        if sample is None or sample.serializing:
+            return fget(serializer)
+
+        sample.serializing = True
+        sql_duration = sample.sql_duration
+        started = time.perf_counter()
+        try:
+            return fget(serializer)
+        finally:
+            sample.serialize_duration += (
+                time.perf_counter() - started
+                - (sample.sql_duration - sql_duration)
+            )
+            sample.serializing = False
+
+    data.timed = True
+    return data
+
+
+def time_serializers():
+    """Time serializer.data of the sampled requests from now on."""
+    if not getattr(BaseSerializer.data.fget, "timed", False):
+        BaseSerializer.data = property(_timed_data(BaseSerializer.data.fget))
+
+
+class MetricsMiddleware:
+    """
+    Measure a METRICS_SAMPLE_RATE share of the requests: their latency, SQL
+    query count and time, the time spent in serializer.data and the time
+    spent rendering the response.
+
+    Requests that are not sampled cost one random number. Place the
+    middleware first so that the latency covers the whole stack. It runs
+    in the mode of the handler, so that under ASGI the async views are not
+    adapted to a thread for it. There, a sampled request takes two trips
+    to the thread its queries run in, to time them.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        time_serializers()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+
+        sample = RequestSample()
+        token = self._start(request, sample)
+        try:
+            with self._wrap_queries(sample):
+                response = self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        self._record(request, sample)
+        return response
+
+    async def __acall__(self, request):
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            return await self.get_response(request)
+
+        sample = RequestSample()
+        token = self._start(request, sample)
+        try:
+            # Connections belong to a thread, and the async ORM runs the
+            # queries of the request in the thread of its sync code
+            stack = await sync_to_async(self._wrap_queries)(sample)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            current_sample.reset(token)
+        self._record(request, sample)
+        return response
+
+    @staticmethod
+    def _start(request, sample):
+        request.metrics_sample = sample
+        sample.started = time.perf_counter()
+        return current_sample.set(sample)
+
+    @staticmethod
+    def _wrap_queries(sample):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(sample.execute))
+        return stack
+
+    @staticmethod
+    def _record(request, sample):
+        sample.duration = time.perf_counter() - sample.started
+        match = request.resolver_match
+        registry.record(
+            match.view_name if match else "unmatched", request.method, sample
+        )
+
+    def process_template_response(self, request, response):
+        sample = getattr(request, "metrics_sample", None)
+        if sample is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                sample.render_duration += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+class MetricsView(APIView):
+    """Serve the request metrics of this process in Prometheus format."""
+
+    permission_classes = (IsAdminUser,)
+    renderer_classes = (PrometheusTextRenderer,)
+
+    @extend_schema(responses={(200, "text/plain"): OpenApiTypes.STR})
+    def get(self, request):
+        return Response(registry.to_prometheus(settings.METRICS_SAMPLE_RATE))
@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class ThrottleWindow(models.Model):
+    """
+    Requests counted by a throttle in one time window, shared by every
+    worker when throttles are backed by the database.
+    """
+
+    key = models.CharField(max_length=255)
+    window = models.BigIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key", "window"], name="unique_throttle_window"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.window}): {self.count}"
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "drf_spectacular",
+    "airport_api",
     "booking",
     "fleet",
     "flight_ops",
@@ -52,6 +53,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "airport_api.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -93,9 +95,66 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST"),
         "PORT": os.getenv("POSTGRES_PORT"),
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 0)),
+        "CONN_HEALTH_CHECKS": (
+            os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True"
+        ),
     }
 }
 
+# A connection pool per process, which needs psycopg 3 with psycopg-pool
+# and replaces persistent connections
+if os.getenv("DB_POOL", "False") == "True":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            "timeout": int(os.getenv("DB_POOL_TIMEOUT", 10)),
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "reference": {
+        "BACKEND": os.getenv(
+            "REFERENCE_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("REFERENCE_CACHE_LOCATION", "reference"),
+        "TIMEOUT": int(os.getenv("REFERENCE_CACHE_TIMEOUT", 300)),
+    },
+    "throttle": {
+        "BACKEND": os.getenv(
+            "THROTTLE_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("THROTTLE_CACHE_LOCATION", "throttle"),
+    },
+}
+
+REFERENCE_CACHE_ALIAS = "reference"
+
+SEAT_MAP_CACHE_ALIAS = "default"
+SEAT_MAP_CACHE_TIMEOUT = int(os.getenv("SEAT_MAP_CACHE_TIMEOUT", 30))
+
+TIMETABLE_CACHE_ALIAS = "default"
+# Seconds before the timetable of a worker reloads what it loaded, so that
+# it follows changes when the version cache above is not shared
+TIMETABLE_MAX_AGE = int(os.getenv("TIMETABLE_MAX_AGE", 60))
+FLIGHT_LIST_FROM_TIMETABLE = (
+    os.getenv("FLIGHT_LIST_FROM_TIMETABLE", "False") == "True"
+)
+FLIGHT_LIST_TIMETABLE_MAX_DAYS = int(
+    os.getenv("FLIGHT_LIST_TIMETABLE_MAX_DAYS", 7)
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -141,6 +200,29 @@ STATIC_URL = "static/"
 
 MEDIA_ROOT = "/media"
 MEDIA_URL = "/media/"
+# Uploaded media is named after its content, so it never changes
+MEDIA_CACHE_MAX_AGE = int(os.getenv("MEDIA_CACHE_MAX_AGE", 365 * 24 * 3600))
+# "django" streams media from the workers, "x-accel-redirect" (nginx) and
+# "x-sendfile" (Apache, lighttpd) leave the transfer to the web server
+MEDIA_SERVING = os.getenv("MEDIA_SERVING", "django")
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv(
+    "MEDIA_ACCEL_REDIRECT_PREFIX", "/internal-media/"
+)
+
+# Stream uploads to a temporary file in chunks instead of keeping small
+# ones in memory
+FILE_UPLOAD_HANDLERS = [
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+AIRPORT_IMAGE_MAX_SIZE = (
+    int(os.getenv("AIRPORT_IMAGE_MAX_SIZE_MB", 20)) * 1024 * 1024
+)
+AIRPORT_IMAGE_MAX_PIXELS = 50_000_000
+AIRPORT_IMAGE_WIDTHS = (320, 1280)
+AIRPORT_IMAGE_WORKERS = int(os.getenv("AIRPORT_IMAGE_WORKERS", 2))
+# Decoded images waiting for or being resized by those threads
+AIRPORT_IMAGE_MAX_PENDING = int(os.getenv("AIRPORT_IMAGE_MAX_PENDING", 4))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -149,27 +231,60 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 INTERNAL_IPS = ["127.0.0.1"]
 
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True") == "True"
+METRICS_SAMPLE_RATE = float(os.getenv("METRICS_SAMPLE_RATE", 0.05))
+
+FAST_JSON_RENDERER = os.getenv("FAST_JSON_RENDERER", "False") == "True"
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication"
+        "user.authentication.JWTClaimsAuthentication"
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "airport_api.renderers.FastJSONRenderer"
+        if FAST_JSON_RENDERER
+        else "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ],
     "DEFAULT_PERMISSION_CLASSES": ["flight_ops.permissions.IsAdminOrReadOnly"],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
+        "airport_api.throttling.AnonRateThrottle",
+        "airport_api.throttling.UserRateThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "10/minute", "user": "20/minute"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": os.getenv("THROTTLE_ANON_RATE", "10/minute"),
+        "user": os.getenv("THROTTLE_USER_RATE", "20/minute"),
+    },
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# CacheThrottleBackend needs a shared THROTTLE_CACHE_BACKEND such as Redis or
+# Memcached for the limits to hold across workers
+THROTTLE_BACKEND = os.getenv(
+    "THROTTLE_BACKEND", "airport_api.throttling.CacheThrottleBackend"
+)
+THROTTLE_CACHE_ALIAS = "throttle"
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "user.serializers.TokenRefreshSerializer",
 }
 
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", 10_000))
+
+BOOKING_RESERVATION_RETRIES = int(
+    os.getenv("BOOKING_RESERVATION_RETRIES", 2)
+)
+BOOKING_SEAT_HOLD_TTL = timedelta(
+    minutes=int(os.getenv("BOOKING_SEAT_HOLD_TTL_MINUTES", 10))
+)
+
 # Testing configuration
 TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
 if TESTING:
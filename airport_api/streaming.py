@@ -0,0 +1,67 @@
+from django.http import StreamingHttpResponse
+from drf_spectacular.utils import OpenApiParameter
+
+from .renderers import FastJSONRenderer
+
+STREAM_PARAMETER = OpenApiParameter(
+    "stream",
+    type=bool,
+    description="Staff only. Stream every matching object as one JSON "
+                "array instead of a page, e.g. ?stream=true.",
+)
+
+
+class StreamingListMixin:
+    """
+    Let staff export a whole list with ?stream=true.
+
+    The rows are read from a server-side cursor in chunks of
+    `stream_chunk_size`, and each chunk is serialized and rendered as soon
+    as it is read, so memory stays flat however large the list is.
+    """
+
+    stream_chunk_size = 2000
+
+    def stream_requested(self):
+        request = self.request
+        return (
+            request.query_params.get("stream") == "true"
+            and request.user.is_staff
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.stream_requested():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self._stream_json_array(queryset),
+            content_type="application/json",
+        )
+
+    def _stream_json_array(self, queryset):
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        renderer = FastJSONRenderer()
+
+        separator = b"["
+        chunk = []
+        for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+            chunk.append(obj)
+            if len(chunk) == self.stream_chunk_size:
+                yield separator + self._render_chunk(
+                    chunk, serializer_class, context, renderer
+                )
+                separator = b","
+                chunk = []
+        if chunk:
+            yield separator + self._render_chunk(
+                chunk, serializer_class, context, renderer
+            )
+            separator = b","
+        yield b"[]" if separator == b"[" else b"]"
+
+    @staticmethod
+    def _render_chunk(chunk, serializer_class, context, renderer):
+        data = serializer_class(chunk, many=True, context=context).data
+        return renderer.render(data)[1:-1]
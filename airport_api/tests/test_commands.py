@@ -0,0 +1,29 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from airport_api.models import ThrottleWindow
+
+
+class ClearThrottleWindowsCommandTests(TestCase):
+    def test_deletes_expired_windows_only(self):
+        now = timezone.now()
+        for window, expires_at in (
+            (1, now - timedelta(seconds=1)),
+            (2, now + timedelta(minutes=1)),
+        ):
+            ThrottleWindow.objects.create(
+                key="client", window=window, count=1, expires_at=expires_at
+            )
+
+        out = StringIO()
+        call_command("clear_throttle_windows", stdout=out)
+
+        self.assertIn("Deleted 1 expired throttle windows.", out.getvalue())
+        self.assertEqual(
+            list(ThrottleWindow.objects.values_list("window", flat=True)),
+            [2],
+        )
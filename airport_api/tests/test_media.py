@@ -0,0 +1,171 @@
+import os
+from tempfile import TemporaryDirectory
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+
+CONTENT = bytes(range(256)) * 4
+MEDIA_URL = reverse("media", args=["uploads/airports/photo.jpg"])
+
+
+def read(response):
+    if response.streaming:
+        return b"".join(response.streaming_content)
+    return response.content
+
+
+class ServeMediaTests(TestCase):
+    def setUp(self):
+        self.media_root = TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        self.path = os.path.join(
+            self.media_root.name, "uploads", "airports", "photo.jpg"
+        )
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "wb") as f:
+            f.write(CONTENT)
+        settings = override_settings(
+            MEDIA_ROOT=self.media_root.name, MEDIA_SERVING="django"
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def get(self, headers=None):
+        return self.client.get(MEDIA_URL, headers=headers)
+
+    def test_serve_whole_file(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(read(response), CONTENT)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["Content-Length"], str(len(CONTENT)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", response)
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_head_has_headers_only(self):
+        response = self.client.head(MEDIA_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["Content-Length"], str(len(CONTENT)))
+
+    def test_unsafe_methods_are_not_allowed(self):
+        response = self.client.post(MEDIA_URL)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+
+    def test_conditional_requests(self):
+        response = self.get()
+
+        not_modified = self.get({"If-None-Match": response["ETag"]})
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+        self.assertEqual(not_modified.content, b"")
+
+        not_modified = self.get(
+            {"If-Modified-Since": response["Last-Modified"]}
+        )
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+        modified = self.get({"If-None-Match": '"other"'})
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+
+    def test_byte_ranges(self):
+        size = len(CONTENT)
+        ranges = {
+            "bytes=0-99": (0, 99),
+            "bytes=1000-": (1000, size - 1),
+            "bytes=-24": (size - 24, size - 1),
+            "bytes=1000-5000": (1000, size - 1),
+        }
+        for header, (start, end) in ranges.items():
+            with self.subTest(header):
+                response = self.get({"Range": header})
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_206_PARTIAL_CONTENT
+                )
+                self.assertEqual(read(response), CONTENT[start:end + 1])
+                self.assertEqual(
+                    response["Content-Range"], f"bytes {start}-{end}/{size}"
+                )
+                self.assertEqual(
+                    response["Content-Length"], str(end - start + 1)
+                )
+
+    def test_unsatisfiable_range(self):
+        response = self.get({"Range": f"bytes={len(CONTENT)}-"})
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        )
+        self.assertEqual(response["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_ignored_ranges_serve_whole_file(self):
+        etag = self.get()["ETag"]
+        requests = (
+            {"Range": "bytes=0-1,4-5"},
+            {"Range": "lines=1-2"},
+            {"Range": "bytes=0-1", "If-Range": '"other"'},
+            {"Range": "bytes=0-1", "If-Range": http_date(0)},
+        )
+        for headers in requests:
+            with self.subTest(headers):
+                response = self.get(headers)
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(read(response), CONTENT)
+
+        response = self.get({"Range": "bytes=0-1", "If-Range": etag})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+
+    def test_missing_and_outside_files_are_not_found(self):
+        paths = (
+            "uploads/airports/missing.jpg",
+            "uploads/airports",
+            "../etc/passwd",
+            "uploads/../../etc/passwd",
+        )
+        for path in paths:
+            with self.subTest(path):
+                response = self.client.get(f"/media/{path}")
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_404_NOT_FOUND
+                )
+
+    @override_settings(
+        MEDIA_SERVING="x-accel-redirect",
+        MEDIA_ACCEL_REDIRECT_PREFIX="/internal-media/",
+    )
+    def test_x_accel_redirect(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            "/internal-media/uploads/airports/photo.jpg",
+        )
+        self.assertNotIn("Content-Type", response)
+        self.assertEqual(response.content, b"")
+        self.assertIn("immutable", response["Cache-Control"])
+
+    @override_settings(MEDIA_SERVING="x-sendfile")
+    def test_x_sendfile(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Sendfile"], self.path)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response.content, b"")
@@ -0,0 +1,122 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport_api.caching import get_reference_cache
+from airport_api.metrics import Histogram, registry
+from location.serializers import CountrySerializer
+from location.tests.utils import sample_country
+from user.tests.utils import sample_user
+
+METRICS_URL = reverse("metrics")
+COUNTRY_URL = reverse("location:country-list")
+AIRPORT_ASYNC_URL = reverse("location:airport-async-list")
+
+
+class HistogramTests(SimpleTestCase):
+    def test_small_values_are_exact(self):
+        histogram = Histogram()
+        for value in range(1, 11):
+            histogram.record(value)
+
+        self.assertEqual(histogram.count, 10)
+        self.assertEqual(histogram.total, 55)
+        self.assertEqual(histogram.quantile(0.5), 5)
+        self.assertEqual(histogram.quantile(1), 10)
+
+    def test_large_values_stay_within_relative_error(self):
+        histogram = Histogram()
+        for value in range(1, 100_001):
+            histogram.record(value)
+
+        for q in (0.5, 0.9, 0.99, 0.999):
+            expected = q * 100_000
+            self.assertGreaterEqual(histogram.quantile(q), expected)
+            self.assertLessEqual(histogram.quantile(q), expected * 1.032)
+
+    def test_empty_histogram(self):
+        self.assertEqual(Histogram().quantile(0.99), 0)
+
+
+@override_settings(METRICS_SAMPLE_RATE=1)
+class MetricsAPITests(TestCase):
+    def setUp(self):
+        registry.clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            email="test_admin@test.com", password="test1234"
+        )
+
+    def test_metrics_forbidden_for_non_staff_users(self):
+        self.client.force_authenticate(sample_user())
+
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics_in_prometheus_format(self):
+        sample_country()
+        self.client.force_authenticate(self.admin)
+        self.client.get(COUNTRY_URL, {"format": "api"})
+        self.client.get(COUNTRY_URL, {"format": "api"})
+
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        labels = 'view="location:country-list",method="GET"'
+        self.assertIn("# TYPE airport_api_db_queries summary", body)
+        self.assertIn(f"airport_api_db_queries_count{{{labels}}} 2", body)
+        self.assertIn(
+            f'airport_api_db_queries{{{labels},quantile="0.5"}} 2.0', body
+        )
+        self.assertIn(
+            f"airport_api_request_duration_seconds_count{{{labels}}} 2", body
+        )
+        self.assertIn(
+            f"airport_api_serialize_duration_seconds_count{{{labels}}} 2",
+            body,
+        )
+        self.assertIn("airport_api_metrics_sample_rate 1", body)
+
+    def test_serialization_is_timed_apart_from_sql_and_rendering(self):
+        get_reference_cache().clear()
+        sample_country()
+        to_representation = CountrySerializer.to_representation
+
+        def slow_to_representation(serializer, instance):
+            time.sleep(0.02)
+            return to_representation(serializer, instance)
+
+        with mock.patch.object(
+            CountrySerializer, "to_representation", slow_to_representation
+        ):
+            self.client.get(COUNTRY_URL)
+
+        metrics = registry._endpoints["location:country-list", "GET"]
+        self.assertGreaterEqual(metrics.serialize_duration.total, 20_000)
+        self.assertLess(metrics.render_duration.total, 20_000)
+        self.assertLess(metrics.sql_duration.total, 20_000)
+
+    async def test_async_views_are_measured_without_adaptation(self):
+        # Django logs the middleware it adapts to the handler's mode
+        with self.assertNoLogs("django.request", "DEBUG"):
+            response = await self.async_client.get(AIRPORT_ASYNC_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = registry._endpoints["location:airport-async-list", "GET"]
+        self.assertEqual(metrics.duration.count, 1)
+        self.assertGreaterEqual(metrics.queries.total, 1)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_requests_outside_the_sample_are_not_measured(self):
+        self.client.force_authenticate(self.admin)
+        self.client.get(COUNTRY_URL)
+
+        response = self.client.get(METRICS_URL)
+        self.assertNotIn("location:country-list", response.content.decode())
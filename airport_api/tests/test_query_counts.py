@@ -0,0 +1,191 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport_api.caching import get_reference_cache
+from booking.models import Order, Ticket, SeatHold
+from fleet.tests.utils import sample_airplane_type, sample_airplane
+from flight_ops.models import Route, Flight
+from flight_ops.seat_map import get_seat_map_cache
+from flight_ops.tests.utils import sample_crew
+from flight_ops.timetable import timetable
+from location.tests.utils import sample_country, sample_city, sample_airport
+
+
+class QueryCountTests(TestCase):
+    """
+    Every list and retrieve endpoint runs the same number of queries however
+    many related objects its page renders. The sizes stay within the
+    smallest page size, so each extra object is rendered.
+    """
+
+    sizes = (1, 3)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email="test_admin@test.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+        timetable.clear()
+        self.objects = []
+
+    def _add_objects(self):
+        """
+        Add a flight whose every related object is new, from its crew up to
+        the countries of its airports, plus an order and a seat hold on it.
+        """
+        index = len(self.objects)
+        country = sample_country(name=f"Country {index}")
+        city = sample_city(name=f"City {index}", country=country)
+        source = sample_airport(name=f"Source {index}", closest_big_city=city)
+        destination = sample_airport(
+            name=f"Destination {index}", closest_big_city=city
+        )
+        route = Route.objects.create(
+            source=source, destination=destination, distance=1000
+        )
+        airplane_type = sample_airplane_type(name=f"Type {index}")
+        airplane = sample_airplane(
+            name=f"Airplane {index}", airplane_type=airplane_type
+        )
+        departure_time = timezone.now() + timedelta(days=1, hours=index)
+        flight = Flight.objects.create(
+            number=f"QC{index}",
+            route=route,
+            airplane=airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=2),
+        )
+        crew = sample_crew(last_name=f"Crew {index}")
+        flight.crew.add(crew)
+        for previous in self.objects:
+            previous["flight"].crew.add(crew)
+
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.bulk_create(
+            Ticket(row=1, seat=seat, flight=flight, order=order)
+            for seat in (1, 2)
+        )
+        hold = SeatHold.objects.create(
+            row=2,
+            seat=1,
+            flight=flight,
+            user=self.user,
+            expires_at=timezone.now() + timedelta(minutes=10),
+        )
+        self.objects.append(
+            {
+                "country": country,
+                "city": city,
+                "airport": source,
+                "route": route,
+                "airplane_type": airplane_type,
+                "airplane": airplane,
+                "flight": flight,
+                "crew": crew,
+                "order": order,
+                "hold": hold,
+            }
+        )
+
+    def _urls(self):
+        first = self.objects[0]
+        return {
+            "countries": reverse("location:country-list"),
+            "country": reverse(
+                "location:country-detail", args=[first["country"].id]
+            ),
+            "cities": reverse("location:city-list"),
+            "city": reverse("location:city-detail", args=[first["city"].id]),
+            "airports": reverse("location:airport-list"),
+            "airport": reverse(
+                "location:airport-detail", args=[first["airport"].id]
+            ),
+            "airplane types": reverse("fleet:airplane-type-list"),
+            "airplane type": reverse(
+                "fleet:airplane-type-detail",
+                args=[first["airplane_type"].id],
+            ),
+            "airplanes": reverse("fleet:airplane-list"),
+            "airplane": reverse(
+                "fleet:airplane-detail", args=[first["airplane"].id]
+            ),
+            "routes": reverse("flight-ops:route-list"),
+            "route": reverse(
+                "flight-ops:route-detail", args=[first["route"].id]
+            ),
+            "crew list": reverse("flight-ops:crew-list"),
+            "crew": reverse("flight-ops:crew-detail", args=[first["crew"].id]),
+            "flights": reverse("flight-ops:flight-list"),
+            "flight": reverse(
+                "flight-ops:flight-detail", args=[first["flight"].id]
+            ),
+            "seat map": reverse(
+                "flight-ops:flight-seat-map", args=[first["flight"].id]
+            ),
+            "orders": reverse("booking:order-list"),
+            "holds": reverse("booking:seathold-list"),
+            "me": reverse("user:manage"),
+        }
+
+    def _query_count(self, url):
+        get_reference_cache().clear()
+        get_seat_map_cache().clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        return len(queries)
+
+    def _query_counts(self):
+        return {
+            name: self._query_count(url)
+            for name, url in self._urls().items()
+        }
+
+    def test_query_counts_do_not_grow_with_page_size(self):
+        counts = {}
+        for size in self.sizes:
+            while len(self.objects) < size:
+                self._add_objects()
+            counts[size] = self._query_counts()
+
+        smallest, *larger = self.sizes
+        for size in larger:
+            self.assertEqual(counts[size], counts[smallest])
+
+    def test_query_counts(self):
+        self._add_objects()
+
+        self.assertEqual(
+            self._query_counts(),
+            {
+                "countries": 2,
+                "country": 1,
+                "cities": 2,
+                "city": 1,
+                "airports": 2,
+                "airport": 1,
+                "airplane types": 2,
+                "airplane type": 1,
+                "airplanes": 2,
+                "airplane": 1,
+                "routes": 2,
+                "route": 1,
+                "crew list": 2,
+                "crew": 1,
+                "flights": 2,
+                "flight": 2,
+                "seat map": 3,
+                "orders": 3,
+                "holds": 2,
+                "me": 0,
+            },
+        )
@@ -0,0 +1,176 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import checks
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from airport_api.caching import get_reference_cache
+from airport_api.models import ThrottleWindow
+from airport_api.throttling import (
+    AnonRateThrottle,
+    SlidingWindowRateThrottle,
+    check_throttle_backend,
+)
+
+COUNTRY_URL = reverse("location:country-list")
+AIRPORT_ASYNC_URL = reverse("location:airport-async-list")
+BACKENDS = (
+    "airport_api.throttling.CacheThrottleBackend",
+    "airport_api.throttling.DatabaseThrottleBackend",
+)
+RATES = {"anon": "4/minute", "user": "8/minute"}
+
+
+class SlidingWindowRateThrottleTests(TestCase):
+    def setUp(self):
+        caches["throttle"].clear()
+        self.request = APIRequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+        self.request.user = None
+        self.now = 6000.0
+
+    def throttle(self):
+        throttle = AnonRateThrottle()
+        throttle.rate = "4/minute"
+        throttle.num_requests, throttle.duration = 4, 60
+        throttle.timer = lambda: self.now
+        return throttle
+
+    def allowed(self, count):
+        return [
+            self.throttle().allow_request(self.request, None)
+            for _ in range(count)
+        ]
+
+    def test_limit_within_window(self):
+        for backend in BACKENDS:
+            with self.subTest(backend), override_settings(
+                THROTTLE_BACKEND=backend
+            ):
+                caches["throttle"].clear()
+                ThrottleWindow.objects.all().delete()
+                self.now = 6000.0
+
+                self.assertEqual(self.allowed(6), [True] * 4 + [False] * 2)
+                throttle = self.throttle()
+                self.assertFalse(throttle.allow_request(self.request, None))
+                self.assertAlmostEqual(throttle.wait(), 60 + 15)
+
+    def test_previous_window_counts_by_overlap(self):
+        for backend in BACKENDS:
+            with self.subTest(backend), override_settings(
+                THROTTLE_BACKEND=backend
+            ):
+                caches["throttle"].clear()
+                ThrottleWindow.objects.all().delete()
+                self.now = 6000.0
+                self.allowed(4)
+
+                # A quarter into the next window, 3 of the 4 still count
+                self.now = 6075.0
+                self.assertEqual(self.allowed(2), [True, False])
+                throttle = self.throttle()
+                self.assertFalse(throttle.allow_request(self.request, None))
+                self.assertAlmostEqual(throttle.wait(), 15)
+
+                self.now = 6090.0
+                self.assertEqual(self.allowed(2), [True, False])
+
+    def test_database_backend_leaves_expired_rows(self):
+        ThrottleWindow.objects.create(
+            key="stale",
+            window=1,
+            count=3,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        with override_settings(
+            THROTTLE_BACKEND="airport_api.throttling.DatabaseThrottleBackend"
+        ):
+            self.allowed(6)
+            self.now += 90
+            self.allowed(1)
+
+        self.assertEqual(
+            list(
+                ThrottleWindow.objects.order_by("window").values_list(
+                    "window", "count"
+                )
+            ),
+            [(1, 3), (100, 4), (101, 1)],
+        )
+
+    def test_no_rate_allows_every_request(self):
+        throttle = AnonRateThrottle()
+        self.assertIsNone(throttle.rate)
+        self.assertTrue(throttle.allow_request(self.request, None))
+
+
+@mock.patch.object(SlidingWindowRateThrottle, "THROTTLE_RATES", RATES)
+class ThrottledAPITests(TestCase):
+    def setUp(self):
+        caches["throttle"].clear()
+        self.client = APIClient()
+
+    def test_views_return_retry_after(self):
+        for _ in range(4):
+            response = self.client.get(COUNTRY_URL)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(COUNTRY_URL)
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+    def test_cached_response_runs_no_queries(self):
+        get_reference_cache().clear()
+        self.client.get(COUNTRY_URL)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(COUNTRY_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_async_views_share_the_limit(self):
+        for _ in range(4):
+            self.client.get(COUNTRY_URL)
+
+        response = self.client.get(AIRPORT_ASYNC_URL)
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+
+
+class ThrottleBackendCheckTests(TestCase):
+    def test_local_memory_cache_warns_on_deploy(self):
+        errors = check_throttle_backend(None)
+
+        self.assertEqual([error.id for error in errors], ["airport_api.W001"])
+        self.assertIn(
+            errors[0],
+            checks.run_checks(
+                tags=[checks.Tags.caches], include_deployment_checks=True
+            ),
+        )
+        self.assertNotIn(
+            errors[0], checks.run_checks(tags=[checks.Tags.caches])
+        )
+
+    @override_settings(THROTTLE_BACKEND=BACKENDS[1])
+    def test_database_backend_passes(self):
+        self.assertEqual(check_throttle_backend(None), [])
+
+    @override_settings(
+        THROTTLE_BACKEND=BACKENDS[0],
+        CACHES={
+            "throttle": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "throttle",
+            },
+        },
+    )
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_throttle_backend(None), [])
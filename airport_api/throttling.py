@@ -0,0 +1,205 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework import throttling
+
+from .models import ThrottleWindow
+
+
+class CacheThrottleBackend:
+    """
+    Count requests in THROTTLE_CACHE_ALIAS with atomic increments. The
+    counts are shared by the workers when the cache is, e.g. Redis or
+    Memcached.
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def hit(self, key, window, duration):
+        """
+        Count a request in the window and return the counts of the previous
+        and current windows.
+        """
+        current_key = f"{key}:{window}"
+        self.cache.add(current_key, 0, timeout=duration * 2)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.set(current_key, 1, timeout=duration * 2)
+            current = 1
+        return self.cache.get(f"{key}:{window - 1}", 0), current
+
+    def release(self, key, window):
+        """Take back the request counted by hit()."""
+        try:
+            self.cache.decr(f"{key}:{window}")
+        except ValueError:
+            pass
+
+
+class DatabaseThrottleBackend:
+    """
+    Count requests in ThrottleWindow rows with atomic upserts, which every
+    worker shares. On PostgreSQL a request is counted with one statement.
+    Expired rows are left to the clear_throttle_windows command.
+    """
+
+    def hit(self, key, window, duration):
+        expires_at = timezone.now() + timedelta(seconds=duration * 2)
+        if connection.vendor == "postgresql":
+            return self._upsert(key, window, expires_at)
+
+        windows = ThrottleWindow.objects.filter(key=key)
+        if not windows.filter(window=window).update(count=F("count") + 1):
+            try:
+                with transaction.atomic():
+                    ThrottleWindow.objects.create(
+                        key=key, window=window, count=1, expires_at=expires_at
+                    )
+            except IntegrityError:
+                # Created by a concurrent request
+                windows.filter(window=window).update(count=F("count") + 1)
+
+        counts = dict(
+            windows.filter(window__gte=window - 1).values_list(
+                "window", "count"
+            )
+        )
+        return counts.get(window - 1, 0), counts.get(window, 0)
+
+    @staticmethod
+    def _upsert(key, window, expires_at):
+        """
+        Insert or increment the row of the window and read the count of the
+        previous one in a single INSERT ... ON CONFLICT statement.
+        """
+        quote_name = connection.ops.quote_name
+        meta = ThrottleWindow._meta
+        table = quote_name(meta.db_table)
+        key_column, window_column, count_column, expires_column = (
+            quote_name(meta.get_field(name).column)
+            for name in ("key", "window", "count", "expires_at")
+        )
+        sql = (
+            f"WITH hit AS ("
+            f"INSERT INTO {table} "
+            f"({key_column}, {window_column}, {count_column}, "
+            f"{expires_column}) VALUES (%s, %s, 1, %s) "
+            f"ON CONFLICT ({key_column}, {window_column}) DO UPDATE "
+            f"SET {count_column} = {table}.{count_column} + 1 "
+            f"RETURNING {count_column}) "
+            f"SELECT (SELECT {count_column} FROM {table} "
+            f"WHERE {key_column} = %s AND {window_column} = %s), "
+            f"(SELECT {count_column} FROM hit)"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql, [key, window, expires_at, key, window - 1]
+            )
+            previous, current = cursor.fetchone()
+        return previous or 0, current
+
+    def release(self, key, window):
+        ThrottleWindow.objects.filter(
+            key=key, window=window, count__gt=0
+        ).update(count=F("count") - 1)
+
+
+def get_throttle_backend():
+    return import_string(settings.THROTTLE_BACKEND)()
+
+
+def check_throttle_backend(app_configs, **kwargs):
+    """Warn when each process would count requests on its own."""
+    if not issubclass(
+        import_string(settings.THROTTLE_BACKEND), CacheThrottleBackend
+    ) or not isinstance(caches[settings.THROTTLE_CACHE_ALIAS], LocMemCache):
+        return []
+    return [
+        checks.Warning(
+            f"The throttles count requests in the local memory cache "
+            f"{settings.THROTTLE_CACHE_ALIAS!r}, so every worker process "
+            f"allows the whole rate.",
+            hint=(
+                "Set THROTTLE_CACHE_BACKEND to a shared cache such as Redis "
+                "or Memcached, or THROTTLE_BACKEND to "
+                "airport_api.throttling.DatabaseThrottleBackend."
+            ),
+            id="airport_api.W001",
+        )
+    ]
+
+
+class SlidingWindowRateThrottle(throttling.SimpleRateThrottle):
+    """
+    Throttle with the sliding window counter algorithm: the requests of
+    the previous fixed window count in proportion to how much of it still
+    overlaps the sliding window. Unlike the request history of
+    SimpleRateThrottle, this keeps two counters per client whatever the
+    rate, and counts a request with a fixed number of backend operations.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.backend = get_throttle_backend()
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, self.elapsed = divmod(self.now, self.duration)
+        self.window = int(window)
+        self.previous, self.current = self.backend.hit(
+            self.key, self.window, self.duration
+        )
+        if self.estimate() <= self.num_requests:
+            return True
+
+        self.backend.release(self.key, self.window)
+        self.current -= 1
+        return self.throttle_failure()
+
+    def estimate(self):
+        """Return the requests counted in the sliding window ending now."""
+        return (
+            self.previous * (1 - self.elapsed / self.duration) + self.current
+        )
+
+    def wait(self):
+        """Return the seconds until the next request would be allowed."""
+        allowed = self.num_requests - 1
+        if self.current <= allowed:
+            # The weight of the previous window must drop enough
+            weight = (allowed - self.current) / self.previous
+            return max(self.duration * (1 - weight) - self.elapsed, 0)
+        if self.num_requests == 0:
+            return None
+        # The current window must become the previous one first
+        weight = allowed / self.current
+        return self.duration - self.elapsed + self.duration * (1 - weight)
+
+
+class AnonRateThrottle(
+    SlidingWindowRateThrottle, throttling.AnonRateThrottle
+):
+    """Throttle anonymous users by IP address."""
+
+
+class UserRateThrottle(
+    SlidingWindowRateThrottle, throttling.UserRateThrottle
+):
+    """Throttle authenticated users by id and others by IP address."""
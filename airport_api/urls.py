@@ -14,16 +14,20 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView,
     SpectacularRedocView
 )
 
+from .media import serve_media
+from .metrics import MetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/booking/", include("booking.urls", namespace="booking")),
@@ -34,6 +38,7 @@ urlpatterns = [
     ),
     path("api/v1/location/", include("location.urls", namespace="location")),
     path("api/v1/user/", include("user.urls", namespace="user")),
+    path("api/v1/metrics/", MetricsView.as_view(), name="metrics"),
     path("api/v1/doc/", SpectacularAPIView.as_view(), name="schema"),
     path(
         "api/v1/doc/swagger/",
@@ -44,7 +49,10 @@ urlpatterns = [
         "api/v1/doc/redoc/",
         SpectacularRedocView.as_view(url_name="schema"),
         name="redoc"
+    ),
+    re_path(
+        rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.+)$",
+        serve_media,
+        name="media"
     )
-] + static(
-    settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-)
+]
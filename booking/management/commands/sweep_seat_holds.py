@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.models import SeatHold
+from flight_ops.seat_map import invalidate_seat_maps
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the expired seat holds in batches. Expired holds never keep "
+        "a seat, so this only keeps the table small; run it periodically, "
+        "e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of holds deleted per query.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("The batch size must be positive.")
+
+        deleted = 0
+        while True:
+            batch = list(
+                SeatHold.objects.expired()
+                .order_by("pk")
+                .values_list("pk", "flight_id")[:options["batch_size"]]
+            )
+            if not batch:
+                break
+
+            hold_ids, flight_ids = zip(*batch)
+            SeatHold.objects.filter(pk__in=hold_ids).delete()
+            invalidate_seat_maps(set(flight_ids))
+            deleted += len(hold_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} expired seat holds.")
+        )
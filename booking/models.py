@@ -1,7 +1,8 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 from django.db.models import UniqueConstraint
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
 from flight_ops.models import Flight
@@ -65,6 +66,7 @@ class Ticket(models.Model):
             self.row, self.seat, self.flight.airplane, ValidationError
         )
 
+    @transaction.atomic
     def save(
         self,
         *args,
@@ -83,3 +85,54 @@ class Ticket(models.Model):
             f"Ticket for row {self.row}, seat {self.seat}, "
             f"flight {self.flight.number}"
         )
+
+
+class SeatHoldQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class SeatHold(models.Model):
+    """A seat kept for a user for a short time before the order is paid."""
+
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["row", "seat", "flight"],
+                name="The seat in this row is already held for the flight.",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["flight", "expires_at"],
+                name="seat_hold_flight_expiry_idx",
+            ),
+        ]
+
+    @property
+    def is_active(self):
+        return self.expires_at > timezone.now()
+
+    def __str__(self):
+        return (
+            f"Hold of row {self.row}, seat {self.seat}, "
+            f"flight {self.flight_id} until {self.expires_at}"
+        )
@@ -0,0 +1,248 @@
+import random
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction, IntegrityError, OperationalError
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from flight_ops.models import Flight
+from flight_ops.seat_map import invalidate_seat_maps
+from .models import Order, Ticket, SeatHold
+
+
+class SeatConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("Some of the seats are already taken.")
+    default_code = "seat_conflict"
+
+    def __init__(self, seats):
+        super().__init__()
+        self.detail = {
+            "detail": self.detail,
+            "conflicts": [
+                {"flight": flight_id, "row": row, "seat": seat}
+                for flight_id, row, seat in sorted(seats)
+            ],
+        }
+
+
+def _seat_lookup(seats):
+    """
+    Narrow tickets or holds down to a superset of the given seats with
+    plain IN lookups. The exact triples are matched in Python.
+    """
+    flight_ids, rows, seat_numbers = zip(*seats)
+    return {
+        "flight_id__in": set(flight_ids),
+        "row__in": set(rows),
+        "seat__in": set(seat_numbers),
+    }
+
+
+def find_taken_seats(seats, user=None):
+    """
+    Return which of the (flight_id, row, seat) triples are sold or held by
+    anyone but `user`.
+    """
+    lookup = _seat_lookup(seats)
+    taken_seats = set(
+        Ticket.objects.filter(**lookup).values_list("flight_id", "row", "seat")
+    )
+    holds = SeatHold.objects.active().filter(**lookup)
+    if user is not None:
+        holds = holds.exclude(user=user)
+    taken_seats |= set(holds.values_list("flight_id", "row", "seat"))
+
+    return taken_seats & set(seats)
+
+
+def lock_flights(flight_ids):
+    """
+    Lock the flights' rows until the end of the transaction so that
+    competing bookings of the same flight run one after another. Locking
+    in id order keeps two multi-flight orders from deadlocking.
+    """
+    return list(
+        Flight.objects.select_for_update()
+        .filter(pk__in=flight_ids)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def _get_seats(seats_data):
+    return [
+        (seat_data["flight"].id, seat_data["row"], seat_data["seat"])
+        for seat_data in seats_data
+    ]
+
+
+def _claim_seats(seats, user):
+    """
+    Check the seats of the locked flights and clear the way to write them.
+
+    Seats sold or actively held by other users raise SeatConflict. Expired
+    holds of the seats are swept on the way, and the user's own holds are
+    released since the user is about to book or hold the seats again.
+    """
+    lookup = _seat_lookup(seats)
+    requested_seats = set(seats)
+    taken_seats = set(
+        Ticket.objects.filter(**lookup).values_list("flight_id", "row", "seat")
+    ) & requested_seats
+
+    now = timezone.now()
+    released_hold_ids = []
+    for hold_id, flight_id, row, seat, user_id, expires_at in (
+        SeatHold.objects.filter(**lookup).values_list(
+            "pk", "flight_id", "row", "seat", "user_id", "expires_at"
+        )
+    ):
+        if (flight_id, row, seat) not in requested_seats:
+            continue
+        if expires_at > now and user_id != user.pk:
+            taken_seats.add((flight_id, row, seat))
+        else:
+            released_hold_ids.append(hold_id)
+
+    if taken_seats:
+        raise SeatConflict(taken_seats)
+    if released_hold_ids:
+        SeatHold.objects.filter(pk__in=released_hold_ids).delete()
+
+
+def _create_order(order_data, tickets_data):
+    seats = _get_seats(tickets_data)
+    flight_seat_counts = Counter(seat[0] for seat in seats)
+    lock_flights(flight_seat_counts)
+    _claim_seats(seats, order_data["user"])
+
+    order = Order.objects.create(**order_data)
+    Ticket.objects.bulk_create(
+        Ticket(order=order, **ticket_data) for ticket_data in tickets_data
+    )
+    Flight.objects.adjust_seats_available(
+        {
+            flight_id: -count
+            for flight_id, count in flight_seat_counts.items()
+        }
+    )
+    return order
+
+
+def _create_holds(user, seats_data):
+    seats = _get_seats(seats_data)
+    flight_ids = {seat[0] for seat in seats}
+    lock_flights(flight_ids)
+    _claim_seats(seats, user)
+
+    expires_at = timezone.now() + settings.BOOKING_SEAT_HOLD_TTL
+    holds = SeatHold.objects.bulk_create(
+        SeatHold(
+            user=user,
+            flight=seat_data["flight"],
+            row=seat_data["row"],
+            seat=seat_data["seat"],
+            expires_at=expires_at,
+        )
+        for seat_data in seats_data
+    )
+    invalidate_seat_maps(flight_ids)
+    return holds
+
+
+def _retry(create, user, seats_data, retries):
+    """
+    Run `create` in a transaction, retrying the transactions the database
+    aborts anyway: a deadlock, a lock timeout or a unique violation where
+    row locks are not supported. Each retry sees the committed seats.
+    """
+    if retries is None:
+        retries = settings.BOOKING_RESERVATION_RETRIES
+
+    for attempt in range(retries + 1):
+        try:
+            with transaction.atomic():
+                return create()
+        except (IntegrityError, OperationalError):
+            if attempt == retries:
+                taken_seats = find_taken_seats(_get_seats(seats_data), user)
+                if taken_seats:
+                    raise SeatConflict(taken_seats)
+                raise
+            time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+
+
+def reserve_seats(order_data, tickets_data, retries=None):
+    """
+    Create an order with its tickets, or raise SeatConflict listing the
+    seats that other orders or other users' holds keep.
+
+    Writers of the same flight are serialized by row locks, so the seat
+    check cannot go stale before the insert. Aborted transactions are
+    retried up to `retries` times, BOOKING_RESERVATION_RETRIES by default.
+    """
+    return _retry(
+        lambda: _create_order(order_data, tickets_data),
+        order_data["user"],
+        tickets_data,
+        retries,
+    )
+
+
+def hold_seats(user, seats_data, retries=None):
+    """
+    Hold the seats for the user for BOOKING_SEAT_HOLD_TTL, all of them or
+    none. Holding seats the user already holds extends the holds.
+    """
+    return _retry(
+        lambda: _create_holds(user, seats_data),
+        user,
+        seats_data,
+        retries,
+    )
+
+
+@transaction.atomic
+def checkout_holds(user, hold_ids):
+    """
+    Turn the user's active holds into an order with tickets. The seats were
+    validated when they were held and nobody else could take them since.
+    """
+    flight_ids = SeatHold.objects.filter(
+        pk__in=hold_ids, user=user
+    ).values_list("flight_id", flat=True)
+    lock_flights(set(flight_ids))
+
+    holds = list(
+        SeatHold.objects.active().filter(pk__in=hold_ids, user=user)
+    )
+    if len(holds) != len(set(hold_ids)):
+        raise ValidationError(
+            {"holds": [_("Some of the holds have expired or do not exist.")]}
+        )
+
+    order = Order.objects.create(user=user)
+    Ticket.objects.bulk_create(
+        Ticket(
+            order=order,
+            flight_id=hold.flight_id,
+            row=hold.row,
+            seat=hold.seat,
+        )
+        for hold in holds
+    )
+    SeatHold.objects.filter(pk__in=[hold.pk for hold in holds]).delete()
+    Flight.objects.adjust_seats_available(
+        {
+            flight_id: -count
+            for flight_id, count in Counter(
+                hold.flight_id for hold in holds
+            ).items()
+        }
+    )
+    return order
@@ -1,10 +1,70 @@
-from django.db import transaction
+from collections import Counter
+from collections.abc import Mapping
+
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
-from .models import Order, Ticket
+from flight_ops.models import Flight
+from flight_ops.serializers import PrefetchedPrimaryKeyRelatedField
+from .models import Order, Ticket, SeatHold
+from .reservations import reserve_seats, hold_seats
+
+SEAT_TAKEN_MESSAGE = _(
+    "The seat in this row is already taken for the flight. Choose a free one."
+)
+
+
+def reject_repeated_seats(seats_data):
+    """Reject seats repeated within one request, next to the repeats."""
+    seats = [
+        (seat_data["flight"].id, seat_data["row"], seat_data["seat"])
+        for seat_data in seats_data
+    ]
+    repeated_seats = {
+        seat for seat, count in Counter(seats).items() if count > 1
+    }
+    if repeated_seats:
+        raise serializers.ValidationError(
+            [
+                {"non_field_errors": [SEAT_TAKEN_MESSAGE]}
+                if seat in repeated_seats
+                else {}
+                for seat in seats
+            ]
+        )
+
+
+class BulkFlightField(PrefetchedPrimaryKeyRelatedField):
+    """Resolve flights from the ones prefetched for the whole ticket list."""
+
+
+class TicketBulkListSerializer(serializers.ListSerializer):
+    """
+    Validate a list of tickets with one query for all of their flights and
+    their airplanes, however many tickets the list holds.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            flight_ids = set()
+            for ticket_data in data:
+                if isinstance(ticket_data, Mapping):
+                    try:
+                        flight_ids.add(int(ticket_data.get("flight")))
+                    except (TypeError, ValueError):
+                        pass
+            self.child.fields["flight"].prefetched = (
+                Flight.objects.select_related("airplane").in_bulk(flight_ids)
+            )
+
+        return super().to_internal_value(data)
 
 
 class TicketSerializer(serializers.ModelSerializer):
+    flight = BulkFlightField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs)
         Ticket.validate_ticket(
@@ -18,6 +78,10 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "flight")
+        list_serializer_class = TicketBulkListSerializer
+        # Seat uniqueness is checked for the whole order in one query
+        # by OrderSerializer instead of one query per ticket.
+        validators = []
 
 
 class TicketListSerializer(TicketSerializer):
@@ -31,16 +95,48 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ("id", "created_at", "tickets")
 
-    @transaction.atomic
+    def validate_tickets(self, tickets_data):
+        """Reject seats repeated within the order."""
+        reject_repeated_seats(tickets_data)
+        return tickets_data
+
     def create(self, validated_data):
+        """
+        Book the tickets through the reservation engine, which answers with
+        409 and the conflicting seats when other orders hold them.
+        """
         tickets_data = validated_data.pop("tickets")
-        order = Order.objects.create(**validated_data)
-
-        for ticket_data in tickets_data:
-            Ticket.objects.create(order=order, **ticket_data)
-            
-        return order
+        return reserve_seats(validated_data, tickets_data)
 
 
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class SeatHoldListSerializer(TicketBulkListSerializer):
+    def validate(self, attrs):
+        reject_repeated_seats(attrs)
+        return attrs
+
+    def create(self, validated_data):
+        return hold_seats(validated_data[0]["user"], validated_data)
+
+
+class SeatHoldSerializer(TicketSerializer):
+    class Meta:
+        model = SeatHold
+        fields = ("id", "row", "seat", "flight", "expires_at")
+        read_only_fields = ("expires_at",)
+        list_serializer_class = SeatHoldListSerializer
+        # Holds are checked against tickets and other holds under the
+        # flight's row lock by the reservation engine.
+        validators = []
+
+    def create(self, validated_data):
+        return hold_seats(validated_data["user"], [validated_data])[0]
+
+
+class HoldCheckoutSerializer(serializers.Serializer):
+    holds = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
+    )
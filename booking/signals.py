@@ -0,0 +1,35 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from flight_ops.models import Flight
+from .models import Ticket
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_previous_flight(sender, instance, **kwargs):
+    """Keep the flight a ticket is moved away from to release its seat."""
+    if not instance._state.adding:
+        instance._previous_flight_id = (
+            Ticket.objects.filter(pk=instance.pk)
+            .values_list("flight_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Ticket)
+def take_seat(sender, instance, created, **kwargs):
+    if created:
+        Flight.objects.adjust_seats_available({instance.flight_id: -1})
+        return
+
+    previous_flight_id = getattr(instance, "_previous_flight_id", None)
+    if previous_flight_id and previous_flight_id != instance.flight_id:
+        Flight.objects.adjust_seats_available(
+            {previous_flight_id: 1, instance.flight_id: -1}
+        )
+
+
+@receiver(post_delete, sender=Ticket)
+def release_seat(sender, instance, **kwargs):
+    """Give the seat back, including when tickets cascade from orders."""
+    Flight.objects.adjust_seats_available({instance.flight_id: 1})
@@ -0,0 +1,208 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.models import SeatHold, Ticket
+from booking.reservations import hold_seats, reserve_seats, SeatConflict
+from flight_ops.seat_map import get_seat_map_cache
+from flight_ops.tests.utils import sample_flight
+from user.tests.utils import sample_user
+
+HOLD_URL = reverse("booking:seathold-list")
+CHECKOUT_URL = reverse("booking:seathold-checkout")
+ORDER_URL = reverse("booking:order-list")
+FLIGHT_URL = reverse("flight-ops:flight-list")
+
+
+def expire_holds():
+    SeatHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+
+class HoldSeatsTests(TestCase):
+    def setUp(self):
+        self.user = sample_user()
+        self.other_user = sample_user(email="other@test.com")
+        self.flight = sample_flight()
+        self.seats_data = [{"row": 1, "seat": 1, "flight": self.flight}]
+
+    def test_seat_held_by_other_user_conflicts(self):
+        hold_seats(self.user, self.seats_data)
+
+        with self.assertRaises(SeatConflict):
+            hold_seats(self.other_user, self.seats_data)
+        with self.assertRaises(SeatConflict):
+            reserve_seats({"user": self.other_user}, self.seats_data)
+
+    def test_holding_own_seat_again_extends_hold(self):
+        hold_seats(self.user, self.seats_data)
+        SeatHold.objects.update(
+            expires_at=timezone.now() + timedelta(seconds=5)
+        )
+
+        hold = hold_seats(self.user, self.seats_data)[0]
+
+        self.assertEqual(SeatHold.objects.get().pk, hold.pk)
+        self.assertGreater(
+            hold.expires_at, timezone.now() + timedelta(seconds=5)
+        )
+
+    def test_expired_hold_does_not_keep_seat(self):
+        hold_seats(self.user, self.seats_data)
+        expire_holds()
+
+        hold_seats(self.other_user, self.seats_data)
+
+        self.assertEqual(SeatHold.objects.get().user, self.other_user)
+
+    def test_booking_own_held_seat_releases_hold(self):
+        hold_seats(self.user, self.seats_data)
+
+        reserve_seats({"user": self.user}, self.seats_data)
+
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_sweep_deletes_expired_holds(self):
+        hold_seats(self.user, self.seats_data)
+        hold_seats(
+            self.other_user, [{"row": 2, "seat": 1, "flight": self.flight}]
+        )
+        SeatHold.objects.filter(user=self.user).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        call_command("sweep_seat_holds", batch_size=1, stdout=StringIO())
+
+        self.assertEqual(SeatHold.objects.get().user, self.other_user)
+
+
+class SeatHoldAPITests(TestCase):
+    def setUp(self):
+        get_seat_map_cache().clear()
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.payload = [
+            {"row": 1, "seat": 1, "flight": self.flight.id},
+            {"row": 1, "seat": 2, "flight": self.flight.id},
+        ]
+
+    def test_holds_forbidden_for_anon_users(self):
+        response = APIClient().post(HOLD_URL, self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_hold_seats(self):
+        response = self.client.post(HOLD_URL, self.payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 2)
+        self.assertIn("expires_at", response.data[0])
+        self.assertEqual(self.client.get(HOLD_URL).data["count"], 2)
+
+    def test_hold_single_seat(self):
+        response = self.client.post(HOLD_URL, self.payload[0], format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["seat"], 1)
+
+    def test_repeated_seats_rejected(self):
+        response = self.client.post(
+            HOLD_URL, [self.payload[0]] * 2, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_seat_held_by_other_user_conflicts(self):
+        self.client.post(HOLD_URL, self.payload, format="json")
+        other_client = APIClient()
+        other_client.force_authenticate(sample_user(email="other@test.com"))
+
+        hold_response = other_client.post(
+            HOLD_URL, self.payload[1:], format="json"
+        )
+        order_response = other_client.post(
+            ORDER_URL, {"tickets": self.payload[1:]}, format="json"
+        )
+
+        for response in (hold_response, order_response):
+            self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+            self.assertEqual(
+                response.data["conflicts"],
+                [{"flight": self.flight.id, "row": 1, "seat": 2}],
+            )
+
+    def test_held_seats_not_available(self):
+        self.client.post(HOLD_URL, self.payload, format="json")
+
+        flight_response = self.client.get(FLIGHT_URL)
+        seat_map_response = self.client.get(
+            reverse("flight-ops:flight-seat-map", args=[self.flight.id])
+        )
+
+        self.assertEqual(
+            flight_response.data["results"][0]["seats_available"],
+            self.flight.airplane.plane_capacity - 2,
+        )
+        self.assertEqual(
+            seat_map_response.data["seats_available"],
+            self.flight.airplane.plane_capacity - 2,
+        )
+        self.assertTrue(seat_map_response.data["occupancy"][0][1])
+
+    def test_expired_holds_not_listed_or_counted(self):
+        self.client.post(HOLD_URL, self.payload, format="json")
+        expire_holds()
+        get_seat_map_cache().clear()
+
+        flight_response = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(
+            flight_response.data["results"][0]["seats_available"],
+            self.flight.airplane.plane_capacity,
+        )
+        self.assertEqual(self.client.get(HOLD_URL).data["count"], 0)
+
+    def test_release_hold(self):
+        response = self.client.post(HOLD_URL, self.payload, format="json")
+
+        self.client.delete(
+            reverse("booking:seathold-detail", args=[response.data[0]["id"]])
+        )
+
+        self.assertEqual(SeatHold.objects.count(), 1)
+
+    def test_checkout_books_holds(self):
+        response = self.client.post(HOLD_URL, self.payload, format="json")
+        hold_ids = [hold["id"] for hold in response.data]
+
+        response = self.client.post(
+            CHECKOUT_URL, {"holds": hold_ids}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["tickets"]), 2)
+        self.assertFalse(SeatHold.objects.exists())
+        self.flight.refresh_from_db()
+        self.assertEqual(
+            self.flight.seats_available,
+            self.flight.airplane.plane_capacity - 2,
+        )
+
+    def test_checkout_of_expired_holds_rejected(self):
+        response = self.client.post(HOLD_URL, self.payload, format="json")
+        expire_holds()
+
+        response = self.client.post(
+            CHECKOUT_URL,
+            {"holds": [hold["id"] for hold in response.data]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
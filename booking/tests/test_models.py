@@ -35,3 +35,28 @@ class TicketModelTest(TestCase):
             f"Ticket for row 1, seat 5, flight {self.flight.number}",
             str(ticket)
         )
+
+    def test_ticket_takes_and_releases_flight_seat(self):
+        capacity = self.flight.airplane.plane_capacity
+        order = Order.objects.create(user=sample_user())
+        ticket = Ticket.objects.create(
+            row=1, seat=5, flight=self.flight, order=order
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_available, capacity - 1)
+
+        ticket.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_available, capacity)
+
+    def test_order_deletion_releases_flight_seats(self):
+        capacity = self.flight.airplane.plane_capacity
+        order = Order.objects.create(user=sample_user())
+        for seat in (1, 2, 3):
+            Ticket.objects.create(
+                row=1, seat=seat, flight=self.flight, order=order
+            )
+
+        order.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_available, capacity)
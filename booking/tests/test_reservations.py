@@ -0,0 +1,143 @@
+import threading
+from unittest import mock
+
+from django.db import connection, IntegrityError
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+    skipUnlessDBFeature
+)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.models import Order, Ticket
+from booking.reservations import reserve_seats, SeatConflict
+from flight_ops.tests.utils import sample_flight
+from user.tests.utils import sample_user
+
+ORDER_URL = reverse("booking:order-list")
+
+
+class ReserveSeatsTests(TestCase):
+    def setUp(self):
+        self.user = sample_user()
+        self.flight = sample_flight()
+        self.tickets_data = [{"row": 1, "seat": 1, "flight": self.flight}]
+
+    def test_taken_seat_conflict(self):
+        reserve_seats({"user": self.user}, self.tickets_data)
+
+        with self.assertRaises(SeatConflict) as context:
+            reserve_seats({"user": self.user}, self.tickets_data)
+        self.assertEqual(
+            context.exception.detail["conflicts"],
+            [{"flight": self.flight.id, "row": 1, "seat": 1}]
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_aborted_transaction_is_retried(self):
+        bulk_create = Ticket.objects.bulk_create
+        attempts = []
+
+        def bulk_create_after_failure(tickets):
+            attempts.append(tickets)
+            if len(attempts) == 1:
+                raise IntegrityError
+            return bulk_create(tickets)
+
+        with mock.patch.object(
+            Ticket.objects, "bulk_create", bulk_create_after_failure
+        ):
+            order = reserve_seats(
+                {"user": self.user}, self.tickets_data, retries=1
+            )
+
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(Order.objects.get().pk, order.pk)
+        self.assertEqual(order.tickets.count(), 1)
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class ConcurrentReservationTests(TransactionTestCase):
+    """
+    Book seats of one flight from many threads at once. Needs a database
+    with row locks, SQLite only has table locks between connections.
+    """
+
+    thread_count = 8
+
+    def setUp(self):
+        self.flight = sample_flight()
+        self.users = [
+            sample_user(email=f"user{index}@test.com")
+            for index in range(self.thread_count)
+        ]
+
+    def _book_concurrently(self, get_payload):
+        barrier = threading.Barrier(self.thread_count)
+        status_codes = []
+
+        def book(index):
+            client = APIClient()
+            client.force_authenticate(self.users[index])
+            try:
+                barrier.wait()
+                response = client.post(
+                    ORDER_URL, get_payload(index), format="json"
+                )
+                status_codes.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=book, args=(index,))
+            for index in range(self.thread_count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return status_codes
+
+    def test_same_seats_booked_once(self):
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 2, "flight": self.flight.id},
+            ]
+        }
+
+        status_codes = self._book_concurrently(lambda index: payload)
+
+        self.assertEqual(status_codes.count(status.HTTP_201_CREATED), 1)
+        self.assertEqual(
+            status_codes.count(status.HTTP_409_CONFLICT),
+            self.thread_count - 1
+        )
+        self.assertEqual(Ticket.objects.count(), 2)
+        self.flight.refresh_from_db()
+        self.assertEqual(
+            self.flight.seats_available,
+            self.flight.airplane.plane_capacity - 2
+        )
+
+    def test_different_seats_all_booked(self):
+        def get_payload(index):
+            return {
+                "tickets": [
+                    {"row": index + 1, "seat": 1, "flight": self.flight.id}
+                ]
+            }
+
+        status_codes = self._book_concurrently(get_payload)
+
+        self.assertEqual(
+            status_codes, [status.HTTP_201_CREATED] * self.thread_count
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(
+            self.flight.seats_available,
+            self.flight.airplane.plane_capacity - self.thread_count
+        )
@@ -1,10 +1,11 @@
-from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from booking.models import Order
+from booking.models import Order, Ticket
 from booking.serializers import OrderListSerializer, OrderSerializer
 from flight_ops.tests.utils import sample_flight
 from user.tests.utils import sample_user
@@ -66,10 +67,14 @@ class AuthenticatedOrderAPITests(TestCase):
                 {"row": 1, "seat": 1, "flight": self.flight.id}
             ]
         }
-        with self.assertRaises(ValidationError):
-            self.client.post(
-                ORDER_URL, non_unique_payload, format="json"
-            )
+        response = self.client.post(
+            ORDER_URL, non_unique_payload, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(
+            "already taken",
+            str(response.data["tickets"][1]["non_field_errors"])
+        )
 
         non_existent_row_payload = {
             "tickets": [{"row": 40, "seat": 1, "flight": self.flight.id}]
@@ -92,3 +97,55 @@ class AuthenticatedOrderAPITests(TestCase):
             "seat number must be in the available range",
             str(response.data["tickets"][0]["seat"])
         )
+
+    def test_ticket_seat_taken_by_existing_ticket(self):
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            order=Order.objects.create(user=self.user)
+        )
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 2, "flight": self.flight.id},
+                {"row": 1, "seat": 1, "flight": self.flight.id}
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data["conflicts"],
+            [{"flight": self.flight.id, "row": 1, "seat": 1}]
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_create_order_query_count_independent_of_tickets(self):
+        def payload(seats):
+            return {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": self.flight.id}
+                    for row, seat in seats
+                ]
+            }
+
+        with CaptureQueriesContext(connection) as single_ticket_queries:
+            self.client.post(ORDER_URL, payload([(1, 1)]), format="json")
+        with CaptureQueriesContext(connection) as group_queries:
+            response = self.client.post(
+                ORDER_URL,
+                payload([(2, seat) for seat in range(1, 7)] + [(3, 1)]),
+                format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            len(group_queries.captured_queries),
+            len(single_ticket_queries.captured_queries)
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(
+            self.flight.seats_available,
+            self.flight.airplane.plane_capacity - 8
+        )
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework import routers
 
-from .views import OrderViewSet
+from .views import OrderViewSet, SeatHoldViewSet
 
 router = routers.DefaultRouter()
 router.register("orders", OrderViewSet)
+router.register("holds", SeatHoldViewSet)
 
 urlpatterns = [path("", include(router.urls))]
 
@@ -1,9 +1,21 @@
-from rest_framework import viewsets, mixins
+from django.db.models import Prefetch
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-from .models import Order
-from .serializers import OrderSerializer, OrderListSerializer
+from flight_ops.models import Route
+from flight_ops.seat_map import invalidate_seat_maps
+from .models import Order, Ticket, SeatHold
+from .reservations import checkout_holds
+from .serializers import (
+    OrderSerializer,
+    OrderListSerializer,
+    SeatHoldSerializer,
+    HoldCheckoutSerializer,
+)
 
 
 class OrderPagination(PageNumberPagination):
@@ -16,13 +28,20 @@ class OrderViewSet(
     mixins.ListModelMixin,
     mixins.CreateModelMixin
 ):
-    queryset = Order.objects.prefetch_related("tickets__flight")
+    queryset = Order.objects.prefetch_related(
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.select_related(
+                *Route.str_related_fields("flight__route__")
+            ),
+        )
+    )
     pagination_class = OrderPagination
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
         queryset = self.queryset
-        return queryset.filter(user=self.request.user)
+        return queryset.filter(user_id=self.request.user.pk)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -32,3 +51,79 @@ class OrderViewSet(
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @extend_schema(
+        responses={
+            201: OrderSerializer,
+            409: OpenApiResponse(
+                description="Some of the seats are already taken, they are "
+                            "listed under 'conflicts'."
+            ),
+        }
+    )
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+
+class SeatHoldViewSet(
+    viewsets.GenericViewSet,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+):
+    """
+    Hold seats for a while before paying for them. Held seats are neither
+    sold nor available to other users until the holds expire.
+    """
+
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.active().filter(user_id=self.request.user.pk)
+
+    def get_serializer_class(self):
+        if self.action == "checkout":
+            return HoldCheckoutSerializer
+
+        return SeatHoldSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        if isinstance(kwargs.get("data"), list):
+            kwargs["many"] = True
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        invalidate_seat_maps([instance.flight_id])
+
+    @extend_schema(
+        request=SeatHoldSerializer(many=True),
+        responses={
+            201: SeatHoldSerializer(many=True),
+            409: OpenApiResponse(
+                description="Some of the seats are already taken, they are "
+                            "listed under 'conflicts'."
+            ),
+        },
+    )
+    def create(self, request, *args, **kwargs):
+        """Hold one seat or, given a list, all of the seats or none."""
+        return super().create(request, *args, **kwargs)
+
+    @extend_schema(responses={201: OrderSerializer})
+    @action(methods=["POST"], detail=False)
+    def checkout(self, request):
+        """Book the given holds as an order without checking the seats."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order = checkout_holds(
+            request.user, serializer.validated_data["holds"]
+        )
+        return Response(
+            OrderSerializer(order).data, status=status.HTTP_201_CREATED
+        )
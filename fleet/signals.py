@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from airport_api.caching import invalidate_reference_cache
+from .models import AirplaneType
+
+
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_delete, sender=AirplaneType)
+def invalidate_airplane_type_cache(sender, **kwargs):
+    invalidate_reference_cache()
@@ -1,5 +1,6 @@
 from rest_framework import viewsets
 
+from airport_api.caching import ReferenceCacheMixin
 from .models import AirplaneType, Airplane
 from .serializers import (
     AirplaneTypeSerializer,
@@ -9,7 +10,7 @@ from .serializers import (
 )
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+class AirplaneTypeViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FlightOpsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "flight_ops"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,84 @@
+from asgiref.sync import sync_to_async
+
+from airport_api.async_api import (
+    AsyncPageNumberPagination,
+    aget_or_404,
+    async_api_view,
+    json_response,
+)
+from .filters import FlightFilter
+from .models import Route, Flight
+from .serializers import (
+    RouteListSerializer,
+    RouteDetailSerializer,
+    FlightListSerializer,
+    FlightDetailSerializer,
+)
+
+FLIGHTS = Flight.objects.select_related(
+    "route",
+    "route__source",
+    "route__destination"
+)
+ROUTES = Route.objects.select_related("source", "destination")
+
+
+@async_api_view
+async def flight_list(request):
+    """
+    List flights with the filters and page numbers of the flight viewset,
+    answering from the timetable under the same conditions.
+    """
+    flight_filter = FlightFilter(request.GET)
+    pagination = AsyncPageNumberPagination(request)
+
+    flight_ids = await sync_to_async(flight_filter.timetable_flight_ids)()
+    if flight_ids is None:
+        flights = await pagination.paginate_queryset(
+            FlightListSerializer.flat_values(
+                flight_filter.filter(FLIGHTS, with_seats_held=True)
+            )
+        )
+    else:
+        page = flight_ids[pagination.page_slice(len(flight_ids))]
+        rows = {
+            row["id"]: row
+            async for row in FlightListSerializer.flat_values(
+                FLIGHTS.with_seats_held().filter(pk__in=page)
+            ).aiterator()
+        }
+        flights = [rows[pk] for pk in page if pk in rows]
+
+    serializer = FlightListSerializer(flights, many=True)
+    return json_response(pagination.get_paginated_data(serializer.data))
+
+
+@async_api_view
+async def flight_detail(request, pk):
+    flight = await aget_or_404(
+        FlightFilter(request.GET).filter(
+            FLIGHTS.select_related(
+                *Route.str_related_fields("route__"),
+                "airplane__airplane_type",
+            ).prefetch_related("crew")
+        ),
+        pk=pk,
+    )
+    serializer = FlightDetailSerializer(flight, context={"request": request})
+    return json_response(serializer.data)
+
+
+@async_api_view
+async def route_list(request):
+    pagination = AsyncPageNumberPagination(request)
+    routes = await pagination.paginate_queryset(ROUTES)
+    serializer = RouteListSerializer(routes, many=True)
+    return json_response(pagination.get_paginated_data(serializer.data))
+
+
+@async_api_view
+async def route_detail(request, pk):
+    route = await aget_or_404(
+        ROUTES.select_related(*Route.str_related_fields()), pk=pk
+    )
+    return json_response(RouteDetailSerializer(route).data)
@@ -0,0 +1,376 @@
+import random
+import statistics
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.views import APIView
+
+from airport_api import async_api
+from airport_api.caching import invalidate_reference_cache
+from booking.models import Order, Ticket
+from fleet.models import AirplaneType, Airplane
+from location.models import Country, City, Airport
+from .models import Route, Flight
+from .timetable import bump_timetable_version
+
+BATCH_SIZE = 10_000
+SEED_PREFIX = "Seed"
+ORDER_SIZE = 4
+
+
+def percentiles(timings):
+    """Return the p50, p95 and p99 of the timings."""
+    cut_points = statistics.quantiles(timings, n=100, method="inclusive")
+    return cut_points[49], cut_points[94], cut_points[98]
+
+
+def git_commit():
+    """Return the checked out commit to label results with, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextmanager
+def throttling_disabled():
+    """Let the benchmarks send more requests than the rates allow."""
+    with mock.patch.object(
+        APIView, "get_throttles", return_value=[]
+    ), mock.patch.object(async_api, "get_throttles", return_value=[]):
+        yield
+
+
+def seed_flights(count, stdout=None):
+    """
+    Spread the flights over a year between 100 airports so that the
+    date and airport filters have realistic selectivity.
+    """
+    rng = random.Random(0)
+    country, _ = Country.objects.get_or_create(name="Benchmark")
+    city, _ = City.objects.get_or_create(name="Benchmark", country=country)
+    airports = list(Airport.objects.filter(closest_big_city=city)[:100])
+    if len(airports) < 100:
+        airports += Airport.objects.bulk_create(
+            Airport(name=f"Benchmark {index}", closest_big_city=city)
+            for index in range(len(airports), 100)
+        )
+
+    routes = list(Route.objects.filter(source__in=airports))
+    if not routes:
+        routes = Route.objects.bulk_create(
+            Route(source=source, destination=destination, distance=1000)
+            for source in airports
+            for destination in rng.sample(airports, 10)
+            if source != destination
+        )
+
+    airplane_type, _ = AirplaneType.objects.get_or_create(name="Benchmark")
+    airplane, _ = Airplane.objects.get_or_create(
+        name="Benchmark",
+        defaults={
+            "rows": 30,
+            "seats_in_row": 6,
+            "airplane_type": airplane_type,
+        },
+    )
+
+    first_departure = timezone.now().replace(
+        minute=0, second=0, microsecond=0
+    )
+    for batch_start in range(0, count, BATCH_SIZE):
+        batch_end = min(count, batch_start + BATCH_SIZE)
+        flights = []
+        for index in range(batch_start, batch_end):
+            departure_time = first_departure + timedelta(
+                minutes=rng.randrange(365 * 24 * 60)
+            )
+            flights.append(
+                Flight(
+                    number=f"BM{index}",
+                    route=rng.choice(routes),
+                    airplane=airplane,
+                    departure_time=departure_time,
+                    arrival_time=departure_time + timedelta(hours=3),
+                    seats_available=airplane.plane_capacity,
+                )
+            )
+        Flight.objects.bulk_create(flights)
+        if stdout is not None:
+            stdout.write(f"Seeded {batch_end} flights")
+
+    analyze()
+
+
+def seed_connection_network(airports, flights, date, stdout=None):
+    """
+    Spread the flights over one local date between `airports` airports,
+    which are picked with Zipf weights so that a few hubs get most of the
+    traffic like in airline networks. Returns the airport ids, busiest
+    first. The network is seeded once and reused by later runs.
+    """
+    country, _ = Country.objects.get_or_create(name="Connections")
+    city, _ = City.objects.get_or_create(name="Connections", country=country)
+    airport_ids = list(
+        Airport.objects.filter(closest_big_city=city)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    if len(airport_ids) >= airports:
+        return airport_ids[:airports]
+
+    rng = random.Random(0)
+    airport_ids += [
+        airport.pk
+        for airport in Airport.objects.bulk_create(
+            (
+                Airport(name=f"Connections {index}", closest_big_city=city)
+                for index in range(len(airport_ids), airports)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+    ]
+    weights = [1 / (rank + 1) for rank in range(airports)]
+    airplane_type, _ = AirplaneType.objects.get_or_create(name="Benchmark")
+    airplane, _ = Airplane.objects.get_or_create(
+        name="Benchmark",
+        defaults={
+            "rows": 30,
+            "seats_in_row": 6,
+            "airplane_type": airplane_type,
+        },
+    )
+
+    pairs = []
+    while len(pairs) < flights:
+        source_id, destination_id = rng.choices(airport_ids, weights, k=2)
+        if source_id != destination_id:
+            pairs.append((source_id, destination_id))
+    routes = {
+        (route.source_id, route.destination_id): route
+        for route in Route.objects.bulk_create(
+            (
+                Route(
+                    source_id=source_id,
+                    destination_id=destination_id,
+                    distance=1000,
+                )
+                for source_id, destination_id in sorted(set(pairs))
+            ),
+            batch_size=BATCH_SIZE,
+        )
+    }
+    if stdout is not None:
+        stdout.write(f"Seeded {airports} airports and {len(routes)} routes")
+
+    start = timezone.make_aware(datetime.combine(date, datetime.min.time()))
+    batch = []
+    for index, pair in enumerate(pairs):
+        departure_time = start + timedelta(minutes=rng.randrange(24 * 60))
+        batch.append(
+            Flight(
+                number=f"CN{index}",
+                route=routes[pair],
+                airplane=airplane,
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(
+                    minutes=rng.randrange(60, 6 * 60)
+                ),
+                seats_available=airplane.plane_capacity,
+            )
+        )
+    Flight.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+    if stdout is not None:
+        stdout.write(f"Seeded {flights} flights")
+
+    analyze()
+    bump_timetable_version()
+    return airport_ids
+
+
+def analyze():
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+
+def seed_dataset(airports, routes, flights, tickets, users,
+                 batch_size=BATCH_SIZE, stdout=None):
+    """
+    Generate a reproducible dataset: airports spread over cities and
+    countries, random routes between them, flights over the next year on
+    airplanes of different sizes and tickets sold on every flight in orders
+    of up to ORDER_SIZE seats. The seat counters match the tickets.
+
+    Everything is inserted with bulk_create in batches of `batch_size`, so
+    memory stays flat at any volume.
+    """
+    def report(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    if flights and tickets and not users:
+        raise ValueError("Tickets need at least one user.")
+    if flights and not routes:
+        raise ValueError("Flights need at least one route.")
+    if routes > airports * (airports - 1):
+        raise ValueError("Too many routes for the airports.")
+
+    rng = random.Random(0)
+    airplanes = [
+        Airplane(
+            name=f"{SEED_PREFIX} airplane {index}",
+            rows=rng.randrange(20, 41),
+            seats_in_row=rng.choice((4, 6)),
+        )
+        for index in range(max(flights // 10_000, 20))
+    ]
+    tickets_per_flight, extra_tickets = divmod(tickets, flights or 1)
+    if tickets_per_flight + bool(extra_tickets) > min(
+        airplane.plane_capacity for airplane in airplanes
+    ):
+        raise ValueError("Too many tickets for the flights.")
+
+    countries = Country.objects.bulk_create(
+        Country(name=f"{SEED_PREFIX} country {index}")
+        for index in range(max(airports // 100, 1))
+    )
+    cities = City.objects.bulk_create(
+        City(name=f"{SEED_PREFIX} city {index}", country=rng.choice(countries))
+        for index in range(max(airports // 10, 1))
+    )
+    airport_ids = []
+    for batch_start in range(0, airports, batch_size):
+        airport_ids += [
+            airport.pk
+            for airport in Airport.objects.bulk_create(
+                Airport(
+                    name=f"{SEED_PREFIX} airport {index}",
+                    closest_big_city=rng.choice(cities),
+                )
+                for index in range(
+                    batch_start, min(airports, batch_start + batch_size)
+                )
+            )
+        ]
+    report(f"Seeded {airports} airports")
+
+    route_pairs = set()
+    while len(route_pairs) < routes:
+        source_id, destination_id = rng.sample(airport_ids, 2)
+        route_pairs.add((source_id, destination_id))
+    route_ids = []
+    route_pairs = sorted(route_pairs)
+    for batch_start in range(0, routes, batch_size):
+        route_ids += [
+            route.pk
+            for route in Route.objects.bulk_create(
+                Route(
+                    source_id=source_id,
+                    destination_id=destination_id,
+                    distance=rng.randrange(200, 10_000),
+                )
+                for source_id, destination_id in route_pairs[
+                    batch_start:batch_start + batch_size
+                ]
+            )
+        ]
+    report(f"Seeded {routes} routes")
+
+    airplane_types = AirplaneType.objects.bulk_create(
+        AirplaneType(name=f"{SEED_PREFIX} type {index}") for index in range(20)
+    )
+    for airplane in airplanes:
+        airplane.airplane_type = rng.choice(airplane_types)
+    Airplane.objects.bulk_create(airplanes)
+
+    password = make_password(None)
+    user_ids = []
+    for batch_start in range(0, users, batch_size):
+        user_ids += [
+            user.pk
+            for user in get_user_model().objects.bulk_create(
+                get_user_model()(
+                    email=f"seed{index}@example.com", password=password
+                )
+                for index in range(
+                    batch_start, min(users, batch_start + batch_size)
+                )
+            )
+        ]
+    report(f"Seeded {users} users")
+
+    first_departure = timezone.now().replace(
+        minute=0, second=0, microsecond=0
+    )
+    for batch_start in range(0, flights, batch_size):
+        batch_end = min(flights, batch_start + batch_size)
+        batch = []
+        sold = []
+        for index in range(batch_start, batch_end):
+            airplane = rng.choice(airplanes)
+            departure_time = first_departure + timedelta(
+                minutes=rng.randrange(365 * 24 * 60)
+            )
+            sold.append(tickets_per_flight + (index < extra_tickets))
+            batch.append(
+                Flight(
+                    number=f"SD{index}",
+                    route_id=rng.choice(route_ids),
+                    airplane=airplane,
+                    departure_time=departure_time,
+                    arrival_time=departure_time + timedelta(
+                        minutes=rng.randrange(60, 12 * 60)
+                    ),
+                    seats_available=airplane.plane_capacity - sold[-1],
+                )
+            )
+
+        with transaction.atomic():
+            Flight.objects.bulk_create(batch)
+            _seed_tickets(batch, sold, user_ids, rng)
+        report(f"Seeded {batch_end} flights")
+
+    analyze()
+    bump_timetable_version()
+    invalidate_reference_cache()
+
+
+def _seed_tickets(flights, sold, user_ids, rng):
+    """Sell the first seats of every flight in orders of random users."""
+    orders = []
+    seats = []
+    for flight, count in zip(flights, sold):
+        seats_in_row = flight.airplane.seats_in_row
+        for order_start in range(0, count, ORDER_SIZE):
+            orders.append(Order(user_id=rng.choice(user_ids)))
+            seats.append(
+                [
+                    (flight.pk, index // seats_in_row + 1,
+                     index % seats_in_row + 1)
+                    for index in range(
+                        order_start, min(count, order_start + ORDER_SIZE)
+                    )
+                ]
+            )
+
+    Order.objects.bulk_create(orders, batch_size=BATCH_SIZE)
+    Ticket.objects.bulk_create(
+        (
+            Ticket(order_id=order.pk, flight_id=flight_id, row=row, seat=seat)
+            for order, order_seats in zip(orders, seats)
+            for flight_id, row, seat in order_seats
+        ),
+        batch_size=BATCH_SIZE,
+    )
@@ -0,0 +1,200 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+
+from .timetable import timetable, to_epoch
+
+
+class FlightFilter:
+    """
+    The flight list filters read from query parameters, shared by the
+    flight viewset and the async flight views. A parameter that cannot be
+    parsed raises a ValidationError, answered with 400.
+    """
+
+    error_messages = {
+        "source": _("Enter comma-separated airport ids."),
+        "destination": _("Enter comma-separated airport ids."),
+        "airplane_type": _("Enter comma-separated airplane type ids."),
+        "departure_date": _("Enter a date as YYYY-MM-DD."),
+        "arrival_date": _("Enter a date as YYYY-MM-DD."),
+        "departure_after": _("Enter an ISO 8601 date or datetime."),
+        "departure_before": _("Enter an ISO 8601 date or datetime."),
+        "min_seats": _("Enter an integer."),
+    }
+
+    def __init__(self, params):
+        self.params = params
+
+    def parse(self, name, parser):
+        """Read the parameter with `parser`, which raises ValueError."""
+        try:
+            return parser(self.params[name])
+        except (ValueError, OverflowError):
+            raise ValidationError({name: [self.error_messages[name]]})
+
+    @staticmethod
+    def params_to_int(query_str):
+        return [int(str_id) for str_id in query_str.split(",")]
+
+    @staticmethod
+    def date_to_range(query_str):
+        """
+        Turn a date into the half-open [midnight, next midnight) range of the
+        current time zone, so the filter compares the raw column and can use
+        its index instead of casting every row to a date.
+        """
+        date = datetime.strptime(query_str, "%Y-%m-%d").date()
+        return (
+            timezone.make_aware(datetime.combine(date, time.min)),
+            timezone.make_aware(
+                datetime.combine(date + timedelta(days=1), time.min)
+            ),
+        )
+
+    @staticmethod
+    def datetime_from_param(query_str):
+        """
+        Read an ISO datetime, or a date meaning its midnight, in the current
+        time zone unless the value carries an offset.
+        """
+        value = parse_datetime(query_str)
+        if value is None:
+            value = datetime.combine(
+                datetime.strptime(query_str, "%Y-%m-%d").date(), time.min
+            )
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
+    def departure_window(self):
+        """Combine the departure filters into one [start, end) range."""
+        params = self.params
+        start = end = None
+        if params.get("departure_date"):
+            start, end = self.parse("departure_date", self.date_to_range)
+        if params.get("departure_after"):
+            after = self.parse("departure_after", self.datetime_from_param)
+            start = after if start is None else max(start, after)
+        if params.get("departure_before"):
+            before = self.parse("departure_before", self.datetime_from_param)
+            end = before if end is None else min(end, before)
+        return start, end
+
+    def timetable_flight_ids(self):
+        """
+        Find the ids of the matching flights in the in-memory timetable, or
+        return None to query the database. The timetable answers searches
+        within a short departure window, filtered by the columns it stores.
+        """
+        params = self.params
+        if (
+            not settings.FLIGHT_LIST_FROM_TIMETABLE
+            or params.get("min_seats")
+            or params.get("airplane_type")
+        ):
+            return None
+
+        start, end = self.departure_window()
+        if start is None or end is None or end - start > timedelta(
+            days=settings.FLIGHT_LIST_TIMETABLE_MAX_DAYS
+        ):
+            return None
+
+        source_ids = destination_ids = arrival_start = arrival_end = None
+        if params.get("source"):
+            source_ids = set(self.parse("source", self.params_to_int))
+        if params.get("destination"):
+            destination_ids = set(
+                self.parse("destination", self.params_to_int)
+            )
+        if params.get("arrival_date"):
+            arrival_start, arrival_end = map(
+                to_epoch, self.parse("arrival_date", self.date_to_range)
+            )
+
+        return timetable.flight_ids(
+            to_epoch(start),
+            to_epoch(end),
+            source_ids=source_ids,
+            destination_ids=destination_ids,
+            arrival_start=arrival_start,
+            arrival_end=arrival_end,
+        )
+
+    def filter(self, queryset, with_seats_held=False):
+        """
+        Filter the flights by the parameters. The available seats count is
+        read from the counter stored on the flight, so there is no
+        aggregation over tickets, only a count of active seat holds when
+        `with_seats_held` is set or the minimum seats filter needs it. That
+        filter compares the counter first, so only the flights it keeps
+        count their holds.
+        """
+        source = self.params.get("source")
+        destination = self.params.get("destination")
+        departure_date = self.params.get("departure_date")
+        arrival_date = self.params.get("arrival_date")
+        departure_after = self.params.get("departure_after")
+        departure_before = self.params.get("departure_before")
+        min_seats = self.params.get("min_seats")
+        airplane_type = self.params.get("airplane_type")
+
+        if source:
+            source_ids = self.parse("source", self.params_to_int)
+            queryset = queryset.filter(route__source_id__in=source_ids)
+        if destination:
+            destination_ids = self.parse("destination", self.params_to_int)
+            queryset = queryset.filter(
+                route__destination_id__in=destination_ids
+            )
+
+        if departure_date:
+            dep_start, dep_end = self.parse(
+                "departure_date", self.date_to_range
+            )
+            queryset = queryset.filter(
+                departure_time__gte=dep_start, departure_time__lt=dep_end
+            )
+        if arrival_date:
+            arr_start, arr_end = self.parse(
+                "arrival_date", self.date_to_range
+            )
+            queryset = queryset.filter(
+                arrival_time__gte=arr_start, arrival_time__lt=arr_end
+            )
+        if departure_after:
+            queryset = queryset.filter(
+                departure_time__gte=self.parse(
+                    "departure_after", self.datetime_from_param
+                )
+            )
+        if departure_before:
+            queryset = queryset.filter(
+                departure_time__lt=self.parse(
+                    "departure_before", self.datetime_from_param
+                )
+            )
+
+        if airplane_type:
+            airplane_type_ids = self.parse(
+                "airplane_type", self.params_to_int
+            )
+            queryset = queryset.filter(
+                airplane__airplane_type_id__in=airplane_type_ids
+            )
+
+        if with_seats_held or min_seats:
+            queryset = queryset.with_seats_held()
+        if min_seats:
+            min_seats = self.parse("min_seats", int)
+            queryset = queryset.filter(
+                seats_available__gte=min_seats
+            ).filter(seats_available__gte=F("seats_held") + min_seats)
+
+        return queryset
@@ -0,0 +1,241 @@
+import json
+import random
+import statistics
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from airport_api.metrics import RequestSample
+from booking.models import Order
+from flight_ops.benchmarking import (
+    git_commit,
+    percentiles,
+    throttling_disabled,
+)
+from flight_ops.models import Route, Flight
+from location.models import Airport
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the key API endpoints through the Django test client against "
+        "the current database, e.g. one seeded with `seed_benchmark`, and "
+        "print their throughput, latency percentiles and query counts as "
+        "JSON. Writes are rolled back and throttling is off while "
+        "benchmarking."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=200,
+            help="Number of timed requests per endpoint.",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=10,
+            help="Number of untimed requests per endpoint.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results to this file instead of the output.",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Results of an earlier run to report the changes against.",
+        )
+
+    def handle(self, *args, **options):
+        if options["runs"] < 2:
+            raise CommandError("At least 2 runs are needed for percentiles.")
+
+        if not (Order.objects.exists() and Flight.objects.exists()):
+            raise CommandError("No data to benchmark, use seed_benchmark.")
+
+        rng = random.Random(0)
+        order = Order.objects.select_related("user").get(
+            pk=self._sample_ids(Order, rng, count=1)[0]
+        )
+        self.flight_ids = self._sample_ids(Flight, rng)
+        self.route_ids = self._sample_ids(Route, rng)
+        sample = Flight.objects.select_related("route").get(
+            pk=self.flight_ids[0]
+        )
+        date = timezone.localtime(sample.departure_time).date()
+
+        host = (settings.ALLOWED_HOSTS or ["localhost"])[0].lstrip(".")
+        token = RefreshToken.for_user(order.user).access_token
+        self.client = Client(
+            HTTP_HOST=host, HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+
+        endpoints = {
+            "flight list": lambda: ("get", reverse("flight-ops:flight-list")),
+            "flight list, filtered": lambda: (
+                "get",
+                reverse("flight-ops:flight-list")
+                + f"?source={sample.route.source_id}"
+                  f"&departure_date={date.isoformat()}",
+            ),
+            "flight retrieve": lambda: (
+                "get",
+                reverse(
+                    "flight-ops:flight-detail",
+                    args=[rng.choice(self.flight_ids)],
+                ),
+            ),
+            "flight seat map": lambda: (
+                "get",
+                reverse(
+                    "flight-ops:flight-seat-map",
+                    args=[rng.choice(self.flight_ids)],
+                ),
+            ),
+            "route list": lambda: ("get", reverse("flight-ops:route-list")),
+            "route retrieve": lambda: (
+                "get",
+                reverse(
+                    "flight-ops:route-detail",
+                    args=[rng.choice(self.route_ids)],
+                ),
+            ),
+            "airport list": lambda: ("get", reverse("location:airport-list")),
+            "order list": lambda: ("get", reverse("booking:order-list")),
+            "order create": lambda: (
+                "post",
+                reverse("booking:order-list"),
+                self._order_payload(rng),
+            ),
+        }
+
+        results = {
+            "commit": git_commit(),
+            "database": connection.vendor,
+            "dataset": {
+                "airports": Airport.objects.count(),
+                "routes": Route.objects.count(),
+                "flights": Flight.objects.count(),
+            },
+            "runs": options["runs"],
+            "endpoints": {},
+        }
+        with throttling_disabled():
+            for name, build_request in endpoints.items():
+                results["endpoints"][name] = self._benchmark(
+                    build_request, options["runs"], options["warmup"]
+                )
+
+        content = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(content + "\n")
+        else:
+            self.stdout.write(content)
+
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                self._compare(json.load(f), results)
+
+    @staticmethod
+    def _sample_ids(model, rng, count=100):
+        """
+        Pick up to `count` random existing ids by probing the id range,
+        which unlike ORDER BY random() does not scan the table.
+        """
+        max_id = model.objects.aggregate(Max("pk"))["pk__max"]
+        ids = set(
+            model.objects.filter(
+                pk__in=[rng.randint(1, max_id) for _ in range(count * 2)]
+            ).values_list("pk", flat=True)[:count]
+        )
+        if not ids:
+            ids = set(model.objects.values_list("pk", flat=True)[:count])
+        return sorted(ids)
+
+    def _order_payload(self, rng):
+        """Book the last seat of a random flight, which the seed leaves free."""
+        flight = Flight.objects.select_related("airplane").get(
+            pk=rng.choice(self.flight_ids)
+        )
+        return {
+            "tickets": [
+                {
+                    "flight": flight.pk,
+                    "row": flight.airplane.rows,
+                    "seat": flight.airplane.seats_in_row,
+                }
+            ]
+        }
+
+    def _request(self, method, url, data=None):
+        """
+        Send one request and roll back whatever it wrote, so that every run
+        starts from the same data. Returns the status, latency in
+        milliseconds and query count.
+        """
+        sample = RequestSample()
+        with transaction.atomic():
+            with connection.execute_wrapper(sample.execute):
+                started = time.perf_counter()
+                if data is None:
+                    response = getattr(self.client, method)(url)
+                else:
+                    response = getattr(self.client, method)(
+                        url, data, content_type="application/json"
+                    )
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return response.status_code, elapsed * 1000, sample.queries
+
+    def _benchmark(self, build_request, runs, warmup):
+        for _ in range(warmup):
+            self._request(*build_request())
+
+        timings, queries, statuses = [], [], Counter()
+        for _ in range(runs):
+            status_code, elapsed, query_count = self._request(
+                *build_request()
+            )
+            timings.append(elapsed)
+            queries.append(query_count)
+            statuses[str(status_code)] += 1
+
+        p50, p95, p99 = percentiles(timings)
+        return {
+            "requests_per_second": round(1000 * runs / sum(timings), 1),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "p50_ms": round(p50, 3),
+            "p95_ms": round(p95, 3),
+            "p99_ms": round(p99, 3),
+            "queries_min": min(queries),
+            "queries_max": max(queries),
+            "statuses": dict(statuses),
+        }
+
+    def _compare(self, baseline, results):
+        """Write the changes of p50, p95 and queries to standard error."""
+        self.stderr.write(
+            f"Changes since {baseline.get('commit') or 'the baseline'}:"
+        )
+        for name, current in results["endpoints"].items():
+            previous = baseline["endpoints"].get(name)
+            if previous is None:
+                continue
+            changes = ", ".join(
+                f"{key} {previous[key]} -> {current[key]} "
+                f"({(current[key] / previous[key] - 1) * 100:+.1f}%)"
+                if previous[key]
+                else f"{key} {previous[key]} -> {current[key]}"
+                for key in ("p50_ms", "p95_ms", "queries_max")
+            )
+            self.stderr.write(f"{name}: {changes}")
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.urls import reverse
+from django.utils import timezone
+
+from flight_ops.benchmarking import (
+    git_commit,
+    percentiles,
+    throttling_disabled,
+)
+from flight_ops.models import Route, Flight
+from location.models import Airport
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sync DRF views with their async versions under "
+        "concurrency. Requests go through the ASGI application in process, "
+        "as under uvicorn with one worker, and the results are printed as "
+        "JSON. Use --query-delay to add the network round trip of a remote "
+        "database to every query."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Number of requests per endpoint and concurrency level.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            nargs="+",
+            default=[1, 10, 50],
+            help="Numbers of requests in flight at once.",
+        )
+        parser.add_argument(
+            "--query-delay",
+            type=float,
+            default=0,
+            help="Milliseconds to wait before every query.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results to this file instead of the output.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2:
+            raise CommandError("At least 2 requests are needed.")
+
+        flight = Flight.objects.select_related("route").first()
+        route = Route.objects.first()
+        airport = Airport.objects.first()
+        if None in (flight, route, airport):
+            raise CommandError("No data to benchmark, use seed_benchmark.")
+        search = (
+            f"?source={flight.route.source_id}&departure_date="
+            f"{timezone.localtime(flight.departure_time).date().isoformat()}"
+        )
+
+        endpoints = {
+            "flight list": (
+                reverse("flight-ops:flight-list"),
+                reverse("flight-ops:flight-async-list"),
+            ),
+            "flight search": (
+                reverse("flight-ops:flight-list") + search,
+                reverse("flight-ops:flight-async-list") + search,
+            ),
+            "flight retrieve": (
+                reverse("flight-ops:flight-detail", args=[flight.pk]),
+                reverse("flight-ops:flight-async-detail", args=[flight.pk]),
+            ),
+            "route retrieve": (
+                reverse("flight-ops:route-detail", args=[route.pk]),
+                reverse("flight-ops:route-async-detail", args=[route.pk]),
+            ),
+            "airport list": (
+                reverse("location:airport-list"),
+                reverse("location:airport-async-list"),
+            ),
+        }
+
+        delay = options["query_delay"] / 1000
+
+        def delay_queries(sender, connection, **kwargs):
+            def delayed(execute, sql, params, many, context):
+                time.sleep(delay)
+                return execute(sql, params, many, context)
+
+            connection.execute_wrappers.append(delayed)
+
+        if delay:
+            connection_created.connect(delay_queries)
+            connection.close()
+
+        results = {
+            "commit": git_commit(),
+            "database": connection.vendor,
+            "query_delay_ms": options["query_delay"],
+            "requests": options["requests"],
+            "endpoints": {},
+        }
+        try:
+            with throttling_disabled():
+                for name, urls in endpoints.items():
+                    results["endpoints"][name] = {
+                        mode: {
+                            str(concurrency): asyncio.run(
+                                self._benchmark(
+                                    url, concurrency, options["requests"]
+                                )
+                            )
+                            for concurrency in options["concurrency"]
+                        }
+                        for mode, url in zip(("sync", "async"), urls)
+                    }
+        finally:
+            connection_created.disconnect(delay_queries)
+
+        content = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(content + "\n")
+        else:
+            self.stdout.write(content)
+
+    @staticmethod
+    async def _request(application, url, host):
+        """
+        Send a GET through the ASGI application as a server would and
+        return the response status.
+        """
+        path, _, query_string = url.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query_string.encode(),
+            "headers": [(b"host", host.encode())],
+            "client": ("127.0.0.1", 0),
+            "server": (host, 80),
+        }
+        disconnected = asyncio.Event()
+        request_sent = False
+        status = None
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b""}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await application(scope, receive, send)
+        disconnected.set()
+        return status
+
+    async def _benchmark(self, url, concurrency, requests):
+        application = get_asgi_application()
+        host = (settings.ALLOWED_HOSTS or ["localhost"])[0].lstrip(".")
+        semaphore = asyncio.Semaphore(concurrency)
+        timings, statuses = [], Counter()
+
+        async def send():
+            async with semaphore:
+                started = time.perf_counter()
+                status = await self._request(application, url, host)
+                timings.append((time.perf_counter() - started) * 1000)
+                statuses[str(status)] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+        p50, p95, p99 = percentiles(timings)
+        return {
+            "requests_per_second": round(requests / elapsed, 1),
+            "p50_ms": round(p50, 3),
+            "p95_ms": round(p95, 3),
+            "p99_ms": round(p99, 3),
+            "statuses": dict(statuses),
+        }
@@ -0,0 +1,126 @@
+import json
+import random
+import statistics
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from flight_ops.benchmarking import (
+    git_commit,
+    percentiles,
+    seed_connection_network,
+)
+from flight_ops.timetable import Timetable, date_range, to_epoch
+
+HUBS = 10
+DAY = 24 * 60 * 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Time connection searches over the in-memory timetable of one day "
+        "of a hub-and-spoke network, between the busiest airports and "
+        "between random ones, and print the results as JSON. The network "
+        "is seeded on the first run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--airports",
+            type=int,
+            default=2000,
+            help="Number of airports of the network.",
+        )
+        parser.add_argument(
+            "--flights",
+            type=int,
+            default=60_000,
+            help="Number of flights seeded on the date.",
+        )
+        parser.add_argument(
+            "--date",
+            type=date.fromisoformat,
+            default=date(2030, 1, 15),
+            help="Local date the flights depart on.",
+        )
+        parser.add_argument(
+            "--searches",
+            type=int,
+            default=100,
+            help="Number of timed searches per scenario.",
+        )
+        parser.add_argument(
+            "--max-legs", type=int, default=3, choices=(1, 2, 3)
+        )
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument(
+            "--output",
+            help="Write the results to this file instead of the output.",
+        )
+
+    def handle(self, *args, **options):
+        if options["airports"] < HUBS * 2:
+            raise CommandError(f"At least {HUBS * 2} airports are needed.")
+        if options["searches"] < 2:
+            raise CommandError("At least 2 searches are needed.")
+
+        airport_ids = seed_connection_network(
+            options["airports"],
+            options["flights"],
+            options["date"],
+            stdout=self.stdout,
+        )
+        rng = random.Random(0)
+        scenarios = {
+            "hub to hub": airport_ids[:HUBS],
+            "any to any": airport_ids,
+        }
+
+        timetable = Timetable()
+        start, end = map(to_epoch, date_range(options["date"]))
+        started = time.perf_counter()
+        timetable.refresh()
+        # Load the partitions of the date and of the arrivals after it
+        list(timetable.departures(airport_ids[0], start, end + 2 * DAY))
+        results = {
+            "commit": git_commit(),
+            "airports": options["airports"],
+            "flights": options["flights"],
+            "load_ms": round((time.perf_counter() - started) * 1000, 1),
+            "scenarios": {},
+        }
+        for name, candidates in scenarios.items():
+            timings, found = [], []
+            for _ in range(options["searches"]):
+                source_id, destination_id = rng.sample(candidates, 2)
+                started = time.perf_counter()
+                itineraries = timetable.search(
+                    source_id,
+                    destination_id,
+                    start,
+                    end,
+                    max_legs=options["max_legs"],
+                    min_layover=45 * 60,
+                    max_layover=6 * 60 * 60,
+                    limit=options["limit"],
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+                found.append(len(itineraries))
+
+            p50, p95, p99 = percentiles(timings)
+            results["scenarios"][name] = {
+                "itineraries": round(statistics.fmean(found), 1),
+                "mean_ms": round(statistics.fmean(timings), 2),
+                "p50_ms": round(p50, 2),
+                "p95_ms": round(p95, 2),
+                "p99_ms": round(p99, 2),
+                "max_ms": round(max(timings), 2),
+            }
+
+        content = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(content + "\n")
+        else:
+            self.stdout.write(content)
@@ -0,0 +1,141 @@
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from airport_api.renderers import FastJSONRenderer, orjson
+from flight_ops.benchmarking import percentiles, seed_flights
+from flight_ops.models import Flight
+from flight_ops.serializers import FlightListSerializer
+from flight_ops.views import FlightViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rendering a flight list page through model instances with "
+        "the flat values() rows of FlightListSerializer, checking that both "
+        "produce the same JSON, then the throughput of the JSON renderers "
+        "and the memory of exporting every flight with and without "
+        "streaming."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed-flights",
+            type=int,
+            default=0,
+            help="Insert this many random flights before benchmarking.",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=100,
+            help="Number of flights rendered per run.",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=50,
+            help="Number of timed runs per serialization path.",
+        )
+
+    def handle(self, *args, **options):
+        if options["runs"] < 2:
+            raise CommandError("At least 2 runs are needed for percentiles.")
+
+        if options["seed_flights"]:
+            seed_flights(options["seed_flights"], self.stdout)
+
+        queryset = Flight.objects.select_related(
+            "route", "route__source", "route__destination"
+        ).with_seats_held()
+        page_size = options["page_size"]
+        paths = {
+            "model instances": lambda: queryset[:page_size],
+            "values() rows": lambda: FlightListSerializer.flat_values(
+                queryset
+            )[:page_size],
+        }
+
+        outputs = {}
+        for name, get_page in paths.items():
+            timings = []
+            for _ in range(options["runs"]):
+                started = time.perf_counter()
+                content = JSONRenderer().render(
+                    FlightListSerializer(get_page(), many=True).data
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+            outputs[name] = content
+
+            p50, p95, p99 = percentiles(timings)
+            self.stdout.write(
+                f"{name}: p50 {p50:.2f} ms, p95 {p95:.2f} ms, "
+                f"p99 {p99:.2f} ms"
+            )
+
+        if len(set(outputs.values())) != 1:
+            raise CommandError("The serialization paths render differently.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Both paths rendered the same {len(content)} bytes."
+            )
+        )
+
+        self._benchmark_renderers(queryset, page_size, options["runs"])
+        self._benchmark_export()
+
+    def _benchmark_renderers(self, queryset, page_size, runs):
+        data = FlightListSerializer(
+            FlightListSerializer.flat_values(queryset)[:page_size], many=True
+        ).data
+        renderers = {
+            "DRF JSONRenderer": JSONRenderer(),
+            "FastJSONRenderer "
+            f"({'orjson' if orjson else 'stdlib fallback'})":
+                FastJSONRenderer(),
+        }
+        for name, renderer in renderers.items():
+            started = time.perf_counter()
+            for _ in range(runs):
+                renderer.render(data)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{name}: {len(data) * runs / elapsed:,.0f} rows/s"
+            )
+
+    def _benchmark_export(self):
+        """Export every flight as one unpaginated response and as a stream."""
+        user = get_user_model()(is_staff=True)
+        exports = {
+            "one response": (
+                FlightViewSet.as_view({"get": "list"}, pagination_class=None),
+                {},
+            ),
+            "streaming": (
+                FlightViewSet.as_view({"get": "list"}),
+                {"stream": "true"},
+            ),
+        }
+        for name, (view, params) in exports.items():
+            request = APIRequestFactory().get("/", params)
+            force_authenticate(request, user)
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            response = view(request)
+            if response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.render().content)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.stdout.write(
+                f"Export, {name}: {size:,} bytes in {elapsed:.2f} s, "
+                f"peak memory {peak / 2 ** 20:.1f} MiB"
+            )
@@ -0,0 +1,105 @@
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from flight_ops.benchmarking import percentiles, seed_flights
+from flight_ops.models import Flight
+
+
+class Command(BaseCommand):
+    help = (
+        "Print EXPLAIN plans and latency percentiles of the flight search "
+        "filters, comparing the __date casts with half-open range "
+        "predicates. Run it before and after `migrate flight_ops 0004` to "
+        "compare the plans with and without the search indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed-flights",
+            type=int,
+            default=0,
+            help="Insert this many random flights before benchmarking, "
+                 "e.g. 1000000.",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=50,
+            help="Number of timed runs per query.",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run EXPLAIN ANALYZE instead of a plain EXPLAIN.",
+        )
+
+    def handle(self, *args, **options):
+        if options["runs"] < 2:
+            raise CommandError("At least 2 runs are needed for percentiles.")
+
+        if options["seed_flights"]:
+            seed_flights(options["seed_flights"], self.stdout)
+
+        sample = Flight.objects.select_related("route").order_by("?").first()
+        if sample is None:
+            raise CommandError("No flights to search, use --seed-flights.")
+
+        source_id = sample.route.source_id
+        destination_id = sample.route.destination_id
+        date = timezone.localtime(sample.departure_time).date()
+        start = timezone.make_aware(
+            datetime.combine(date, datetime.min.time())
+        )
+        end = start + timedelta(days=1)
+
+        scenarios = {
+            "departure date, __date cast": Flight.objects.filter(
+                departure_time__date=date
+            ),
+            "departure date, range": Flight.objects.filter(
+                departure_time__gte=start, departure_time__lt=end
+            ),
+            "source and date, __date cast": Flight.objects.filter(
+                route__source_id__in=[source_id],
+                departure_time__date=date,
+            ),
+            "source and date, range": Flight.objects.filter(
+                route__source_id__in=[source_id],
+                departure_time__gte=start,
+                departure_time__lt=end,
+            ),
+            "source and destination": Flight.objects.filter(
+                route__source_id__in=[source_id],
+                route__destination_id__in=[destination_id],
+            ),
+        }
+
+        self.stdout.write(
+            f"Database: {connection.vendor}, "
+            f"flights: {Flight.objects.count()}"
+        )
+        explain_options = {"analyze": True} if options["analyze"] else {}
+        for name, queryset in scenarios.items():
+            queryset = queryset.select_related(
+                "route", "route__source", "route__destination"
+            )
+            page = queryset[:10]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}"))
+            self.stdout.write(page.explain(**explain_options))
+
+            timings = []
+            for _ in range(options["runs"]):
+                started = time.perf_counter()
+                list(page.all())
+                timings.append((time.perf_counter() - started) * 1000)
+
+            p50, p95, _ = percentiles(timings)
+            self.stdout.write(
+                f"p50 {p50:.2f} ms, "
+                f"p95 {p95:.2f} ms, "
+                f"max {max(timings):.2f} ms"
+            )
@@ -0,0 +1,139 @@
+import http.client
+import json
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from flight_ops.benchmarking import git_commit, percentiles
+from flight_ops.models import Route, Flight
+
+
+class Command(BaseCommand):
+    help = (
+        "Send concurrent requests to a running server, e.g. runserver or "
+        "gunicorn with different DB_* settings, and print its throughput "
+        "and latency percentiles as JSON. The server must share this "
+        "database and allow the request rate, see THROTTLE_ANON_RATE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://localhost:8000",
+            help="Address of the server.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="Number of requests per endpoint.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=10,
+            help="Number of clients sending requests at once.",
+        )
+        parser.add_argument(
+            "--label",
+            help="Name of the server setup to record with the results.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results to this file instead of the output.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2:
+            raise CommandError("At least 2 requests are needed.")
+
+        url = urlsplit(options["url"])
+        if url.scheme != "http" or not url.hostname:
+            raise CommandError(f"Invalid server URL {options['url']!r}.")
+        self.address = (url.hostname, url.port or 80)
+        self.local = threading.local()
+
+        flight_ids = list(Flight.objects.values_list("pk", flat=True)[:100])
+        route_ids = list(Route.objects.values_list("pk", flat=True)[:100])
+        if not (flight_ids and route_ids):
+            raise CommandError("No data to benchmark, use seed_benchmark.")
+        rng = random.Random(0)
+
+        endpoints = {
+            "flight list": lambda: reverse("flight-ops:flight-list"),
+            "flight retrieve": lambda: reverse(
+                "flight-ops:flight-detail", args=[rng.choice(flight_ids)]
+            ),
+            "route retrieve": lambda: reverse(
+                "flight-ops:route-detail", args=[rng.choice(route_ids)]
+            ),
+            "airport list": lambda: reverse("location:airport-list"),
+        }
+
+        results = {
+            "commit": git_commit(),
+            "label": options["label"],
+            "url": options["url"],
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "endpoints": {},
+        }
+        for name, build_path in endpoints.items():
+            paths = [build_path() for _ in range(options["requests"])]
+            results["endpoints"][name] = self._benchmark(
+                paths, options["concurrency"]
+            )
+
+        content = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(content + "\n")
+        else:
+            self.stdout.write(content)
+
+    def _request(self, path):
+        """
+        Send a GET over the keep-alive connection of this client thread.
+        Returns the status and latency in milliseconds.
+        """
+        if getattr(self.local, "connection", None) is None:
+            self.local.connection = http.client.HTTPConnection(
+                *self.address, timeout=30
+            )
+        started = time.perf_counter()
+        try:
+            self.local.connection.request("GET", path)
+            response = self.local.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.local.connection.close()
+            self.local.connection = None
+            return "error", (time.perf_counter() - started) * 1000
+        if response.will_close:
+            self.local.connection.close()
+            self.local.connection = None
+        return response.status, (time.perf_counter() - started) * 1000
+
+    def _benchmark(self, paths, concurrency):
+        with ThreadPoolExecutor(concurrency) as executor:
+            # Open the connections and let the workers start first
+            list(executor.map(self._request, paths[:concurrency]))
+            started = time.perf_counter()
+            responses = list(executor.map(self._request, paths))
+            elapsed = time.perf_counter() - started
+
+        timings = [elapsed_ms for _, elapsed_ms in responses]
+        p50, p95, p99 = percentiles(timings)
+        return {
+            "requests_per_second": round(len(paths) / elapsed, 1),
+            "p50_ms": round(p50, 3),
+            "p95_ms": round(p95, 3),
+            "p99_ms": round(p99, 3),
+            "statuses": dict(Counter(str(status) for status, _ in responses)),
+        }
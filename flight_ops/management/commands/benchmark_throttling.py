@@ -0,0 +1,113 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from rest_framework import throttling
+
+from airport_api.throttling import AnonRateThrottle
+from flight_ops.benchmarking import git_commit, percentiles
+from airport_api.models import ThrottleWindow
+
+THROTTLES = {
+    "drf history, cache": (throttling.AnonRateThrottle, None),
+    "sliding window, cache": (
+        AnonRateThrottle,
+        "airport_api.throttling.CacheThrottleBackend",
+    ),
+    "sliding window, database": (
+        AnonRateThrottle,
+        "airport_api.throttling.DatabaseThrottleBackend",
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the throttle check of one client sending requests at a rate "
+        "close to its limit, for DRF's request history throttle and the "
+        "sliding window throttle with each backend, and print the results "
+        "as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=5000,
+            help="Number of requests checked per throttle.",
+        )
+        parser.add_argument(
+            "--rate",
+            default="5000/hour",
+            help="Throttle rate, the history of DRF's throttle grows with it.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results to this file instead of the output.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2:
+            raise CommandError("At least 2 requests are needed.")
+        try:
+            throttling.SimpleRateThrottle.parse_rate(None, options["rate"])
+        except (ValueError, KeyError):
+            raise CommandError(f"Invalid rate {options['rate']!r}.")
+
+        results = {
+            "commit": git_commit(),
+            "rate": options["rate"],
+            "requests": options["requests"],
+            "throttles": {},
+        }
+        for name, (throttle_class, backend) in THROTTLES.items():
+            overrides = {"THROTTLE_BACKEND": backend} if backend else {}
+            with override_settings(**overrides):
+                results["throttles"][name] = self._benchmark(
+                    throttle_class, options["rate"], options["requests"]
+                )
+
+        content = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(content + "\n")
+        else:
+            self.stdout.write(content)
+
+    @staticmethod
+    def _benchmark(throttle_class, rate, requests):
+        request = RequestFactory().get("/", REMOTE_ADDR="192.0.2.1")
+        request.user = None
+        num_requests, duration = throttling.SimpleRateThrottle.parse_rate(
+            None, rate
+        )
+        # Spread the requests over the duration, so that nearly all of
+        # them are allowed and kept in the history
+        interval = duration / num_requests * 1.01
+        caches["default"].clear()
+        caches[settings.THROTTLE_CACHE_ALIAS].clear()
+        ThrottleWindow.objects.filter(key__contains="192.0.2.1").delete()
+
+        timings, allowed = [], 0
+        for index in range(requests):
+            throttle = throttle_class()
+            throttle.rate = rate
+            throttle.num_requests, throttle.duration = num_requests, duration
+            throttle.timer = lambda: 1_000_000 + index * interval
+            started = time.perf_counter()
+            allowed += throttle.allow_request(request, None)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+
+        ThrottleWindow.objects.filter(key__contains="192.0.2.1").delete()
+        p50, p95, p99 = percentiles(timings)
+        return {
+            "allowed": allowed,
+            "mean_us": round(statistics.fmean(timings), 1),
+            "p50_us": round(p50, 1),
+            "p95_us": round(p95, 1),
+            "p99_us": round(p99, 1),
+        }
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from flight_ops.models import Flight
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the stored seats_available counters with the tickets sold "
+        "and fix the flights that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute the counter of every flight.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the drifted flights.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"] and not options["dry_run"]:
+            with transaction.atomic():
+                count = Flight.objects.rebuild_seats_available()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Rebuilt seat counters of {count} flights."
+                )
+            )
+            return
+
+        with transaction.atomic():
+            drifted = (
+                Flight.objects.select_for_update()
+                .with_expected_seats_available()
+                .exclude(seats_available=F("expected_seats_available"))
+                .values_list(
+                    "id",
+                    "number",
+                    "seats_available",
+                    "expected_seats_available",
+                )
+            )
+            drifted_ids = []
+            for flight_id, number, stored, expected in drifted:
+                drifted_ids.append(flight_id)
+                self.stdout.write(
+                    f"Flight {number} (id {flight_id}): "
+                    f"stored {stored}, expected {expected}"
+                )
+
+            if drifted_ids and not options["dry_run"]:
+                Flight.objects.filter(
+                    pk__in=drifted_ids
+                ).rebuild_seats_available()
+
+        action = "Found" if options["dry_run"] else "Reconciled"
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} {len(drifted_ids)} drifted flights.")
+        )
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from flight_ops.benchmarking import BATCH_SIZE, SEED_PREFIX, seed_dataset
+from location.models import Country
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a reproducible benchmark dataset with bulk inserts. The "
+        "defaults generate production volumes: 10k airports, 100k routes, "
+        "5M flights and 50M tickets, which takes a while."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--airports", type=int, default=10_000)
+        parser.add_argument("--routes", type=int, default=100_000)
+        parser.add_argument("--flights", type=int, default=5_000_000)
+        parser.add_argument("--tickets", type=int, default=50_000_000)
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Number of rows inserted per statement.",
+        )
+
+    def handle(self, *args, **options):
+        if min(options["airports"], options["batch_size"]) < 2:
+            raise CommandError("Seed at least 2 airports in batches of 2.")
+        if Country.objects.filter(
+            name__startswith=f"{SEED_PREFIX} country "
+        ).exists():
+            raise CommandError("The benchmark dataset is already seeded.")
+
+        started = time.perf_counter()
+        try:
+            seed_dataset(
+                airports=options["airports"],
+                routes=options["routes"],
+                flights=options["flights"],
+                tickets=options["tickets"],
+                users=options["users"],
+                batch_size=options["batch_size"],
+                stdout=self.stdout,
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded the benchmark dataset in "
+                f"{time.perf_counter() - started:.0f} s."
+            )
+        )
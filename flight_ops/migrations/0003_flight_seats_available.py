@@ -0,0 +1,45 @@
+# Generated by Django 5.1 on 2026-10-18 19:35
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Count
+from django.db.models.functions import Coalesce
+
+
+def fill_seats_available(apps, schema_editor):
+    Airplane = apps.get_model("fleet", "Airplane")
+    Flight = apps.get_model("flight_ops", "Flight")
+    Ticket = apps.get_model("booking", "Ticket")
+
+    tickets_sold = (
+        Ticket.objects.filter(flight=OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    capacity = (
+        Airplane.objects.filter(pk=OuterRef("airplane"))
+        .annotate(capacity=F("rows") * F("seats_in_row"))
+        .values("capacity")
+    )
+    Flight.objects.update(
+        seats_available=Subquery(capacity) - Coalesce(Subquery(tickets_sold), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0002_alter_ticket_order"),
+        ("fleet", "0002_alter_airplanetype_table"),
+        ("flight_ops", "0002_alter_flight_route"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="seats_available",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_seats_available, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fleet", "0002_alter_airplanetype_table"),
+        ("flight_ops", "0004_flight_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["number", "departure_time"], name="flight_number_departure_idx"
+            ),
+        ),
+    ]
@@ -1,9 +1,16 @@
+from collections import defaultdict
+
+from django.apps import apps
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F, Case, When, Value, OuterRef, Subquery, Count
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.translation import gettext as _
 
 from fleet.models import Airplane
 from location.models import Airport
+from .seat_map import invalidate_seat_maps
 
 
 class Crew(models.Model):
@@ -30,6 +37,14 @@ class Route(models.Model):
     )
     distance = models.IntegerField()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["source", "destination"],
+                name="route_source_destination_idx",
+            ),
+        ]
+
     @staticmethod
     def validate_source_and_destination(source, destination, error_to_raise):
         if source.id == destination.id:
@@ -37,6 +52,17 @@ class Route(models.Model):
                 _("Source and destination airports must be different.")
             )
 
+    @staticmethod
+    def str_related_fields(prefix=""):
+        """
+        Return the select_related() lookups that __str__ follows down to the
+        countries of both airports, each under the given relation prefix.
+        """
+        return [
+            f"{prefix}{airport}__closest_big_city__country"
+            for airport in ("source", "destination")
+        ]
+
     def clean(self):
         Route.validate_source_and_destination(
             self.source,
@@ -61,6 +87,101 @@ class Route(models.Model):
         return f"from {self.source} to {self.destination} ({self.distance} km)"
 
 
+class FlightQuerySet(models.QuerySet):
+    def adjust_seats_available(self, deltas):
+        """
+        Shift the stored seats_available counters by per-flight deltas,
+        e.g. {flight_id: -2}, in a single UPDATE statement.
+
+        Every ticket write goes through here, so the cached seat maps of the
+        flights are dropped as well.
+        """
+        deltas = {
+            flight_id: delta for flight_id, delta in deltas.items() if delta
+        }
+        if not deltas:
+            return 0
+
+        invalidate_seat_maps(deltas)
+        return self.filter(pk__in=deltas).update(
+            seats_available=F("seats_available") + Case(
+                *[
+                    When(pk=flight_id, then=Value(delta))
+                    for flight_id, delta in deltas.items()
+                ],
+                default=Value(0),
+            )
+        )
+
+    def set_crew(self, crew_ids):
+        """
+        Make the crew of the flights the given sets, e.g. {flight_id:
+        {crew_id}}, with one read, delete and insert. Only the crew rows
+        that changed are written.
+        """
+        through = self.model.crew.through
+        current_crew_ids = defaultdict(set)
+        removed = []
+        for pk, flight_id, crew_id in through.objects.filter(
+            flight_id__in=crew_ids
+        ).values_list("pk", "flight_id", "crew_id"):
+            if crew_id in crew_ids[flight_id]:
+                current_crew_ids[flight_id].add(crew_id)
+            else:
+                removed.append(pk)
+
+        through.objects.filter(pk__in=removed).delete()
+        through.objects.bulk_create(
+            through(flight_id=flight_id, crew_id=crew_id)
+            for flight_id, flight_crew_ids in crew_ids.items()
+            for crew_id in flight_crew_ids - current_crew_ids[flight_id]
+        )
+
+    def with_expected_seats_available(self):
+        """
+        Annotate the flights with seats_available computed from scratch:
+        airplane capacity minus the tickets sold for the flight.
+        """
+        return self.annotate(
+            expected_seats_available=self._expected_seats_available()
+        )
+
+    def with_seats_held(self):
+        """Annotate the flights with the number of their active seat holds."""
+        seat_hold_model = apps.get_model("booking", "SeatHold")
+        seats_held = (
+            seat_hold_model.objects.filter(
+                flight=OuterRef("pk"), expires_at__gt=timezone.now()
+            )
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return self.annotate(seats_held=Coalesce(Subquery(seats_held), 0))
+
+    def rebuild_seats_available(self):
+        """Recompute the stored counters of the flights from tickets."""
+        return self.update(seats_available=self._expected_seats_available())
+
+    @staticmethod
+    def _expected_seats_available():
+        ticket_model = apps.get_model("booking", "Ticket")
+        tickets_sold = (
+            ticket_model.objects.filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        capacity = (
+            Airplane.objects.filter(pk=OuterRef("airplane"))
+            .annotate(capacity=F("rows") * F("seats_in_row"))
+            .values("capacity")
+        )
+        return Subquery(capacity) - Coalesce(Subquery(tickets_sold), 0)
+
+
 class Flight(models.Model):
     number = models.CharField(max_length=60)
     route = models.ForeignKey(
@@ -76,9 +197,81 @@ class Flight(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew, related_name="flights")
+    seats_available = models.IntegerField(default=0, editable=False)
+
+    objects = FlightQuerySet.as_manager()
 
     class Meta:
         ordering = ["departure_time", "arrival_time"]
+        indexes = [
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx",
+            ),
+            models.Index(
+                fields=["departure_time", "arrival_time", "id"],
+                name="flight_departure_keyset_idx",
+            ),
+            models.Index(
+                fields=["number", "departure_time"],
+                name="flight_number_departure_idx",
+            ),
+        ]
+
+    def save(
+        self,
+        *args,
+        force_insert=False,
+        force_update=False,
+        using=None,
+        update_fields=None,
+    ):
+        """
+        Start a new flight with the whole airplane capacity available.
+
+        On updates, the counter is maintained by ticket writes, so it is never
+        written from a possibly stale instance. Changing the airplane shifts
+        it by the capacity difference instead. The departure time stored
+        before the update is kept in `previous_departure_time` for the
+        timetable signals.
+        """
+        self.previous_departure_time = None
+        if self._state.adding:
+            self.seats_available = self.airplane.plane_capacity
+            return super().save(
+                *args,
+                force_insert=force_insert,
+                force_update=force_update,
+                using=using,
+                update_fields=update_fields,
+            )
+
+        if update_fields is None:
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "seats_available"
+            ]
+        previous_capacity, self.previous_departure_time = (
+            Flight.objects.filter(pk=self.pk)
+            .annotate(
+                capacity=F("airplane__rows") * F("airplane__seats_in_row")
+            )
+            .values_list("capacity", "departure_time")
+            .first()
+        ) or (None, None)
+        super().save(
+            *args,
+            force_insert=force_insert,
+            force_update=force_update,
+            using=using,
+            update_fields=update_fields,
+        )
+
+        if previous_capacity is not None:
+            delta = self.airplane.plane_capacity - previous_capacity
+            if Flight.objects.adjust_seats_available({self.pk: delta}):
+                self.refresh_from_db(fields=["seats_available"])
 
     def __str__(self):
         return f"Flight {self.number} {self.route.__str__()}"
@@ -0,0 +1,125 @@
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor
+
+
+class FlightCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the flights' (departure_time, arrival_time, id).
+
+    Unlike the base class, the cursor holds the whole unique sort key instead
+    of the first field plus an offset. Every page is an index range scan
+    with no COUNT(*) and no OFFSET, and pages stay stable while flights
+    are being inserted.
+    """
+    ordering = ("departure_time", "arrival_time", "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            self.cursor = Cursor(offset=0, reverse=False, position=None)
+        reverse = self.cursor.reverse
+
+        if reverse:
+            queryset = queryset.order_by(
+                *[f"-{field}" for field in self.ordering]
+            )
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.cursor.position is not None:
+            key = self._decode_position(self.cursor.position)
+            queryset = queryset.filter(self._after_key(key, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+
+        has_position = self.cursor.position is not None
+        self.has_next = has_position if reverse else has_following
+        self.has_previous = has_following if reverse else has_position
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        position = self.cursor.position
+        if self.page:
+            position = self._get_position_from_instance(
+                self.page[-1], self.ordering
+            )
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=position)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+
+        position = self.cursor.position
+        if self.page:
+            position = self._get_position_from_instance(
+                self.page[0], self.ordering
+            )
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=position)
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            values = [instance[field] for field in ordering]
+        else:
+            values = [getattr(instance, field) for field in ordering]
+        departure_time, arrival_time, flight_id = values
+
+        return ",".join(
+            [
+                departure_time.isoformat(),
+                arrival_time.isoformat(),
+                str(flight_id),
+            ]
+        )
+
+    def _decode_position(self, position):
+        try:
+            departure_time, arrival_time, flight_id = position.split(",")
+            return (
+                datetime.fromisoformat(departure_time),
+                datetime.fromisoformat(arrival_time),
+                int(flight_id),
+            )
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _after_key(self, key, reverse):
+        """
+        Build the row-value comparison (departure, arrival, id) > key,
+        or < key when paging backwards, out of plain column lookups.
+        """
+        lookup = "lt" if reverse else "gt"
+        departure_time, arrival_time, flight_id = key
+
+        return (
+            Q(**{f"departure_time__{lookup}": departure_time})
+            | Q(
+                departure_time=departure_time,
+                **{f"arrival_time__{lookup}": arrival_time},
+            )
+            | Q(
+                departure_time=departure_time,
+                arrival_time=arrival_time,
+                **{f"id__{lookup}": flight_id},
+            )
+        )
@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+
+def get_seat_map_cache():
+    return caches[settings.SEAT_MAP_CACHE_ALIAS]
+
+
+def seat_map_cache_key(flight_id):
+    return f"seat-map:{flight_id}"
+
+
+def invalidate_seat_maps(flight_ids):
+    """
+    Drop the cached seat maps of the flights, again once the transaction
+    commits so that no map is rebuilt from the seats before the commit.
+    """
+    keys = [seat_map_cache_key(flight_id) for flight_id in flight_ids]
+    get_seat_map_cache().delete_many(keys)
+    transaction.on_commit(lambda: get_seat_map_cache().delete_many(keys))
+
+
+class SeatMap:
+    """Seat occupancy of a flight packed into one bit per seat."""
+
+    def __init__(self, rows, seats_in_row, bits=None):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        if bits is None:
+            bits = bytearray((rows * seats_in_row + 7) // 8)
+        self.bits = bits
+
+    @classmethod
+    def for_flight(cls, flight):
+        """
+        Load the flight's map from the cache or build it from (row, seat)
+        queries over its tickets and active seat holds and cache it until
+        the first of the holds expires.
+        """
+        airplane = flight.airplane
+        cache = get_seat_map_cache()
+        key = seat_map_cache_key(flight.id)
+
+        cached = cache.get(key)
+        if cached is not None:
+            rows, seats_in_row, bits = cached
+            if (rows, seats_in_row) == (airplane.rows, airplane.seats_in_row):
+                return cls(rows, seats_in_row, bytearray(bits))
+
+        now = timezone.now()
+        timeout = settings.SEAT_MAP_CACHE_TIMEOUT
+        seat_map = cls(airplane.rows, airplane.seats_in_row)
+        for row, seat in flight.tickets.values_list("row", "seat"):
+            if seat_map.has_seat(row, seat):
+                seat_map.take(row, seat)
+        for row, seat, expires_at in flight.seat_holds.filter(
+            expires_at__gt=now
+        ).values_list("row", "seat", "expires_at"):
+            if seat_map.has_seat(row, seat):
+                seat_map.take(row, seat)
+            timeout = min(timeout, (expires_at - now).total_seconds())
+
+        cache.set(
+            key,
+            (seat_map.rows, seat_map.seats_in_row, bytes(seat_map.bits)),
+            timeout,
+        )
+        return seat_map
+
+    @property
+    def capacity(self):
+        return self.rows * self.seats_in_row
+
+    @property
+    def taken_count(self):
+        return int.from_bytes(self.bits, "little").bit_count()
+
+    def has_seat(self, row, seat):
+        return 1 <= row <= self.rows and 1 <= seat <= self.seats_in_row
+
+    def _index(self, row, seat):
+        if not self.has_seat(row, seat):
+            raise IndexError(f"No seat {seat} in row {row}.")
+        return (row - 1) * self.seats_in_row + seat - 1
+
+    def take(self, row, seat):
+        index = self._index(row, seat)
+        self.bits[index >> 3] |= 1 << (index & 7)
+
+    def is_taken(self, row, seat):
+        index = self._index(row, seat)
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def to_representation(self):
+        return {
+            "rows": self.rows,
+            "seats_in_row": self.seats_in_row,
+            "seats_available": self.capacity - self.taken_count,
+            "occupancy": [
+                [
+                    self.is_taken(row, seat)
+                    for seat in range(1, self.seats_in_row + 1)
+                ]
+                for row in range(1, self.rows + 1)
+            ],
+        }
@@ -1,6 +1,33 @@
+from collections import Counter, defaultdict
+from collections.abc import Mapping
+
+from django.db import transaction
+from django.db.models import F
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from fleet.models import Airplane
 from .models import Crew, Route, Flight
+from .timetable import bump_timetable_dates, departure_date
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolve objects from the ones a list serializer prefetched for all of
+    its items, falling back to a query for the ids it missed.
+    """
+
+    prefetched = None
+
+    def to_internal_value(self, data):
+        if self.prefetched is not None:
+            try:
+                return self.prefetched[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
 
 
 class CrewSerializer(serializers.ModelSerializer):
@@ -51,6 +78,170 @@ class FlightSerializer(serializers.ModelSerializer):
         )
 
 
+def _collect_id(ids, value):
+    try:
+        ids.add(int(value))
+    except (TypeError, ValueError):
+        pass
+
+
+class FlightBatchListSerializer(serializers.ListSerializer):
+    """
+    Validate a batch of flight creates and updates with one query per
+    related model, and write it with bulk queries in one transaction.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            ids = defaultdict(set)
+            for item in data:
+                if not isinstance(item, Mapping):
+                    continue
+                for field_name in ("id", "route", "airplane"):
+                    _collect_id(ids[field_name], item.get(field_name))
+                if isinstance(item.get("crew"), list):
+                    for crew_id in item["crew"]:
+                        _collect_id(ids["crew"], crew_id)
+
+            fields = self.child.fields
+            self.child.flights = Flight.objects.select_related(
+                "airplane"
+            ).in_bulk(ids["id"])
+            fields["route"].prefetched = Route.objects.in_bulk(ids["route"])
+            fields["airplane"].prefetched = Airplane.objects.in_bulk(
+                ids["airplane"]
+            )
+            fields["crew"].child_relation.prefetched = Crew.objects.in_bulk(
+                ids["crew"]
+            )
+
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        """Reject flights updated more than once within the batch."""
+        flight_ids = Counter(
+            item["id"] for item in attrs if item.get("id") is not None
+        )
+        if any(count > 1 for count in flight_ids.values()):
+            raise serializers.ValidationError(
+                [
+                    {"id": [_("The flight is updated twice in the batch.")]}
+                    if flight_ids[item.get("id")] > 1
+                    else {}
+                    for item in attrs
+                ]
+            )
+        return attrs
+
+    @transaction.atomic
+    def create(self, validated_data):
+        """
+        Insert the new flights with the whole airplane capacity available
+        and update the others, shifting their counters by the capacity
+        difference of a new airplane like Flight.save() does.
+        """
+        flights = self.child.flights
+        results, created, updated = [], [], []
+        updated_fields, capacity_deltas, crews = set(), {}, []
+        departure_times = []
+
+        for item in validated_data:
+            crew = item.pop("crew", None)
+            flight_id = item.pop("id", None)
+            if flight_id is None:
+                flight = Flight(
+                    **item, seats_available=item["airplane"].plane_capacity
+                )
+                created.append(flight)
+            else:
+                flight = flights[flight_id]
+                departure_times.append(flight.departure_time)
+                if "airplane" in item:
+                    capacity_deltas[flight_id] = (
+                        item["airplane"].plane_capacity
+                        - flight.airplane.plane_capacity
+                    )
+                for attr, value in item.items():
+                    setattr(flight, attr, value)
+                updated_fields.update(item)
+                updated.append(flight)
+
+            if crew is not None:
+                crews.append((flight, {member.pk for member in crew}))
+            departure_times.append(flight.departure_time)
+            results.append(flight)
+
+        Flight.objects.bulk_create(created)
+        if updated_fields:
+            Flight.objects.bulk_update(updated, updated_fields)
+        Flight.objects.adjust_seats_available(capacity_deltas)
+        Flight.objects.set_crew(
+            {flight.pk: crew_ids for flight, crew_ids in crews}
+        )
+        bump_timetable_dates(map(departure_date, departure_times))
+
+        return results
+
+
+class FlightBatchSerializer(FlightSerializer):
+    """
+    One flight of a batch: an update of the flight with the given id, or
+    a new flight when the id is omitted.
+    """
+
+    id = serializers.IntegerField(
+        required=False,
+        help_text="Id of the flight to update, omitted to create a flight.",
+    )
+    route = PrefetchedPrimaryKeyRelatedField(
+        queryset=Route.objects.all(), required=False
+    )
+    airplane = PrefetchedPrimaryKeyRelatedField(
+        queryset=Airplane.objects.all(), required=False
+    )
+    crew = PrefetchedPrimaryKeyRelatedField(
+        queryset=Crew.objects.all(), many=True, required=False
+    )
+    flights = None
+
+    class Meta(FlightSerializer.Meta):
+        list_serializer_class = FlightBatchListSerializer
+        extra_kwargs = {
+            "number": {"required": False},
+            "departure_time": {"required": False},
+            "arrival_time": {"required": False},
+        }
+
+    def validate(self, attrs):
+        flight_id = attrs.get("id")
+        if flight_id is None:
+            missing = [
+                field_name
+                for field_name in (
+                    "number",
+                    "route",
+                    "airplane",
+                    "departure_time",
+                    "arrival_time",
+                )
+                if field_name not in attrs
+            ]
+            if missing:
+                raise serializers.ValidationError(
+                    {
+                        field_name: [
+                            self.fields[field_name].error_messages["required"]
+                        ]
+                        for field_name in missing
+                    }
+                )
+        elif flight_id not in (self.flights or {}):
+            raise serializers.ValidationError(
+                {"id": [_("Flight not found.")]}
+            )
+        return attrs
+
+
 class FlightListSerializer(serializers.ModelSerializer):
     source = serializers.SlugRelatedField(
         read_only=True,
@@ -62,7 +253,7 @@ class FlightListSerializer(serializers.ModelSerializer):
         slug_field="destination.name",
         source="route"
     )
-    seats_available = serializers.IntegerField(read_only=True)
+    seats_available = serializers.SerializerMethodField()
 
     class Meta:
         model = Flight
@@ -76,6 +267,53 @@ class FlightListSerializer(serializers.ModelSerializer):
             "seats_available"
         )
 
+    @extend_schema_field(OpenApiTypes.INT)
+    def get_seats_available(self, obj):
+        """Count the seats neither sold nor held when holds are annotated."""
+        return obj.seats_available - getattr(obj, "seats_held", 0)
+
+    @staticmethod
+    def flat_values(queryset):
+        """
+        Turn a flight queryset annotated with seats_held into flat rows
+        that to_representation serializes without building model instances.
+        """
+        return queryset.values(
+            "id",
+            "number",
+            "departure_time",
+            "arrival_time",
+            "seats_available",
+            "seats_held",
+            source_name=F("route__source__name"),
+            destination_name=F("route__destination__name"),
+        )
+
+    def to_representation(self, instance):
+        """
+        Serialize the rows of flat_values() straight into the output dict,
+        skipping the field machinery, with the same output as instances.
+        """
+        if not isinstance(instance, Mapping):
+            return super().to_representation(instance)
+
+        fields = self.fields
+        return {
+            "id": instance["id"],
+            "number": instance["number"],
+            "source": instance["source_name"],
+            "destination": instance["destination_name"],
+            "departure_time": fields["departure_time"].to_representation(
+                instance["departure_time"]
+            ),
+            "arrival_time": fields["arrival_time"].to_representation(
+                instance["arrival_time"]
+            ),
+            "seats_available": (
+                instance["seats_available"] - instance["seats_held"]
+            ),
+        }
+
 
 class FlightDetailSerializer(serializers.ModelSerializer):
     route = serializers.StringRelatedField(read_only=True)
@@ -102,3 +340,53 @@ class FlightDetailSerializer(serializers.ModelSerializer):
             representation.pop("crew")
 
         return representation
+
+
+class SeatMapSerializer(serializers.Serializer):
+    rows = serializers.IntegerField(read_only=True)
+    seats_in_row = serializers.IntegerField(read_only=True)
+    seats_available = serializers.IntegerField(read_only=True)
+    occupancy = serializers.ListField(
+        child=serializers.ListField(child=serializers.BooleanField()),
+        read_only=True,
+        help_text="Rows of seats, true where the seat is taken.",
+    )
+
+
+class ConnectionSearchSerializer(serializers.Serializer):
+    source = serializers.IntegerField(help_text="Source airport id.")
+    destination = serializers.IntegerField(
+        help_text="Destination airport id."
+    )
+    date = serializers.DateField(help_text="Departure date of the first leg.")
+    max_legs = serializers.IntegerField(min_value=1, max_value=3, default=3)
+    min_layover = serializers.IntegerField(
+        min_value=0,
+        max_value=24 * 60,
+        default=45,
+        help_text="Minimum layover in minutes.",
+    )
+    max_layover = serializers.IntegerField(
+        min_value=0,
+        max_value=24 * 60,
+        default=6 * 60,
+        help_text="Maximum layover in minutes.",
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+    def validate(self, attrs):
+        if attrs["source"] == attrs["destination"]:
+            raise serializers.ValidationError(
+                _("Source and destination airports must be different.")
+            )
+        if attrs["min_layover"] > attrs["max_layover"]:
+            raise serializers.ValidationError(
+                _("The minimum layover cannot exceed the maximum one.")
+            )
+        return attrs
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField(read_only=True)
+    arrival_time = serializers.DateTimeField(read_only=True)
+    legs = FlightListSerializer(many=True, read_only=True)
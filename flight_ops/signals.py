@@ -0,0 +1,42 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from airport_api.caching import invalidate_reference_cache
+from .models import Route, Flight
+from .timetable import (
+    bump_timetable_dates,
+    bump_timetable_routes,
+    bump_timetable_version,
+    departure_date,
+)
+
+
+@receiver(post_save, sender=Route)
+def invalidate_saved_route(sender, created, **kwargs):
+    invalidate_reference_cache()
+    if created:
+        bump_timetable_routes()
+    else:
+        # The flights of the route may have moved on any date
+        bump_timetable_version()
+
+
+@receiver(post_delete, sender=Route)
+def invalidate_deleted_route(sender, **kwargs):
+    invalidate_reference_cache()
+    # Routes with flights cannot be deleted
+    bump_timetable_routes()
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def invalidate_timetable(sender, instance, **kwargs):
+    """Reload the timetable of the old and new departure dates only."""
+    bump_timetable_dates(
+        departure_date(departure_time)
+        for departure_time in (
+            instance.departure_time,
+            getattr(instance, "previous_departure_time", None),
+        )
+        if departure_time is not None
+    )
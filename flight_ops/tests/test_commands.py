@@ -0,0 +1,330 @@
+import csv
+import json
+import os
+from io import StringIO
+from tempfile import NamedTemporaryFile
+
+from django.core.management import call_command, CommandError
+from django.db import connection
+from django.db.models import Count, F
+from django.test import LiveServerTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from booking.models import Order, Ticket
+from flight_ops.models import Route, Flight
+from fleet.tests.utils import sample_airplane
+from flight_ops.tests.utils import sample_crew, sample_flight
+from user.tests.utils import sample_user
+
+
+class ReconcileSeatsAvailableCommandTests(TestCase):
+    def setUp(self):
+        self.flight = sample_flight()
+        order = Order.objects.create(user=sample_user())
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        self.expected = self.flight.airplane.plane_capacity - 1
+        Flight.objects.filter(pk=self.flight.pk).update(seats_available=0)
+
+    def test_dry_run_only_reports_drift(self):
+        out = StringIO()
+        call_command("reconcile_seats_available", dry_run=True, stdout=out)
+
+        self.assertIn("Found 1 drifted flights", out.getvalue())
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_available, 0)
+
+    def test_reconcile_fixes_drift(self):
+        out = StringIO()
+        call_command("reconcile_seats_available", stdout=out)
+
+        self.assertIn("Reconciled 1 drifted flights", out.getvalue())
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_available, self.expected)
+
+    def test_rebuild_recomputes_every_flight(self):
+        call_command(
+            "reconcile_seats_available", rebuild=True, stdout=StringIO()
+        )
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_available, self.expected)
+
+
+class BenchmarkFlightListCommandTests(TestCase):
+    def test_serialization_paths_render_the_same(self):
+        out = StringIO()
+        call_command(
+            "benchmark_flight_list",
+            seed_flights=30,
+            page_size=20,
+            runs=2,
+            stdout=out,
+        )
+
+        self.assertIn("Both paths rendered the same", out.getvalue())
+
+
+class SeedBenchmarkCommandTests(TestCase):
+    def setUp(self):
+        call_command(
+            "seed_benchmark",
+            airports=20,
+            routes=50,
+            flights=40,
+            tickets=150,
+            users=5,
+            batch_size=16,
+            stdout=StringIO(),
+        )
+
+    def test_seed_generates_consistent_data(self):
+        self.assertEqual(Route.objects.count(), 50)
+        self.assertEqual(Flight.objects.count(), 40)
+        self.assertEqual(Ticket.objects.count(), 150)
+        self.assertFalse(
+            Flight.objects.annotate(sold=Count("tickets"))
+            .exclude(
+                seats_available=F("airplane__rows")
+                * F("airplane__seats_in_row")
+                - F("sold")
+            )
+            .exists()
+        )
+
+    def test_seed_runs_once(self):
+        with self.assertRaisesMessage(CommandError, "already seeded"):
+            call_command("seed_benchmark", airports=2, stdout=StringIO())
+
+    def test_benchmark_reports_every_endpoint(self):
+        with NamedTemporaryFile("r", suffix=".json") as f:
+            call_command(
+                "benchmark_api",
+                runs=2,
+                warmup=0,
+                output=f.name,
+                stdout=StringIO(),
+            )
+            results = json.load(f)
+
+        self.assertEqual(results["dataset"]["flights"], 40)
+        for name, endpoint in results["endpoints"].items():
+            expected = "201" if name == "order create" else "200"
+            self.assertEqual(endpoint["statuses"], {expected: 2}, name)
+            self.assertGreater(endpoint["p50_ms"], 0)
+        self.assertEqual(Ticket.objects.count(), 150)
+
+
+class BenchmarkServerCommandTests(LiveServerTestCase):
+    def test_benchmark_reports_every_endpoint(self):
+        sample_flight()
+        with NamedTemporaryFile("r", suffix=".json") as f:
+            call_command(
+                "benchmark_server",
+                url=self.live_server_url,
+                requests=4,
+                concurrency=2,
+                output=f.name,
+                stdout=StringIO(),
+            )
+            results = json.load(f)
+
+        self.assertEqual(len(results["endpoints"]), 4)
+        for name, endpoint in results["endpoints"].items():
+            self.assertEqual(endpoint["statuses"], {"200": 4}, name)
+            self.assertGreater(endpoint["requests_per_second"], 0)
+
+    def test_invalid_url(self):
+        with self.assertRaisesMessage(CommandError, "Invalid server URL"):
+            call_command("benchmark_server", url="localhost:8000")
+
+
+class BenchmarkThrottlingCommandTests(TestCase):
+    def test_benchmark_reports_every_throttle(self):
+        out = StringIO()
+        call_command(
+            "benchmark_throttling", requests=20, rate="10/minute", stdout=out
+        )
+        results = json.loads(out.getvalue())
+
+        self.assertEqual(len(results["throttles"]), 3)
+        for name, throttle in results["throttles"].items():
+            self.assertGreater(throttle["allowed"], 10, name)
+            self.assertGreater(throttle["p50_us"], 0, name)
+
+    def test_invalid_rate(self):
+        with self.assertRaisesMessage(CommandError, "Invalid rate"):
+            call_command("benchmark_throttling", rate="10/fortnight")
+
+
+class BenchmarkConnectionsCommandTests(TestCase):
+    def test_benchmark_reports_every_scenario(self):
+        with NamedTemporaryFile("r", suffix=".json") as f:
+            call_command(
+                "benchmark_connections",
+                airports=40,
+                flights=400,
+                searches=3,
+                output=f.name,
+                stdout=StringIO(),
+            )
+            results = json.load(f)
+
+        self.assertEqual(Flight.objects.count(), 400)
+        scenarios = results["scenarios"]
+        self.assertEqual(set(scenarios), {"hub to hub", "any to any"})
+        for name, scenario in scenarios.items():
+            self.assertGreater(scenario["p50_ms"], 0, name)
+        self.assertGreater(scenarios["hub to hub"]["itineraries"], 0)
+
+    def test_too_few_airports(self):
+        with self.assertRaisesMessage(CommandError, "airports are needed"):
+            call_command("benchmark_connections", airports=5)
+
+
+class ImportTimetableCommandTests(TestCase):
+    def setUp(self):
+        self.flight = sample_flight()
+        self.route = self.flight.route
+        self.airplane = self.flight.airplane
+        self.crew = [sample_crew(), sample_crew(first_name="Jane")]
+        self.row = {
+            "number": "CD100",
+            "source": self.route.source.name,
+            "destination": self.route.destination.name,
+            "airplane": self.airplane.name,
+            "departure_time": "2024-12-06T08:00:00+00:00",
+            "arrival_time": "2024-12-06T11:00:00+00:00",
+        }
+
+    def _import(self, content, suffix):
+        with NamedTemporaryFile("w", suffix=suffix, delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        out, err = StringIO(), StringIO()
+        call_command(
+            "import_timetable", f.name, batch_size=2, stdout=out, stderr=err
+        )
+        return out.getvalue(), err.getvalue()
+
+    def _csv(self, rows):
+        content = StringIO()
+        writer = csv.DictWriter(content, fieldnames=[*self.row, "crew"])
+        writer.writeheader()
+        writer.writerows(rows)
+        return content.getvalue()
+
+    def test_import_csv(self):
+        rows = [
+            {**self.row, "number": f"CD{index}", "crew": crew}
+            for index, crew in enumerate(
+                [
+                    "",
+                    str(self.crew[0].id),
+                    f"{self.crew[0].id};{self.crew[1].id}",
+                ]
+            )
+        ]
+
+        out, err = self._import(self._csv(rows), ".csv")
+
+        self.assertIn("3 created, 0 updated, 0 skipped", out)
+        self.assertEqual(err, "")
+        flight = Flight.objects.get(number="CD2")
+        self.assertEqual(flight.route, self.route)
+        self.assertEqual(flight.seats_available, self.airplane.plane_capacity)
+        self.assertEqual(set(flight.crew.all()), set(self.crew))
+
+    def test_import_ndjson_updates_existing_flights(self):
+        self._import(
+            json.dumps({**self.row, "crew": [self.crew[0].id]}), ".ndjson"
+        )
+        bigger_airplane = sample_airplane(
+            name="EI-BIG",
+            rows=40,
+            seats_in_row=6,
+            airplane_type=self.airplane.airplane_type,
+        )
+        order = Order.objects.create(user=sample_user())
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            order=order,
+            flight=Flight.objects.get(number="CD100"),
+        )
+
+        out, _ = self._import(
+            json.dumps(
+                {
+                    **self.row,
+                    "airplane": bigger_airplane.name,
+                    "arrival_time": "2024-12-06T12:00:00+00:00",
+                    "crew": [self.crew[1].id],
+                }
+            ),
+            ".ndjson",
+        )
+
+        self.assertIn("0 created, 1 updated", out)
+        flight = Flight.objects.get(number="CD100")
+        self.assertEqual(flight.airplane, bigger_airplane)
+        self.assertEqual(flight.arrival_time.hour, 12)
+        self.assertEqual(
+            flight.seats_available, bigger_airplane.plane_capacity - 1
+        )
+        self.assertEqual(list(flight.crew.all()), [self.crew[1]])
+
+    def _flight_row(self):
+        """Return a row of the existing sample flight, without crew."""
+        return {
+            **self.row,
+            "number": self.flight.number,
+            "departure_time": self.flight.departure_time.isoformat(),
+            "arrival_time": self.flight.arrival_time.isoformat(),
+        }
+
+    def test_import_without_crew_keeps_crew(self):
+        self.flight.crew.set(self.crew)
+        row = self._flight_row()
+        content = StringIO()
+        writer = csv.DictWriter(content, fieldnames=list(row))
+        writer.writeheader()
+        writer.writerow(row)
+
+        with CaptureQueriesContext(connection) as queries:
+            out, err = self._import(content.getvalue(), ".csv")
+
+        self.assertIn("0 created, 1 updated", out)
+        self.assertEqual(err, "")
+        self.assertEqual(set(self.flight.crew.all()), set(self.crew))
+        crew_table = Flight.crew.through._meta.db_table
+        self.assertEqual(
+            [query["sql"] for query in queries if crew_table in query["sql"]],
+            [],
+        )
+
+    def test_import_writes_changed_crew_only(self):
+        self.flight.crew.set(self.crew)
+        through = Flight.crew.through
+        kept = through.objects.get(crew=self.crew[0]).pk
+
+        self._import(
+            json.dumps({**self._flight_row(), "crew": [self.crew[0].id]}),
+            ".ndjson",
+        )
+
+        self.assertEqual(through.objects.get(flight=self.flight).pk, kept)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        rows = [
+            {**self.row, "source": "Nowhere"},
+            {**self.row, "arrival_time": self.row["departure_time"]},
+            {**self.row, "crew": "999"},
+            self.row,
+        ]
+
+        out, err = self._import(self._csv(rows), ".csv")
+
+        self.assertIn("1 created, 0 updated, 3 skipped", out)
+        self.assertIn("Row 1: No route from Nowhere", err)
+        self.assertIn("Row 2:", err)
+        self.assertIn("Row 3: No crew with ids [999]", err)
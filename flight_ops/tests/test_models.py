@@ -1,6 +1,10 @@
 from django.test import TestCase
 
+from booking.models import Order, Ticket
+from fleet.tests.utils import sample_airplane
+from flight_ops.models import Flight
 from flight_ops.tests.utils import sample_crew, sample_route, sample_flight
+from user.tests.utils import sample_user
 
 
 class CrewModelTests(TestCase):
@@ -28,3 +32,36 @@ class FlightModelTests(TestCase):
         expected_str = (f"Flight {self.flight.number} "
                         f"{self.flight.route.__str__()}")
         self.assertEqual(str(self.flight), expected_str)
+
+    def test_new_flight_has_whole_airplane_available(self):
+        self.assertEqual(
+            self.flight.seats_available, self.flight.airplane.plane_capacity
+        )
+
+    def test_airplane_change_shifts_seats_available(self):
+        order = Order.objects.create(user=sample_user())
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        smaller_airplane = sample_airplane(
+            name="EI-ABC",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=self.flight.airplane.airplane_type,
+        )
+
+        self.flight.airplane = smaller_airplane
+        self.flight.save()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_available, 39)
+
+    def test_update_does_not_overwrite_seats_available(self):
+        stale_flight = Flight.objects.get(pk=self.flight.pk)
+        order = Order.objects.create(user=sample_user())
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+        stale_flight.number = "XY9876"
+        stale_flight.save()
+        stale_flight.refresh_from_db()
+        self.assertEqual(
+            stale_flight.seats_available,
+            self.flight.airplane.plane_capacity - 1
+        )
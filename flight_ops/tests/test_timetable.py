@@ -0,0 +1,322 @@
+import random
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from fleet.tests.utils import sample_airplane, sample_airplane_type
+from flight_ops.models import Flight, Route
+from flight_ops.tests.utils import sample_flight
+from flight_ops.timetable import Timetable, to_epoch
+from location.tests.utils import sample_airport, sample_city, sample_country
+
+FIRST_DEPARTURE = datetime(2024, 12, 6, tzinfo=timezone.utc)
+MIN_LAYOVER = 30 * 60
+MAX_LAYOVER = 4 * 60 * 60
+
+
+def brute_force_search(entries, source_id, destination_id, start, end,
+                       max_legs, limit):
+    """
+    List every itinerary, keep the best one of each first flight and
+    return the sort keys of the first `limit`.
+    """
+    best = {}
+
+    def extend(legs):
+        if legs[-1][2] == destination_id:
+            key = (legs[-1][1], len(legs), -legs[0][0], -legs[0][3])
+            best[legs[0][3]] = min(best.get(legs[0][3], key), key)
+            return
+        if len(legs) == max_legs:
+            return
+        visited = {source_id, *(leg[2] for leg in legs)}
+        for entry in entries.get(legs[-1][2], ()):
+            if (
+                legs[-1][1] + MIN_LAYOVER <= entry[0]
+                <= legs[-1][1] + MAX_LAYOVER
+                and entry[2] not in visited
+            ):
+                extend(legs + [entry])
+
+    for entry in entries.get(source_id, ()):
+        if start <= entry[0] < end:
+            extend([entry])
+    return sorted(best.values())[:limit]
+
+
+class ConnectionSearchTests(TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        city = sample_city(country=sample_country())
+        self.airports = [
+            sample_airport(name=f"Airport {index}", closest_big_city=city)
+            .id
+            for index in range(8)
+        ]
+        airplane = sample_airplane(airplane_type=sample_airplane_type())
+        routes = {}
+        flights = []
+        for index in range(300):
+            source_id, destination_id = rng.sample(self.airports, 2)
+            if (source_id, destination_id) not in routes:
+                routes[source_id, destination_id] = Route.objects.create(
+                    source_id=source_id,
+                    destination_id=destination_id,
+                    distance=1000,
+                )
+            departure_time = FIRST_DEPARTURE + timedelta(
+                minutes=rng.randrange(36 * 60)
+            )
+            flights.append(
+                Flight(
+                    number=f"RN{index}",
+                    route=routes[source_id, destination_id],
+                    airplane=airplane,
+                    departure_time=departure_time,
+                    arrival_time=departure_time + timedelta(
+                        minutes=rng.randrange(30, 5 * 60)
+                    ),
+                )
+            )
+        Flight.objects.bulk_create(flights)
+
+        self.entries = {}
+        for flight in Flight.objects.select_related("route"):
+            self.entries.setdefault(flight.route.source_id, []).append(
+                (
+                    to_epoch(flight.departure_time),
+                    to_epoch(flight.arrival_time),
+                    flight.route.destination_id,
+                    flight.id,
+                )
+            )
+        self.start = to_epoch(FIRST_DEPARTURE)
+        self.end = self.start + 24 * 60 * 60
+
+    def test_search_matches_brute_force(self):
+        timetable = Timetable()
+        for max_legs in (1, 2, 3):
+            for limit in (1, 5, 50):
+                for source_id in self.airports[:3]:
+                    for destination_id in self.airports[3:6]:
+                        with self.subTest(
+                            max_legs=max_legs,
+                            limit=limit,
+                            source=source_id,
+                            destination=destination_id,
+                        ):
+                            itineraries = timetable.search(
+                                source_id,
+                                destination_id,
+                                self.start,
+                                self.end,
+                                max_legs,
+                                MIN_LAYOVER,
+                                MAX_LAYOVER,
+                                limit,
+                            )
+                            self.assertEqual(
+                                [
+                                    (
+                                        legs[-1][1],
+                                        len(legs),
+                                        -legs[0][0],
+                                        -legs[0][3],
+                                    )
+                                    for legs in itineraries
+                                ],
+                                brute_force_search(
+                                    self.entries,
+                                    source_id,
+                                    destination_id,
+                                    self.start,
+                                    self.end,
+                                    max_legs,
+                                    limit,
+                                ),
+                            )
+
+    def test_itineraries_are_connected(self):
+        itineraries = Timetable().search(
+            self.airports[0],
+            self.airports[1],
+            self.start,
+            self.end,
+            3,
+            MIN_LAYOVER,
+            MAX_LAYOVER,
+            50,
+        )
+
+        self.assertTrue(itineraries)
+        for legs in itineraries:
+            self.assertEqual(legs[-1][2], self.airports[1])
+            for previous, leg in zip(legs, legs[1:]):
+                self.assertGreaterEqual(leg[0] - previous[1], MIN_LAYOVER)
+                self.assertLessEqual(leg[0] - previous[1], MAX_LAYOVER)
+
+
+class TimetableMaxAgeTests(TestCase):
+    """
+    Another worker's change bumps the version in its own local memory
+    cache only, which an update() bypassing the signals stands for here.
+    """
+
+    def setUp(self):
+        self.flight = sample_flight()
+        self.departure = to_epoch(self.flight.departure_time)
+        self.timetable = Timetable()
+        self.now = 1000.0
+        patcher = mock.patch(
+            "flight_ops.timetable.monotonic", lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def flight_ids(self):
+        return self.timetable.flight_ids(
+            self.departure - 3600, self.departure + 3600
+        )
+
+    def search(self):
+        return self.timetable.search(
+            self.flight.route.source_id,
+            self.flight.route.destination_id,
+            self.departure - 3600,
+            self.departure + 3600,
+            1,
+            MIN_LAYOVER,
+            MAX_LAYOVER,
+            10,
+        )
+
+    @override_settings(TIMETABLE_MAX_AGE=60)
+    def test_partitions_are_reloaded_after_max_age(self):
+        self.assertEqual(self.flight_ids(), [self.flight.id])
+        self.assertEqual(len(self.search()), 1)
+        Flight.objects.filter(pk=self.flight.pk).update(
+            departure_time=self.flight.departure_time + timedelta(hours=2),
+            arrival_time=self.flight.arrival_time + timedelta(hours=2),
+        )
+
+        self.now += 60
+        with self.assertNumQueries(0):
+            self.assertEqual(self.flight_ids(), [self.flight.id])
+            self.assertEqual(len(self.search()), 1)
+
+        self.now += 1
+        self.assertEqual(self.flight_ids(), [])
+        self.assertEqual(self.search(), [])
+
+    @override_settings(TIMETABLE_MAX_AGE=60)
+    def test_routes_are_reloaded_after_max_age(self):
+        route = self.flight.route
+        self.search()
+        # Bypasses the signals like the flight update above
+        Route.objects.bulk_create(
+            [
+                Route(
+                    source=route.destination,
+                    destination=route.source,
+                    distance=1000,
+                )
+            ]
+        )
+
+        reachable = self.timetable._reachability(route.source_id, 2)
+        self.assertNotIn(route.destination_id, reachable[1])
+
+        self.now += 61
+        reachable = self.timetable._reachability(route.source_id, 2)
+        self.assertIn(route.destination_id, reachable[1])
+
+
+class TimetableVersionTests(TestCase):
+    def setUp(self):
+        self.flight = sample_flight(
+            departure_time=FIRST_DEPARTURE + timedelta(hours=10),
+            arrival_time=FIRST_DEPARTURE + timedelta(hours=12),
+        )
+        self.other_flight = Flight.objects.create(
+            number="CD1",
+            route=self.flight.route,
+            airplane=self.flight.airplane,
+            departure_time=FIRST_DEPARTURE + timedelta(days=1, hours=10),
+            arrival_time=FIRST_DEPARTURE + timedelta(days=1, hours=12),
+        )
+        self.timetable = Timetable()
+        self.start = to_epoch(FIRST_DEPARTURE)
+
+    def flight_ids(self, day):
+        start = self.start + day * 24 * 60 * 60
+        return self.timetable.flight_ids(start, start + 24 * 60 * 60)
+
+    def test_flight_change_reloads_its_date_only(self):
+        self.assertEqual(self.flight_ids(0), [self.flight.id])
+        self.assertEqual(self.flight_ids(1), [self.other_flight.id])
+
+        self.flight.arrival_time += timedelta(hours=1)
+        self.flight.save()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.flight_ids(1), [self.other_flight.id])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.flight_ids(0), [self.flight.id])
+
+    def test_moved_flight_reloads_old_and_new_dates(self):
+        self.flight_ids(0)
+        self.flight_ids(1)
+        self.flight_ids(2)
+
+        self.flight.departure_time += timedelta(days=1)
+        self.flight.arrival_time += timedelta(days=1)
+        self.flight.save()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.flight_ids(2), [])
+        self.assertEqual(self.flight_ids(0), [])
+        self.assertEqual(
+            self.flight_ids(1), [self.flight.id, self.other_flight.id]
+        )
+
+    def test_deleted_flight_reloads_its_date(self):
+        self.flight_ids(0)
+        self.flight_ids(1)
+
+        self.other_flight.delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.flight_ids(0), [self.flight.id])
+        self.assertEqual(self.flight_ids(1), [])
+
+    def test_new_route_reloads_routes_only(self):
+        route = self.flight.route
+        self.flight_ids(0)
+        self.assertNotIn(
+            route.destination_id,
+            self.timetable._reachability(route.source_id, 2)[1],
+        )
+
+        Route.objects.create(
+            source=route.destination, destination=route.source, distance=1
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.flight_ids(0), [self.flight.id])
+            self.assertIn(
+                route.destination_id,
+                self.timetable._reachability(route.source_id, 2)[1],
+            )
+
+    def test_route_update_reloads_every_date(self):
+        self.flight_ids(0)
+        self.flight_ids(1)
+
+        route = self.flight.route
+        route.source, route.destination = route.destination, route.source
+        route.save()
+
+        with self.assertNumQueries(2):
+            self.flight_ids(0)
+            self.flight_ids(1)
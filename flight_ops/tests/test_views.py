@@ -1,12 +1,20 @@
-from datetime import datetime
+import json
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.db.models import F, Count
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.translation import gettext_lazy
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
+from airport_api.renderers import FastJSONRenderer
+from booking.models import Order, Ticket, SeatHold
 from booking.tests.test_views import sample_user
 from flight_ops.models import Crew, Route, Flight
 from flight_ops.serializers import (
@@ -16,12 +24,20 @@ from flight_ops.serializers import (
     RouteSerializer,
     FlightListSerializer,
 )
+from flight_ops.seat_map import get_seat_map_cache
+from flight_ops.timetable import timetable
+from flight_ops.views import FlightViewSet
 from flight_ops.tests.utils import sample_crew, sample_route, sample_flight
+from fleet.tests.utils import sample_airplane_type, sample_airplane
 from location.tests.utils import sample_country, sample_city, sample_airport
 
 CREW_URL = reverse("flight-ops:crew-list")
 ROUTE_URL = reverse("flight-ops:route-list")
 FLIGHT_URL = reverse("flight-ops:flight-list")
+FLIGHT_CONNECTIONS_URL = reverse("flight-ops:flight-connections")
+FLIGHT_BATCH_URL = reverse("flight-ops:flight-batch")
+FLIGHT_ASYNC_URL = reverse("flight-ops:flight-async-list")
+ROUTE_ASYNC_URL = reverse("flight-ops:route-async-list")
 
 
 def crew_detail_url(crew_id):
@@ -191,16 +207,34 @@ class PublicFlightAPITests(TestCase):
             departure_time=self.flight.departure_time,
             arrival_time=self.flight.arrival_time
         )
-        flights = Flight.objects.annotate(
-                seats_available=F("airplane__seats_in_row")
-                * F("airplane__rows") - Count("tickets")
-            )
+        flights = Flight.objects.all()
         serializer = FlightListSerializer(flights, many=True)
 
         response = self.client.get(FLIGHT_URL)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_flight_list_flat_rows_render_like_instances(self):
+        SeatHold.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            user=sample_user(),
+            expires_at=datetime.now(timezone.utc) + timedelta(minutes=10),
+        )
+        queryset = Flight.objects.with_seats_held()
+
+        self.assertEqual(
+            JSONRenderer().render(
+                FlightListSerializer(
+                    FlightListSerializer.flat_values(queryset), many=True
+                ).data
+            ),
+            JSONRenderer().render(
+                FlightListSerializer(queryset, many=True).data
+            ),
+        )
+
     def test_flight_list_source_and_destination_filter(self):
         country = sample_country(name="USA")
         los_angeles = sample_city(name="Los Angeles", country=country)
@@ -254,6 +288,25 @@ class PublicFlightAPITests(TestCase):
         self.assertEqual(response.data["count"], 1)
         self.assertEqual(response.data["results"][0]["id"], filter_flight.pk)
 
+    def test_flight_list_date_filter_range_is_half_open(self):
+        for departure_time in (
+            datetime(2024, 12, 6, 0, 0, tzinfo=timezone.utc),
+            datetime(2024, 12, 6, 23, 59, 59, tzinfo=timezone.utc),
+            datetime(2024, 12, 7, 0, 0, tzinfo=timezone.utc),
+        ):
+            Flight.objects.create(
+                number="CD4321",
+                route=self.flight.route,
+                airplane=self.flight.airplane,
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(hours=3),
+            )
+
+        response = self.client.get(
+            FLIGHT_URL, {"departure_date": "2024-12-06"}
+        )
+        self.assertEqual(response.data["count"], 2)
+
     def test_flight_list_arrival_date_filter(self):
         arrival_date = "2024-12-07"
         arrival_time = datetime.strptime(
@@ -274,6 +327,128 @@ class PublicFlightAPITests(TestCase):
         self.assertEqual(response.data["count"], 1)
         self.assertEqual(response.data["results"][0]["id"], filter_flight.pk)
 
+    def test_flight_list_min_seats_filter(self):
+        capacity = self.flight.airplane.plane_capacity
+        user = sample_user()
+        Flight.objects.filter(pk=self.flight.pk).update(
+            seats_available=capacity - 1
+        )
+        SeatHold.objects.create(
+            row=1,
+            seat=2,
+            flight=self.flight,
+            user=user,
+            expires_at=datetime.now(timezone.utc) + timedelta(minutes=10),
+        )
+
+        response = self.client.get(FLIGHT_URL, {"min_seats": capacity - 2})
+        self.assertEqual(response.data["count"], 1)
+
+        response = self.client.get(FLIGHT_URL, {"min_seats": capacity - 1})
+        self.assertEqual(response.data["count"], 0)
+
+    def test_flight_list_departure_window_filter(self):
+        for hour in (7, 8, 11, 12):
+            departure_time = datetime(2024, 12, 6, hour, tzinfo=timezone.utc)
+            Flight.objects.create(
+                number=f"CD{hour}",
+                route=self.flight.route,
+                airplane=self.flight.airplane,
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(hours=3),
+            )
+
+        response = self.client.get(
+            FLIGHT_URL,
+            {
+                "departure_after": "2024-12-06T08:00:00+00:00",
+                "departure_before": "2024-12-06T12:00:00+00:00",
+            }
+        )
+        self.assertEqual(
+            [flight["number"] for flight in response.data["results"]],
+            ["CD8", "CD11"]
+        )
+
+        response = self.client.get(
+            FLIGHT_URL, {"departure_after": "2024-12-06"}
+        )
+        self.assertEqual(response.data["count"], 4)
+
+    def test_flight_list_airplane_type_filter(self):
+        airplane_type = sample_airplane_type(name="Airbus A320")
+        filter_flight = Flight.objects.create(
+            number="CD4321",
+            route=self.flight.route,
+            airplane=sample_airplane(
+                name="EI-ABC", airplane_type=airplane_type
+            ),
+            departure_time=self.flight.departure_time,
+            arrival_time=self.flight.arrival_time,
+        )
+
+        response = self.client.get(
+            FLIGHT_URL, {"airplane_type": airplane_type.id}
+        )
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["id"], filter_flight.pk)
+
+    def test_flight_list_filters_query_count(self):
+        params = {
+            "source": self.flight.route.source_id,
+            "destination": self.flight.route.destination_id,
+            "departure_after": "2024-09-01",
+            "departure_before": "2024-09-02",
+            "airplane_type": self.flight.airplane.airplane_type_id,
+            "min_seats": 1,
+        }
+        for number in range(5):
+            Flight.objects.create(
+                number=f"CD{number}",
+                route=self.flight.route,
+                airplane=self.flight.airplane,
+                departure_time=self.flight.departure_time,
+                arrival_time=self.flight.arrival_time,
+            )
+
+        with self.assertNumQueries(2):
+            response = self.client.get(FLIGHT_URL, params)
+        self.assertEqual(response.data["count"], 6)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                FLIGHT_URL, {"pagination": "cursor", **params}
+            )
+        self.assertEqual(len(response.data["results"]), 6)
+
+    def test_flight_list_invalid_filters(self):
+        searches = [
+            {"source": "1,x"},
+            {"destination": ","},
+            {"airplane_type": "A320"},
+            {"departure_date": "2024-13-01"},
+            {"arrival_date": "06.12.2024"},
+            {"departure_after": "tomorrow"},
+            {"departure_before": "2024-12-06T25:00:00"},
+            {"departure_date": "9999-12-31"},
+            {"min_seats": "many"},
+        ]
+        for params in searches:
+            for from_timetable in (False, True):
+                with self.subTest(params=params, timetable=from_timetable):
+                    with self.settings(
+                        FLIGHT_LIST_FROM_TIMETABLE=from_timetable
+                    ):
+                        # A window of a day reaches the timetable
+                        response = self.client.get(
+                            FLIGHT_URL,
+                            {"departure_date": "2024-09-01", **params},
+                        )
+                    self.assertEqual(
+                        response.status_code, status.HTTP_400_BAD_REQUEST
+                    )
+                    self.assertEqual(list(response.data), list(params))
+
     def test_flight_detail_without_crew(self):
         response = self.client.get(flight_detail_url(self.flight.pk))
 
@@ -344,3 +519,613 @@ class AdminFlightAPITests(TestCase):
         self.assertEqual(
             response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
         )
+
+
+class FlightCursorPaginationAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.flight = sample_flight()
+        self.departure_time = datetime(2024, 9, 2, 10, tzinfo=timezone.utc)
+        for hour in range(11):
+            Flight.objects.create(
+                number=f"CD{hour}",
+                route=self.flight.route,
+                airplane=self.flight.airplane,
+                departure_time=self.departure_time + timedelta(hours=hour),
+                arrival_time=self.departure_time + timedelta(hours=hour + 3),
+            )
+
+    def test_cursor_pages_have_no_count(self):
+        response = self.client.get(FLIGHT_URL, {"pagination": "cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(response.data["results"][0]["id"], self.flight.id)
+        self.assertIsNone(response.data["previous"])
+
+    def test_cursor_pages_cover_every_flight_once(self):
+        first_page = self.client.get(FLIGHT_URL, {"pagination": "cursor"})
+        second_page = self.client.get(first_page.data["next"])
+
+        ids = [
+            flight["id"]
+            for page in (first_page, second_page)
+            for flight in page.data["results"]
+        ]
+        expected_ids = list(
+            Flight.objects.order_by("departure_time", "arrival_time", "id")
+            .values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected_ids)
+        self.assertIsNone(second_page.data["next"])
+
+        previous_page = self.client.get(second_page.data["previous"])
+        self.assertEqual(
+            previous_page.data["results"], first_page.data["results"]
+        )
+
+    def test_cursor_pages_stable_while_inserting(self):
+        first_page = self.client.get(FLIGHT_URL, {"pagination": "cursor"})
+        Flight.objects.create(
+            number="EARLY",
+            route=self.flight.route,
+            airplane=self.flight.airplane,
+            departure_time=self.departure_time - timedelta(days=30),
+            arrival_time=self.departure_time - timedelta(days=30),
+        )
+
+        second_page = self.client.get(first_page.data["next"])
+        self.assertEqual(len(second_page.data["results"]), 2)
+        self.assertNotIn(
+            "EARLY",
+            [flight["number"] for flight in second_page.data["results"]]
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            FLIGHT_URL, {"pagination": "cursor", "cursor": "invalid"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_pagination_is_default(self):
+        response = self.client.get(FLIGHT_URL)
+        self.assertEqual(response.data["count"], 12)
+
+
+def flight_seat_map_url(flight_id):
+    return reverse("flight-ops:flight-seat-map", args=[flight_id])
+
+
+class FlightSeatMapAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        get_seat_map_cache().clear()
+        self.flight = sample_flight()
+        self.order = Order.objects.create(user=sample_user())
+        Ticket.objects.create(
+            row=2, seat=3, flight=self.flight, order=self.order
+        )
+
+    def test_seat_map(self):
+        airplane = self.flight.airplane
+        response = self.client.get(flight_seat_map_url(self.flight.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rows"], airplane.rows)
+        self.assertEqual(response.data["seats_in_row"], airplane.seats_in_row)
+        self.assertEqual(
+            response.data["seats_available"], airplane.plane_capacity - 1
+        )
+        self.assertEqual(len(response.data["occupancy"]), airplane.rows)
+        self.assertTrue(response.data["occupancy"][1][2])
+        self.assertEqual(
+            sum(sum(row) for row in response.data["occupancy"]), 1
+        )
+
+    def test_seat_map_is_cached(self):
+        self.client.get(flight_seat_map_url(self.flight.id))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(flight_seat_map_url(self.flight.id))
+        self.assertTrue(response.data["occupancy"][1][2])
+
+    def test_booking_invalidates_seat_map(self):
+        self.client.get(flight_seat_map_url(self.flight.id))
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+
+        response = self.client.get(flight_seat_map_url(self.flight.id))
+        self.assertTrue(response.data["occupancy"][0][0])
+
+        self.order.delete()
+        response = self.client.get(flight_seat_map_url(self.flight.id))
+        self.assertEqual(
+            response.data["seats_available"],
+            self.flight.airplane.plane_capacity
+        )
+
+
+class FlightConnectionsAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        timetable.clear()
+        city = sample_city(country=sample_country())
+        self.airports = [
+            sample_airport(name=name, closest_big_city=city)
+            for name in ("A", "B", "C", "D")
+        ]
+        self.airplane = sample_airplane(
+            airplane_type=sample_airplane_type()
+        )
+        self.routes = {}
+
+    def _flight(self, number, source, destination, departure_hour, hours):
+        key = (source, destination)
+        if key not in self.routes:
+            self.routes[key] = Route.objects.create(
+                source=self.airports[source],
+                destination=self.airports[destination],
+                distance=1000,
+            )
+        departure_time = datetime(
+            2024, 12, 6, tzinfo=timezone.utc
+        ) + timedelta(hours=departure_hour)
+        return Flight.objects.create(
+            number=number,
+            route=self.routes[key],
+            airplane=self.airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=hours),
+        )
+
+    def _search(self, **params):
+        return self.client.get(
+            FLIGHT_CONNECTIONS_URL,
+            {
+                "source": self.airports[0].id,
+                "destination": self.airports[3].id,
+                "date": "2024-12-06",
+                **params,
+            }
+        )
+
+    def test_connections_ordered_by_arrival(self):
+        self._flight("AD", 0, 3, 8, 10)
+        self._flight("AB", 0, 1, 6, 2)
+        self._flight("BC", 1, 2, 9, 2)
+        self._flight("CD", 2, 3, 12, 2)
+        self._flight("AC", 0, 2, 7, 2)
+
+        response = self._search()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                [leg["number"] for leg in itinerary["legs"]]
+                for itinerary in response.data
+            ],
+            [["AC", "CD"], ["AB", "BC", "CD"], ["AD"]]
+        )
+
+    def test_connections_respect_layover_and_leg_limits(self):
+        self._flight("AB", 0, 1, 6, 2)
+        self._flight("BC", 1, 2, 8, 2)
+        self._flight("CD", 2, 3, 20, 2)
+
+        self.assertEqual(self._search().data, [])
+        self.assertEqual(
+            len(self._search(min_layover=0, max_layover=600).data), 1
+        )
+        self.assertEqual(
+            self._search(min_layover=0, max_layover=600, max_legs=2).data,
+            []
+        )
+
+    def test_connections_follow_flight_changes(self):
+        direct = self._flight("AD", 0, 3, 8, 2)
+        self.assertEqual(len(self._search().data), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._flight("AD2", 0, 3, 9, 2)
+        self.assertEqual(len(self._search().data), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            direct.departure_time += timedelta(days=1)
+            direct.arrival_time += timedelta(days=1)
+            direct.save()
+        self.assertEqual(
+            [
+                itinerary["legs"][0]["number"]
+                for itinerary in self._search().data
+            ],
+            ["AD2"]
+        )
+
+    def test_connections_query_count(self):
+        self._flight("AB", 0, 1, 6, 2)
+        self._flight("BD", 1, 3, 9, 2)
+        self._search()
+
+        with self.assertNumQueries(1):
+            response = self._search()
+        self.assertEqual(len(response.data), 1)
+
+    def test_connections_validation(self):
+        response = self._search(destination=self.airports[0].id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self._search(min_layover=120, max_layover=60)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TimetableFlightListAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        timetable.clear()
+        self.flight = sample_flight()
+        self.other_route = Route.objects.create(
+            source=self.flight.route.destination,
+            destination=self.flight.route.source,
+            distance=1150,
+        )
+        first_departure = datetime(2024, 12, 6, tzinfo=timezone.utc)
+        for hour in range(0, 48, 5):
+            Flight.objects.create(
+                number=f"CD{hour}",
+                route=self.other_route if hour % 2 else self.flight.route,
+                airplane=self.flight.airplane,
+                departure_time=first_departure + timedelta(hours=hour),
+                arrival_time=first_departure + timedelta(hours=hour + 20),
+            )
+
+    def test_timetable_list_matches_database_list(self):
+        searches = [
+            {"departure_date": "2024-12-06"},
+            {
+                "departure_date": "2024-12-07",
+                "source": self.other_route.source_id,
+            },
+            {
+                "departure_after": "2024-12-06T10:00:00+00:00",
+                "departure_before": "2024-12-07T10:00:00+00:00",
+                "destination": self.flight.route.destination_id,
+            },
+            {"departure_date": "2024-12-06", "arrival_date": "2024-12-07"},
+            {"departure_date": "2024-12-06", "page": 2},
+        ]
+        for params in searches:
+            with self.subTest(params=params):
+                database_response = self.client.get(FLIGHT_URL, params)
+                with self.settings(FLIGHT_LIST_FROM_TIMETABLE=True):
+                    timetable_response = self.client.get(FLIGHT_URL, params)
+                self.assertEqual(
+                    timetable_response.data, database_response.data
+                )
+
+    @override_settings(FLIGHT_LIST_FROM_TIMETABLE=True)
+    def test_timetable_list_query_count(self):
+        params = {"departure_date": "2024-12-06"}
+        self.client.get(FLIGHT_URL, params)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(FLIGHT_URL, params)
+        self.assertEqual(response.data["count"], 5)
+
+        Flight.objects.create(
+            number="EF1234",
+            route=self.flight.route,
+            airplane=self.flight.airplane,
+            departure_time=datetime(2024, 12, 6, 23, tzinfo=timezone.utc),
+            arrival_time=datetime(2024, 12, 7, 2, tzinfo=timezone.utc),
+        )
+        response = self.client.get(FLIGHT_URL, params)
+        self.assertEqual(response.data["count"], 6)
+
+    @override_settings(FLIGHT_LIST_FROM_TIMETABLE=True)
+    def test_unbounded_search_uses_database(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(FLIGHT_URL)
+        self.assertEqual(response.data["count"], 11)
+
+
+class FlightStreamingAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.flight = sample_flight()
+        for number in range(4):
+            Flight.objects.create(
+                number=f"CD{number}",
+                route=self.flight.route,
+                airplane=self.flight.airplane,
+                departure_time=self.flight.departure_time,
+                arrival_time=self.flight.arrival_time,
+            )
+        self.expected = json.loads(
+            JSONRenderer().render(
+                FlightListSerializer(
+                    Flight.objects.with_seats_held(), many=True
+                ).data
+            )
+        )
+
+    def test_stream_all_flights_for_staff(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="test_admin@test.com", password="test1234"
+            )
+        )
+
+        with mock.patch.object(FlightViewSet, "stream_chunk_size", 2):
+            response = self.client.get(FLIGHT_URL, {"stream": "true"})
+            chunks = list(response.streaming_content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(json.loads(b"".join(chunks)), self.expected)
+
+    def test_stream_of_empty_list(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="test_admin@test.com", password="test1234"
+            )
+        )
+
+        response = self.client.get(
+            FLIGHT_URL, {"stream": "true", "source": 0}
+        )
+        self.assertEqual(b"".join(response.streaming_content), b"[]")
+
+    def test_stream_ignored_for_non_staff_users(self):
+        self.client.force_authenticate(sample_user())
+
+        response = self.client.get(FLIGHT_URL, {"stream": "true"})
+        self.assertEqual(response.data["count"], 5)
+
+    def test_fast_renderer_renders_like_drf(self):
+        data = {
+            "flights": self.expected,
+            "detail": gettext_lazy("Not found."),
+            "when": self.flight.departure_time,
+            "text": "line separator é",
+            1: None,
+        }
+
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+
+class FlightBatchAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="test_admin@test.com", password="test1234"
+            )
+        )
+        self.flight = sample_flight()
+        self.crew = [sample_crew(), sample_crew(first_name="Jane")]
+        self.flight.crew.add(self.crew[0])
+        self.bigger_airplane = sample_airplane(
+            name="EI-BIG",
+            rows=40,
+            seats_in_row=6,
+            airplane_type=self.flight.airplane.airplane_type,
+        )
+
+    def _create_item(self, number):
+        return {
+            "number": number,
+            "route": self.flight.route_id,
+            "airplane": self.flight.airplane_id,
+            "departure_time": "2024-12-06T08:00:00Z",
+            "arrival_time": "2024-12-06T11:00:00Z",
+            "crew": [crew.id for crew in self.crew],
+        }
+
+    def test_batch_forbidden_for_non_staff_users(self):
+        self.client.force_authenticate(sample_user())
+
+        response = self.client.post(
+            FLIGHT_BATCH_URL, [self._create_item("CD1")], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_batch_creates_and_updates_flights(self):
+        order = Order.objects.create(user=sample_user())
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        payload = [
+            self._create_item("CD1"),
+            {
+                "id": self.flight.id,
+                "airplane": self.bigger_airplane.id,
+                "crew": [self.crew[1].id],
+            },
+        ]
+
+        response = self.client.post(FLIGHT_BATCH_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[1]["id"], self.flight.id)
+        self.assertEqual(response.data[1]["crew"], [self.crew[1].id])
+        created = Flight.objects.get(number="CD1")
+        self.assertEqual(response.data[0]["id"], created.id)
+        self.assertEqual(
+            created.seats_available, self.flight.airplane.plane_capacity
+        )
+        self.assertEqual(set(created.crew.all()), set(self.crew))
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.number, "AB1234")
+        self.assertEqual(self.flight.airplane, self.bigger_airplane)
+        self.assertEqual(
+            self.flight.seats_available,
+            self.bigger_airplane.plane_capacity - 1
+        )
+        self.assertEqual(list(self.flight.crew.all()), [self.crew[1]])
+
+    def test_batch_reports_errors_per_item(self):
+        invalid_route = {**self._create_item("CD2"), "route": 0}
+        missing_number = self._create_item("CD3")
+        del missing_number["number"]
+        payload = [
+            self._create_item("CD1"),
+            invalid_route,
+            missing_number,
+            {"id": 0, "number": "CD4"},
+        ]
+
+        response = self.client.post(FLIGHT_BATCH_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("route", response.data[1])
+        self.assertIn("number", response.data[2])
+        self.assertIn("id", response.data[3])
+        self.assertEqual(Flight.objects.count(), 1)
+
+    def test_batch_rejects_repeated_updates(self):
+        payload = [
+            {"id": self.flight.id, "number": "CD1"},
+            {"id": self.flight.id, "number": "CD2"},
+        ]
+
+        response = self.client.post(FLIGHT_BATCH_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_query_count_does_not_grow(self):
+        def batch_queries(size):
+            flights = [
+                Flight.objects.create(
+                    number=f"OLD{size}-{index}",
+                    route=self.flight.route,
+                    airplane=self.flight.airplane,
+                    departure_time=self.flight.departure_time,
+                    arrival_time=self.flight.arrival_time,
+                )
+                for index in range(size)
+            ]
+            payload = [
+                self._create_item(f"NEW{size}-{index}")
+                for index in range(size)
+            ] + [
+                {
+                    "id": flight.id,
+                    "airplane": self.bigger_airplane.id,
+                    "crew": [self.crew[1].id],
+                }
+                for flight in flights
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    FLIGHT_BATCH_URL, payload, format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        self.assertEqual(batch_queries(2), batch_queries(6))
+
+
+class AsyncFlightAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        timetable.clear()
+        self.flight = sample_flight()
+        self.flight.crew.add(sample_crew())
+        self.other_route = Route.objects.create(
+            source=self.flight.route.destination,
+            destination=self.flight.route.source,
+            distance=1150,
+        )
+        first_departure = datetime(2024, 12, 6, tzinfo=timezone.utc)
+        for hour in range(0, 60, 5):
+            Flight.objects.create(
+                number=f"CD{hour}",
+                route=self.other_route if hour % 2 else self.flight.route,
+                airplane=self.flight.airplane,
+                departure_time=first_departure + timedelta(hours=hour),
+                arrival_time=first_departure + timedelta(hours=hour + 20),
+            )
+
+    def assertSameResponse(self, async_url, sync_url, params=None):
+        async_response = self.client.get(async_url, params)
+        sync_response = self.client.get(sync_url, params)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(
+            json.loads(async_response.content.replace(b"/async/", b"/")),
+            sync_response.json(),
+        )
+
+    def test_async_flight_list_matches_sync_list(self):
+        searches = [
+            {},
+            {"page": 2},
+            {"source": self.other_route.source_id},
+            {"departure_date": "2024-12-06", "arrival_date": "2024-12-07"},
+            {
+                "departure_after": "2024-12-06T10:00:00+00:00",
+                "departure_before": "2024-12-07T10:00:00+00:00",
+                "destination": self.flight.route.destination_id,
+            },
+            {"min_seats": 180},
+            {"airplane_type": self.flight.airplane.airplane_type_id},
+            {"page": 9},
+            {"source": "1,x"},
+            {"departure_date": "2024-12-06", "departure_before": "never"},
+        ]
+        for params in searches:
+            for from_timetable in (False, True):
+                with self.subTest(params=params, timetable=from_timetable):
+                    with self.settings(
+                        FLIGHT_LIST_FROM_TIMETABLE=from_timetable
+                    ):
+                        self.assertSameResponse(
+                            FLIGHT_ASYNC_URL, FLIGHT_URL, params
+                        )
+
+    def test_async_flight_detail_matches_sync_detail(self):
+        async_url = reverse(
+            "flight-ops:flight-async-detail", args=[self.flight.id]
+        )
+        self.assertSameResponse(async_url, flight_detail_url(self.flight.id))
+        self.assertSameResponse(
+            async_url,
+            flight_detail_url(self.flight.id),
+            {"source": self.other_route.source_id},
+        )
+
+        admin = get_user_model().objects.create_superuser(
+            email="test_admin@test.com", password="test1234"
+        )
+        token = RefreshToken.for_user(admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertSameResponse(async_url, flight_detail_url(self.flight.id))
+        self.assertIn("crew", self.client.get(async_url).json())
+
+    def test_async_flight_detail_not_found(self):
+        response = self.client.get(
+            reverse("flight-ops:flight-async-detail", args=[0])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_async_route_views_match_sync_views(self):
+        self.assertSameResponse(ROUTE_ASYNC_URL, ROUTE_URL)
+        self.assertSameResponse(
+            reverse(
+                "flight-ops:route-async-detail", args=[self.other_route.id]
+            ),
+            route_detail_url(self.other_route.id),
+        )
+
+    def test_async_views_are_read_only(self):
+        response = self.client.post(FLIGHT_ASYNC_URL, {})
+        self.assertEqual(
+            response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+
+    def test_async_views_reject_invalid_tokens(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+        self.assertSameResponse(FLIGHT_ASYNC_URL, FLIGHT_URL)
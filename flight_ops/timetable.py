@@ -0,0 +1,562 @@
+import bisect
+import heapq
+import threading
+import uuid
+from array import array
+from collections import OrderedDict, defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Flight, Route
+
+MAX_PARTITIONS = 62
+MAX_REACHABILITY = 256
+VERSION_KEY = "timetable:version"
+ROUTES_VERSION_KEY = "timetable:routes"
+
+
+def get_timetable_cache():
+    return caches[settings.TIMETABLE_CACHE_ALIAS]
+
+
+def date_version_key(date):
+    return f"timetable:version:{date.isoformat()}"
+
+
+def _bump_versions(keys):
+    """
+    Move the change versions under the keys, again once the transaction
+    commits so that nothing stays loaded from the rows before the commit.
+    """
+    def bump():
+        get_timetable_cache().set_many(
+            {key: uuid.uuid4().hex for key in keys}, timeout=None
+        )
+
+    if keys:
+        bump()
+        transaction.on_commit(bump)
+
+
+def bump_timetable_version(*args, **kwargs):
+    """
+    Make every process reload its whole timetable, e.g. after bulk writes
+    over many dates. Works as a signal receiver.
+    """
+    _bump_versions([VERSION_KEY])
+
+
+def bump_timetable_dates(dates):
+    """Make every process reload the partitions of the local dates."""
+    _bump_versions([date_version_key(date) for date in set(dates)])
+
+
+def bump_timetable_routes():
+    """Make every process reload the routes between airports."""
+    _bump_versions([ROUTES_VERSION_KEY])
+
+
+def to_epoch(value):
+    return int(value.timestamp())
+
+
+def local_date(epoch):
+    return timezone.localtime(
+        datetime.fromtimestamp(epoch, tz=dt_timezone.utc)
+    ).date()
+
+
+def departure_date(value):
+    """Return the local date of the partition a departure time belongs to."""
+    if timezone.is_naive(value):
+        # Stored in the default time zone like Django does
+        value = timezone.make_aware(value, timezone.get_default_timezone())
+    return timezone.localdate(value)
+
+
+def date_range(date):
+    """Return the [midnight, next midnight) range of a local date."""
+    return (
+        timezone.make_aware(datetime.combine(date, time.min)),
+        timezone.make_aware(
+            datetime.combine(date + timedelta(days=1), time.min)
+        ),
+    )
+
+
+class TimetablePartition:
+    """
+    The flights departing on one local date in parallel array columns,
+    sorted by departure, arrival and id like the flight list. Row positions
+    of each source airport are kept in departure order as well, so that the
+    flights leaving an airport within a time window are found by binary
+    search.
+    """
+
+    def __init__(self, date, rows, version=None):
+        self.date = date
+        self.start, self.end = map(to_epoch, date_range(date))
+        self.version = version
+        self.loaded_at = monotonic()
+        rows = sorted(rows)
+        self.departures = array("q", (row[0] for row in rows))
+        self.arrivals = array("q", (row[1] for row in rows))
+        self.flight_ids = array("q", (row[2] for row in rows))
+        self.source_ids = array("q", (row[3] for row in rows))
+        self.destination_ids = array("q", (row[4] for row in rows))
+
+        positions_by_source = defaultdict(lambda: array("q"))
+        for position, source_id in enumerate(self.source_ids):
+            positions_by_source[source_id].append(position)
+        self.positions_by_source = dict(positions_by_source)
+        positions_by_destination = defaultdict(lambda: array("q"))
+        for position, destination_id in enumerate(self.destination_ids):
+            positions_by_destination[destination_id].append(position)
+        self.positions_by_destination = dict(positions_by_destination)
+
+    @classmethod
+    def load(cls, date, version=None):
+        start, end = date_range(date)
+        rows = Flight.objects.filter(
+            departure_time__gte=start, departure_time__lt=end
+        ).values_list(
+            "departure_time",
+            "arrival_time",
+            "id",
+            "route__source_id",
+            "route__destination_id",
+        )
+        return cls(
+            date,
+            (
+                (to_epoch(departure), to_epoch(arrival), *ids)
+                for departure, arrival, *ids in rows
+            ),
+            version,
+        )
+
+    def __len__(self):
+        return len(self.flight_ids)
+
+    def positions_between(self, start, end):
+        return range(
+            bisect.bisect_left(self.departures, start),
+            bisect.bisect_left(self.departures, end),
+        )
+
+    def positions_from(self, airport_id, start, end):
+        return self.positions_within(
+            self.positions_by_source.get(airport_id), start, end
+        )
+
+    def positions_within(self, positions, start, end):
+        """Return the given positions departing within [start, end)."""
+        if positions is None:
+            return ()
+        departure = self.departures.__getitem__
+        return positions[
+            bisect.bisect_left(positions, start, key=departure):
+            bisect.bisect_left(positions, end, key=departure)
+        ]
+
+    def entry(self, position):
+        return (
+            self.departures[position],
+            self.arrivals[position],
+            self.destination_ids[position],
+            self.flight_ids[position],
+        )
+
+
+class Timetable:
+    """
+    A process-level index of flights by departure time and source airport.
+
+    Date partitions are loaded on first use and at most MAX_PARTITIONS of
+    them stay in memory. Each date has a change version in the
+    TIMETABLE_CACHE_ALIAS cache, which flight signals move for the old and
+    new departure dates of a flight, and a partition is reloaded once the
+    version of its date moves. Routes have a version of their own, and a
+    global version drops everything, e.g. after route updates or bulk
+    writes over many dates. Writes that bypass the signals, e.g.
+    bulk_create, must call bump_timetable_dates() or
+    bump_timetable_version(). Point the alias to a shared cache to reach
+    every worker. Otherwise partitions and routes are reloaded once they
+    are older than TIMETABLE_MAX_AGE seconds, so that the workers that did
+    not see a change catch up with it.
+    """
+
+    def __init__(self, max_partitions=MAX_PARTITIONS):
+        self.max_partitions = max_partitions
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._partitions = OrderedDict()
+            self._clear_routes()
+            self._version = self._routes_version = None
+
+    def _clear_routes(self):
+        self._sources_by_destination = None
+        self._routes_loaded_at = None
+        self._reachable = OrderedDict()
+
+    def refresh(self):
+        """
+        Drop everything loaded under an older global version and the routes
+        loaded under an older routes version. The partitions check the
+        version of their date when they are used.
+        """
+        versions = get_timetable_cache().get_many(
+            [VERSION_KEY, ROUTES_VERSION_KEY]
+        )
+        with self._lock:
+            if versions.get(VERSION_KEY) != self._version:
+                self.clear()
+                self._version = versions.get(VERSION_KEY)
+            if versions.get(ROUTES_VERSION_KEY) != self._routes_version:
+                self._clear_routes()
+                self._routes_version = versions.get(ROUTES_VERSION_KEY)
+
+    @staticmethod
+    def _is_stale(loaded_at):
+        return monotonic() - loaded_at > settings.TIMETABLE_MAX_AGE
+
+    def _partition(self, date):
+        version = get_timetable_cache().get(date_version_key(date))
+        with self._lock:
+            partition = self._partitions.get(date)
+            if (
+                partition is not None
+                and partition.version == version
+                and not self._is_stale(partition.loaded_at)
+            ):
+                self._partitions.move_to_end(date)
+                return partition
+
+            partition = TimetablePartition.load(date, version)
+            self._partitions[date] = partition
+            while len(self._partitions) > self.max_partitions:
+                self._partitions.popitem(last=False)
+            return partition
+
+    def _partitions_between(self, start, end):
+        date = local_date(start)
+        last_date = local_date(end - 1)
+        while date <= last_date:
+            yield self._partition(date)
+            date += timedelta(days=1)
+
+    def departures(self, airport_id, start, end):
+        """
+        Yield the (departure, arrival, destination_id, flight_id) entries of
+        the flights leaving the airport within [start, end) epoch seconds.
+        """
+        for partition in self._partitions_between(start, end):
+            for position in partition.positions_from(airport_id, start, end):
+                yield partition.entry(position)
+
+    def flight_ids(self, start, end, source_ids=None, destination_ids=None,
+                   arrival_start=None, arrival_end=None):
+        """
+        Return the ids of the flights departing within [start, end) epoch
+        seconds in the flight list order, optionally only the ones between
+        the given airports and arriving within [arrival_start, arrival_end).
+        """
+        self.refresh()
+        flight_ids = []
+        for partition in self._partitions_between(start, end):
+            for position in partition.positions_between(start, end):
+                if (
+                    source_ids is not None
+                    and partition.source_ids[position] not in source_ids
+                ):
+                    continue
+                if (
+                    destination_ids is not None
+                    and partition.destination_ids[position]
+                    not in destination_ids
+                ):
+                    continue
+                if arrival_start is not None and not (
+                    arrival_start <= partition.arrivals[position] < arrival_end
+                ):
+                    continue
+                flight_ids.append(partition.flight_ids[position])
+        return flight_ids
+
+    def _reachability(self, destination_id, max_legs):
+        """
+        Return sets of airports indexed by leg count, the k-th holding the
+        airports that reach the destination by at most k routes. The sets
+        of the last MAX_REACHABILITY searched destinations are kept.
+        """
+        with self._lock:
+            if (
+                self._sources_by_destination is not None
+                and self._is_stale(self._routes_loaded_at)
+            ):
+                self._clear_routes()
+
+            reachable = self._reachable.get((destination_id, max_legs))
+            if reachable is not None:
+                self._reachable.move_to_end((destination_id, max_legs))
+                return reachable
+
+            if self._sources_by_destination is None:
+                self._routes_loaded_at = monotonic()
+                sources_by_destination = defaultdict(set)
+                for source_id, route_destination_id in (
+                    Route.objects.values_list("source_id", "destination_id")
+                ):
+                    sources_by_destination[route_destination_id].add(
+                        source_id
+                    )
+                self._sources_by_destination = sources_by_destination
+            sources_by_destination = self._sources_by_destination
+
+        reachable = [{destination_id}]
+        for _ in range(max_legs - 1):
+            previous = reachable[-1]
+            reachable.append(
+                previous.union(
+                    *(
+                        sources_by_destination.get(airport_id, ())
+                        for airport_id in previous
+                    )
+                )
+            )
+        with self._lock:
+            if sources_by_destination is not self._sources_by_destination:
+                # Cleared meanwhile, the sets may be out of date
+                return reachable
+            self._reachable[destination_id, max_legs] = reachable
+            while len(self._reachable) > MAX_REACHABILITY:
+                self._reachable.popitem(last=False)
+        return reachable
+
+    def search(self, source_id, destination_id, start, end, max_legs,
+               min_layover, max_layover, limit):
+        """
+        Find the `limit` itineraries from the source airport departing within
+        [start, end) that reach the destination first by at most `max_legs`
+        flights, with layovers between `min_layover` and `max_layover`
+        seconds, keeping the best itinerary of every first flight.
+
+        Returns lists of entries ordered by arrival, then by the number of
+        legs and the latest departure. See ConnectionSearch.
+        """
+        self.refresh()
+        search = ConnectionSearch(
+            self,
+            destination_id,
+            self._reachability(destination_id, max_legs),
+            min_layover,
+            max_layover,
+            limit,
+        )
+        return search.run(source_id, start, end)
+
+
+class ConnectionSearch:
+    """
+    A round-based search like RAPTOR: round k adds the k-th leg to the
+    partial itineraries of round k - 1. The search starts from the first
+    flights in arrival order and each first flight only keeps its earliest
+    arriving itinerary, the one with fewer legs on a tie.
+
+    Once `limit` itineraries are found, the latest of their arrivals bounds
+    the search: partial itineraries arriving at that time or later cannot
+    make it to the results, and the search stops at the first flight that
+    arrives after it. Legs only go to airports that can still reach the
+    destination with the legs left, and the last leg is looked up among
+    the flights to the destination, grouped by source airport.
+    """
+
+    def __init__(self, timetable, destination_id, reachable, min_layover,
+                 max_layover, limit):
+        self.timetable = timetable
+        self.destination_id = destination_id
+        self.reachable = reachable
+        self.max_legs = len(reachable)
+        self.min_layover = min_layover
+        self.max_layover = max_layover
+        self.limit = limit
+        # A max-heap of the best itineraries, by their negated sort keys
+        self.results = []
+        self._starts = []
+        self._partitions = []
+        self._last_legs = {}
+
+    def run(self, source_id, start, end):
+        first_legs = sorted(
+            (
+                entry
+                for entry in self._departures(source_id, start, end)
+                if entry[2] in self.reachable[-1]
+            ),
+            key=lambda entry: (entry[1], -entry[0]),
+        )
+        for first_leg in first_legs:
+            if first_leg[1] > self.bound():
+                break
+            legs = self._best_itinerary(source_id, first_leg)
+            if legs is not None:
+                self._add_result(legs)
+
+        return [legs for *_, legs in sorted(self.results, reverse=True)]
+
+    def bound(self):
+        """Return the arrival the results must not exceed."""
+        if len(self.results) < self.limit:
+            return float("inf")
+        return -self.results[0][0]
+
+    def _add_result(self, legs):
+        # The first flight id breaks ties, every itinerary has its own
+        result = (-legs[-1][1], -len(legs), legs[0][0], legs[0][3], legs)
+        if len(self.results) < self.limit:
+            heapq.heappush(self.results, result)
+        elif result > self.results[0]:
+            heapq.heapreplace(self.results, result)
+
+    def _best_itinerary(self, source_id, first_leg):
+        if first_leg[2] == self.destination_id:
+            return [first_leg]
+
+        best, best_arrival = None, self.bound()
+        itineraries = [[first_leg]]
+        for leg_count in range(1, self.max_legs):
+            legs_left = self.max_legs - leg_count - 1
+            next_itineraries = []
+            for legs in itineraries:
+                arrival = legs[-1][1]
+                if arrival >= best_arrival:
+                    continue
+                earliest = arrival + self.min_layover
+                latest = min(arrival + self.max_layover + 1, best_arrival)
+                last_leg = self._last_leg(legs[-1][2], earliest, latest)
+                if last_leg is not None and (
+                    last_leg[1] < best_arrival
+                    # May still beat a result arriving as late on a tie
+                    or best is None and last_leg[1] == best_arrival
+                ):
+                    best, best_arrival = legs + [last_leg], last_leg[1]
+                    latest = min(latest, best_arrival)
+                if not legs_left:
+                    continue
+
+                visited = {
+                    source_id, self.destination_id, *(leg[2] for leg in legs)
+                }
+                reachable = self.reachable[legs_left]
+                for partition in self._partitions_between(earliest, latest):
+                    arrivals = partition.arrivals
+                    destination_ids = partition.destination_ids
+                    for position in partition.positions_from(
+                        legs[-1][2], earliest, latest
+                    ):
+                        if (
+                            arrivals[position] < best_arrival
+                            and destination_ids[position] in reachable
+                            and destination_ids[position] not in visited
+                        ):
+                            next_itineraries.append(
+                                legs + [partition.entry(position)]
+                            )
+            itineraries = next_itineraries
+        return best
+
+    def _partitions_between(self, start, end):
+        """
+        Return the partitions departing within [start, end), remembering
+        their bounds to skip the local date conversions of later lookups.
+        """
+        partitions = []
+        while start < end:
+            index = bisect.bisect_right(self._starts, start) - 1
+            if index >= 0 and start < self._partitions[index].end:
+                partition = self._partitions[index]
+            else:
+                partition = self.timetable._partition(local_date(start))
+                self._starts.insert(index + 1, partition.start)
+                self._partitions.insert(index + 1, partition)
+            partitions.append(partition)
+            start = partition.end
+        return partitions
+
+    def _departures(self, airport_id, start, end):
+        for partition in self._partitions_between(start, end):
+            for position in partition.positions_from(airport_id, start, end):
+                yield partition.entry(position)
+
+    def _last_leg(self, airport_id, start, end):
+        """
+        Return the earliest arriving flight from the airport to the
+        destination departing within [start, end), if any.
+        """
+        best = None
+        for partition in self._partitions_between(start, end):
+            last_legs = self._last_legs.get(partition.date)
+            if last_legs is None:
+                last_legs = defaultdict(lambda: array("q"))
+                for position in partition.positions_by_destination.get(
+                    self.destination_id, ()
+                ):
+                    last_legs[partition.source_ids[position]].append(position)
+                self._last_legs[partition.date] = last_legs = dict(last_legs)
+
+            for position in partition.positions_within(
+                last_legs.get(airport_id), start, end
+            ):
+                if best is None or partition.arrivals[position] < best[1]:
+                    best = partition.entry(position)
+        return best
+
+
+timetable = Timetable()
+
+
+def search_connections(source, destination, date, max_legs, min_layover,
+                       max_layover, limit):
+    """
+    Search the timetable for itineraries departing on the local date and
+    hydrate the legs of the best `limit` of them with one query.
+    """
+    start, end = date_range(date)
+    itineraries = timetable.search(
+        source,
+        destination,
+        to_epoch(start),
+        to_epoch(end),
+        max_legs,
+        min_layover * 60,
+        max_layover * 60,
+        limit,
+    )
+
+    flight_ids = {entry[3] for legs in itineraries for entry in legs}
+    flights = (
+        Flight.objects.select_related("route__source", "route__destination")
+        .with_seats_held()
+        .in_bulk(flight_ids)
+    )
+    results = []
+    for legs in itineraries:
+        leg_flights = [flights.get(entry[3]) for entry in legs]
+        if None in leg_flights:
+            continue
+        results.append(
+            {
+                "departure_time": leg_flights[0].departure_time,
+                "arrival_time": leg_flights[-1].arrival_time,
+                "legs": leg_flights,
+            }
+        )
+    return results
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from . import async_views
 from .views import CrewViewSet, RouteViewSet, FlightViewSet
 
 router = routers.DefaultRouter()
@@ -8,6 +9,24 @@ router.register("routes", RouteViewSet)
 router.register("crew", CrewViewSet)
 router.register("flights", FlightViewSet)
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("", include(router.urls)),
+    path(
+        "async/flights/",
+        async_views.flight_list,
+        name="flight-async-list"
+    ),
+    path(
+        "async/flights/<int:pk>/",
+        async_views.flight_detail,
+        name="flight-async-detail"
+    ),
+    path("async/routes/", async_views.route_list, name="route-async-list"),
+    path(
+        "async/routes/<int:pk>/",
+        async_views.route_detail,
+        name="route-async-detail"
+    ),
+]
 
 app_name = "flight-ops"
@@ -1,20 +1,33 @@
-from datetime import datetime
-
-from django.db.models import F, Count
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiParameter,
+)
 from rest_framework import viewsets, mixins
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
+from airport_api.caching import ReferenceCacheMixin
+from airport_api.streaming import StreamingListMixin, STREAM_PARAMETER
+from .filters import FlightFilter
 from .models import Crew, Route, Flight
+from .pagination import FlightCursorPagination
+from .seat_map import SeatMap
 from .serializers import (
     RouteSerializer,
     RouteListSerializer,
     RouteDetailSerializer,
     CrewSerializer,
     FlightSerializer,
+    FlightBatchSerializer,
     FlightListSerializer,
-    FlightDetailSerializer
+    FlightDetailSerializer,
+    SeatMapSerializer,
+    ConnectionSearchSerializer,
+    ItinerarySerializer,
 )
+from .timetable import search_connections
 
 
 class CrewViewSet(viewsets.ModelViewSet):
@@ -23,18 +36,16 @@ class CrewViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAdminUser,)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+@extend_schema_view(list=extend_schema(parameters=[STREAM_PARAMETER]))
+class RouteViewSet(
+    StreamingListMixin, ReferenceCacheMixin, viewsets.ModelViewSet
+):
     queryset = Route.objects.select_related("source", "destination")
 
     def get_queryset(self):
         queryset = self.queryset
         if self.action == "retrieve":
-            queryset = queryset.select_related(
-                "source__closest_big_city",
-                "source__closest_big_city__country",
-                "destination__closest_big_city",
-                "destination__closest_big_city__country"
-            )
+            queryset = queryset.select_related(*Route.str_related_fields())
         return queryset
 
     def get_serializer_class(self):
@@ -46,6 +57,7 @@ class RouteViewSet(viewsets.ModelViewSet):
 
 
 class FlightViewSet(
+    StreamingListMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -58,54 +70,53 @@ class FlightViewSet(
         "route__destination"
     )
 
-    @staticmethod
-    def _params_to_int(query_str):
-        return [int(str_id) for str_id in query_str.split(",")]
-
-    def get_queryset(self):
+    @property
+    def paginator(self):
         """
-        Filter the list by certain parameters and annotate the queryset with
-        available seats count.
+        Page through the list by keyset with ?pagination=cursor and keep
+        page numbers as the default for admin clients.
         """
-        queryset = self.queryset
-        source = self.request.query_params.get("source")
-        destination = self.request.query_params.get("destination")
-        departure_date = self.request.query_params.get("departure_date")
-        arrival_date = self.request.query_params.get("arrival_date")
-
-        if source:
-            source_ids = self._params_to_int(source)
-            queryset = queryset.filter(route__source_id__in=source_ids)
-        if destination:
-            destination_ids = self._params_to_int(destination)
-            queryset = queryset.filter(
-                route__destination_id__in=destination_ids
-            )
+        request = getattr(self, "request", None)
+        if (
+            not hasattr(self, "_paginator")
+            and request is not None
+            and request.query_params.get("pagination") == "cursor"
+        ):
+            self._paginator = FlightCursorPagination()
+        return super().paginator
 
-        if departure_date:
-            dep_date = datetime.strptime(departure_date, "%Y-%m-%d").date()
-            queryset = queryset.filter(departure_time__date=dep_date)
-        if arrival_date:
-            arr_date = datetime.strptime(arrival_date, "%Y-%m-%d").date()
-            queryset = queryset.filter(arrival_time__date=arr_date)
+    def _timetable_flight_ids(self):
+        """
+        Find the ids of the listed flights in the in-memory timetable, or
+        return None to query the database. Streams and cursor pages always
+        query the database.
+        """
+        if self.stream_requested() or isinstance(
+            self.paginator, FlightCursorPagination
+        ):
+            return None
+        return FlightFilter(self.request.query_params).timetable_flight_ids()
 
-        if self.action == "list":
-            queryset = queryset.annotate(
-                seats_available=F("airplane__seats_in_row")
-                * F("airplane__rows") - Count("tickets")
-            )
+    def get_queryset(self):
+        """
+        Filter the list by certain parameters and count the active seat
+        holds of the listed flights.
+        """
+        queryset = FlightFilter(self.request.query_params).filter(
+            self.queryset, with_seats_held=self.action == "list"
+        )
 
         if self.action == "retrieve":
             queryset = queryset.select_related(
-                "route__source__closest_big_city",
-                "route__destination__closest_big_city",
-                "airplane",
-                "airplane__airplane_type"
-            ).prefetch_related(
-                "route__source__closest_big_city__country",
-                "route__destination__closest_big_city__country",
-                "crew"
-            )
+                *Route.str_related_fields("route__"),
+                "airplane__airplane_type",
+            ).prefetch_related("crew")
+
+        if self.action == "seat_map":
+            queryset = Flight.objects.select_related("airplane")
+
+        if self.action == "list":
+            queryset = FlightListSerializer.flat_values(queryset)
 
         return queryset
 
@@ -114,9 +125,59 @@ class FlightViewSet(
             return FlightListSerializer
         if self.action == "retrieve":
             return FlightDetailSerializer
+        if self.action == "seat_map":
+            return SeatMapSerializer
+        if self.action == "connections":
+            return ItinerarySerializer
+        if self.action == "batch":
+            return FlightBatchSerializer
 
         return FlightSerializer
 
+    @action(methods=["GET"], detail=True, url_path="seat-map")
+    def seat_map(self, request, pk=None):
+        """Show which seats of the flight are taken."""
+        flight = self.get_object()
+        return Response(SeatMap.for_flight(flight).to_representation())
+
+    @extend_schema(
+        request=FlightBatchSerializer(many=True),
+        responses=FlightSerializer(many=True),
+    )
+    @action(methods=["POST"], detail=False)
+    def batch(self, request):
+        """
+        Create and update many flights in one transaction. Items with an id
+        update that flight and the others create new flights. An invalid
+        batch writes nothing and answers with one error object per item.
+        """
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        flight_ids = [flight.pk for flight in serializer.save()]
+
+        flights = Flight.objects.prefetch_related("crew").in_bulk(flight_ids)
+        return Response(
+            FlightSerializer(
+                [flights[flight_id] for flight_id in flight_ids], many=True
+            ).data
+        )
+
+    @extend_schema(
+        parameters=[ConnectionSearchSerializer],
+        responses=ItinerarySerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False)
+    def connections(self, request):
+        """
+        Find itineraries of one to three flights between two airports,
+        earliest arrival first, from the in-memory timetable.
+        """
+        search = ConnectionSearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        itineraries = search_connections(**search.validated_data)
+        serializer = self.get_serializer(itineraries, many=True)
+        return Response(serializer.data)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -141,7 +202,57 @@ class FlightViewSet(
                 description="Filter the flights by their arrival date, e.g. "
                             "2024-09-02."
             ),
+            OpenApiParameter(
+                "departure_after",
+                type={'type': 'string', 'format': 'date-time'},
+                description="Filter the flights departing at or after the "
+                            "time, e.g. 2024-09-01T08:00 or 2024-09-01."
+            ),
+            OpenApiParameter(
+                "departure_before",
+                type={'type': 'string', 'format': 'date-time'},
+                description="Filter the flights departing before the time, "
+                            "e.g. 2024-09-01T12:00."
+            ),
+            OpenApiParameter(
+                "airplane_type",
+                description="Filter the flights by their airplane type ids, "
+                            "e.g. ?airplane_type=1,2."
+            ),
+            OpenApiParameter(
+                "min_seats",
+                type=int,
+                description="Filter the flights by the number of seats "
+                            "neither sold nor held, e.g. ?min_seats=2."
+            ),
+            OpenApiParameter(
+                "pagination",
+                enum=["page", "cursor"],
+                description="Pagination mode. 'cursor' pages by keyset over "
+                            "departure time with opaque cursors and no total "
+                            "count, e.g. ?pagination=cursor.",
+            ),
+            OpenApiParameter(
+                "cursor",
+                description="Opaque cursor from the next or previous link "
+                            "in cursor pagination mode."
+            ),
+            STREAM_PARAMETER,
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        flight_ids = self._timetable_flight_ids()
+        if flight_ids is None:
+            return super().list(request, *args, **kwargs)
+
+        page = self.paginate_queryset(flight_ids)
+        flights = {
+            flight["id"]: flight
+            for flight in FlightListSerializer.flat_values(
+                self.queryset.with_seats_held().filter(pk__in=page)
+            )
+        }
+        serializer = self.get_serializer(
+            [flights[pk] for pk in page if pk in flights], many=True
+        )
+        return self.get_paginated_response(serializer.data)
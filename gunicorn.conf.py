@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration of the production server, run with
+`gunicorn -c gunicorn.conf.py`.
+
+SERVER_MODE selects the interface: "wsgi" serves airport_api.wsgi with
+threaded workers, "asgi" serves airport_api.asgi with uvicorn workers.
+"""
+import multiprocessing
+import os
+
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi")
+if SERVER_MODE not in ("wsgi", "asgi"):
+    raise ValueError(f"Unknown SERVER_MODE {SERVER_MODE!r}.")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(
+    os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+accesslog = os.getenv("GUNICORN_ACCESS_LOG")
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "airport_api.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "airport_api.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.getenv("GUNICORN_THREADS", 4))
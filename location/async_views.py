@@ -0,0 +1,32 @@
+from airport_api.async_api import (
+    AsyncPageNumberPagination,
+    aget_or_404,
+    async_api_view,
+    json_response,
+)
+from .models import Airport
+from .serializers import AirportListSerializer, AirportDetailSerializer
+
+AIRPORTS = Airport.objects.select_related(
+    "closest_big_city",
+    "closest_big_city__country"
+)
+
+
+@async_api_view
+async def airport_list(request):
+    pagination = AsyncPageNumberPagination(request)
+    airports = await pagination.paginate_queryset(AIRPORTS)
+    serializer = AirportListSerializer(
+        airports, many=True, context={"request": request}
+    )
+    return json_response(pagination.get_paginated_data(serializer.data))
+
+
+@async_api_view
+async def airport_detail(request, pk):
+    airport = await aget_or_404(AIRPORTS, pk=pk)
+    serializer = AirportDetailSerializer(
+        airport, context={"request": request}
+    )
+    return json_response(serializer.data)
@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils.translation import gettext as _
+from PIL import Image, ImageOps
+
+from airport_api.caching import invalidate_reference_cache
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_FORMATS = ("JPEG", "PNG", "WEBP", "GIF")
+
+# extension: (Pillow format, save options)
+VARIANT_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+
+
+def file_digest(file):
+    """Return the SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def decode_image(file):
+    """
+    Validate an uploaded image and decode it, once, for the variants.
+    Oversized files and images are rejected before their pixels are read.
+    """
+    if file.size > settings.AIRPORT_IMAGE_MAX_SIZE:
+        raise ValidationError(
+            _("The image must not be larger than %(size)d MB.")
+            % {"size": settings.AIRPORT_IMAGE_MAX_SIZE // (1024 * 1024)}
+        )
+    try:
+        image = Image.open(file)
+        if image.format not in ALLOWED_FORMATS:
+            raise ValidationError(
+                _("Upload a JPEG, PNG, WebP or GIF image.")
+            )
+        if image.width * image.height > settings.AIRPORT_IMAGE_MAX_PIXELS:
+            raise ValidationError(_("The image has too many pixels."))
+        image.load()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        raise ValidationError(
+            _(
+                "Upload a valid image. The file you uploaded was either not "
+                "an image or a corrupted image."
+            )
+        )
+    finally:
+        file.seek(0)
+    return ImageOps.exif_transpose(image)
+
+
+def variant_name(name, width, extension):
+    return f"{Path(name).with_suffix('')}-{width}w.{extension}"
+
+
+def generate_variants(image, name):
+    """
+    Save resized WebP and JPEG copies of a decoded image next to the
+    stored original `name` and return their names by width and extension.
+    Images are never scaled up.
+    """
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+    variants = {}
+    widths = sorted(
+        {min(width, image.width) for width in settings.AIRPORT_IMAGE_WIDTHS}
+    )
+    for width in widths:
+        resized = image
+        if width < image.width:
+            height = max(round(image.height * width / image.width), 1)
+            resized = image.resize(
+                (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0
+            )
+        for extension, (image_format, options) in VARIANT_FORMATS.items():
+            output = resized
+            if image_format == "JPEG" and output.mode != "RGB":
+                output = output.convert("RGB")
+            buffer = BytesIO()
+            output.save(buffer, image_format, **options)
+            variants.setdefault(str(width), {})[extension] = (
+                default_storage.save(
+                    variant_name(name, width, extension),
+                    ContentFile(buffer.getvalue()),
+                )
+            )
+    return variants
+
+
+def delete_image_files(name, variants):
+    """Delete a stored original and its variants."""
+    names = [
+        variant
+        for by_extension in variants.values()
+        for variant in by_extension.values()
+    ]
+    if name:
+        names.append(name)
+    for stored_name in names:
+        default_storage.delete(stored_name)
+
+
+def process_image(airport_id, name, image):
+    """
+    Generate the variants of an airport image and store their names,
+    unless the airport got another image or these variants from another
+    job in the meantime. Returns the stored variants.
+    """
+    from .models import Airport
+
+    variants = generate_variants(image, name)
+    updated = Airport.objects.filter(
+        pk=airport_id, image=name, image_variants={}
+    ).update(image_variants=variants)
+    if not updated:
+        delete_image_files(None, variants)
+        return {}
+    invalidate_reference_cache()
+    return variants
+
+
+def _process_image_in_background(airport_id, name, image):
+    close_old_connections()
+    try:
+        process_image(airport_id, name, image)
+    except Exception:
+        logger.exception("Could not generate the variants of %s", name)
+    finally:
+        close_old_connections()
+        get_slots().release()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.AIRPORT_IMAGE_WORKERS,
+                thread_name_prefix="airport-images",
+            )
+    return _executor
+
+
+def get_slots():
+    """
+    Return the semaphore that bounds the background jobs, running or
+    queued, each of which holds a decoded image.
+    """
+    global _slots
+    with _executor_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(
+                settings.AIRPORT_IMAGE_MAX_PENDING
+            )
+    return _slots
+
+
+def _submit(airport_id, name, image):
+    if get_slots().acquire(blocking=False):
+        try:
+            get_executor().submit(
+                _process_image_in_background, airport_id, name, image
+            )
+            return
+        except RuntimeError:
+            # The pool was shut down with the interpreter
+            get_slots().release()
+
+    # Rather than queue one more decoded image, resize it in this thread
+    try:
+        process_image(airport_id, name, image)
+    except Exception:
+        logger.exception("Could not generate the variants of %s", name)
+
+
+def schedule_variants(airport, image):
+    """
+    Generate the variants of the airport's new image in the thread pool
+    once the transaction commits, or right away when AIRPORT_IMAGE_WORKERS
+    is 0. Pillow releases the GIL while resizing and encoding, so the
+    threads run in parallel with the request threads. When
+    AIRPORT_IMAGE_MAX_PENDING jobs are already waiting or running, the
+    committing thread generates them itself.
+
+    Jobs still queued when a worker exits are lost; the
+    generate_image_variants command generates what they left missing.
+    """
+    args = (airport.pk, airport.image.name, image)
+    if not settings.AIRPORT_IMAGE_WORKERS:
+        airport.image_variants = process_image(*args)
+        return
+    transaction.on_commit(lambda: _submit(*args))
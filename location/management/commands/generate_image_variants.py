@@ -0,0 +1,52 @@
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from location.images import decode_image, process_image
+from location.models import Airport
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the missing variants of airport images, e.g. when a "
+        "worker exited before its background jobs ran."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the airports missing variants.",
+        )
+
+    def handle(self, *args, **options):
+        airports = (
+            Airport.objects.exclude(image="")
+            .filter(image_variants={})
+            .values_list("id", "image")
+        )
+        generated = failed = 0
+        for airport_id, name in airports.iterator():
+            if options["dry_run"]:
+                self.stdout.write(f"Airport {airport_id}: {name}")
+                generated += 1
+                continue
+
+            try:
+                with default_storage.open(name) as f:
+                    image = decode_image(f)
+            except (OSError, ValidationError) as error:
+                failed += 1
+                self.stderr.write(f"Airport {airport_id}: {name}: {error}")
+                continue
+            if process_image(airport_id, name, image):
+                generated += 1
+
+        action = "Found" if options["dry_run"] else "Generated variants of"
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} {generated} airport images.")
+        )
+        if failed:
+            self.stdout.write(
+                self.style.WARNING(f"Could not read {failed} images.")
+            )
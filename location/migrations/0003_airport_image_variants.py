@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 21:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("location", "0002_airport_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="airport",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -4,6 +4,8 @@ from pathlib import Path
 from django.db import models
 from django.utils.text import slugify
 
+from .images import file_digest
+
 
 class Country(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -33,7 +35,15 @@ class City(models.Model):
 
 
 def airport_image_file_path(instance, filename):
-    name = f"{slugify(instance.name)}-{uuid.uuid4()}" + Path(filename).suffix
+    """
+    Name an uploaded image after its content, so that a URL always serves
+    the same image and can be cached for good.
+    """
+    if instance.image and not instance.image._committed:
+        version = file_digest(instance.image.file)[:16]
+    else:
+        version = uuid.uuid4()
+    name = f"{slugify(instance.name)}-{version}" + Path(filename).suffix.lower()
     return Path("upload/airports/") / Path(name)
 
 
@@ -45,6 +55,7 @@ class Airport(models.Model):
         on_delete=models.CASCADE
     )
     image = models.ImageField(null=True, upload_to=airport_image_file_path)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ["name"]
@@ -1,8 +1,47 @@
+from django.core.files.storage import default_storage
+from django.db import transaction
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from .images import decode_image, delete_image_files, schedule_variants
 from .models import Country, City, Airport
 
 
+@extend_schema_field(OpenApiTypes.OBJECT)
+class ImageVariantsField(serializers.Field):
+    """
+    URLs of the resized copies of an airport image by width and extension,
+    e.g. {"320": {"webp": ..., "jpg": ...}}. With smallest=True only those
+    of the smallest width, for thumbnails, or None.
+    """
+
+    def __init__(self, smallest=False, **kwargs):
+        self.smallest = smallest
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, variants):
+        if not self.smallest:
+            return {
+                width: self.get_urls(names)
+                for width, names in variants.items()
+            }
+        if not variants:
+            return None
+        return self.get_urls(variants[min(variants, key=int)])
+
+    def get_urls(self, names):
+        request = self.context.get("request")
+        urls = {}
+        for extension, name in names.items():
+            url = default_storage.url(name)
+            urls[extension] = (
+                request.build_absolute_uri(url) if request else url
+            )
+        return urls
+
+
 class CountrySerializer(serializers.ModelSerializer):
     class Meta:
         model = Country
@@ -27,15 +66,42 @@ class AirportSerializer(serializers.ModelSerializer):
 
 class AirportListSerializer(AirportSerializer):
     closest_big_city = serializers.StringRelatedField(read_only=True)
+    thumbnail = ImageVariantsField(smallest=True, source="image_variants")
+
+    class Meta(AirportSerializer.Meta):
+        fields = AirportSerializer.Meta.fields + ("thumbnail",)
 
 
 class AirportDetailSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Airport
-        fields = ("id", "name", "closest_big_city", "image")
+        fields = ("id", "name", "closest_big_city", "image", "image_variants")
 
 
 class AirportImageSerializer(serializers.ModelSerializer):
+    # Validated by decode_image(), which decodes the image only once
+    image = serializers.FileField()
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Airport
-        fields = ("id", "image")
+        fields = ("id", "image", "image_variants")
+
+    def validate_image(self, image):
+        self.decoded_image = decode_image(image)
+        return image
+
+    def update(self, instance, validated_data):
+        """
+        Store the image, generate its variants in the background and
+        delete the previous image with its variants.
+        """
+        previous = (instance.image.name, instance.image_variants)
+        instance.image_variants = {}
+        instance = super().update(instance, validated_data)
+        schedule_variants(instance, self.decoded_image)
+        if previous[0]:
+            transaction.on_commit(lambda: delete_image_files(*previous))
+        return instance
@@ -0,0 +1,67 @@
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase
+
+from location.images import delete_image_files
+from location.models import Airport
+from location.tests.utils import (
+    sample_airport,
+    sample_city,
+    sample_country,
+    upload_file,
+)
+
+
+class GenerateImageVariantsCommandTests(TestCase):
+    def setUp(self):
+        city = sample_city(country=sample_country())
+        self.airport = sample_airport(closest_big_city=city)
+        self.other_airport = sample_airport(
+            name="Gatwick", closest_big_city=city
+        )
+        with upload_file(size=(400, 200)) as f:
+            # Saved without variants, as if its background job was lost
+            self.airport.image.save("lost.jpg", ContentFile(f.read()))
+        self.addCleanup(self.delete_files)
+
+    def delete_files(self):
+        self.airport.refresh_from_db()
+        delete_image_files(
+            self.airport.image.name, self.airport.image_variants
+        )
+
+    def test_dry_run_only_reports_missing_variants(self):
+        out = StringIO()
+        call_command("generate_image_variants", dry_run=True, stdout=out)
+
+        self.assertIn(self.airport.image.name, out.getvalue())
+        self.assertIn("Found 1 airport images", out.getvalue())
+        self.airport.refresh_from_db()
+        self.assertEqual(self.airport.image_variants, {})
+
+    def test_generate_missing_variants(self):
+        out = StringIO()
+        call_command("generate_image_variants", stdout=out)
+
+        self.assertIn("Generated variants of 1 airport images", out.getvalue())
+        self.airport.refresh_from_db()
+        self.assertEqual(set(self.airport.image_variants), {"320", "400"})
+        self.other_airport.refresh_from_db()
+        self.assertEqual(self.other_airport.image_variants, {})
+
+        out = StringIO()
+        call_command("generate_image_variants", stdout=out)
+        self.assertIn("Generated variants of 0 airport images", out.getvalue())
+
+    def test_unreadable_images_are_reported(self):
+        Airport.objects.filter(pk=self.other_airport.pk).update(
+            image="uploads/airports/missing.jpg"
+        )
+        out, err = StringIO(), StringIO()
+        call_command("generate_image_variants", stdout=out, stderr=err)
+
+        self.assertIn("missing.jpg", err.getvalue())
+        self.assertIn("Could not read 1 images", out.getvalue())
+        self.assertIn("Generated variants of 1 airport images", out.getvalue())
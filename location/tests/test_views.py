@@ -1,13 +1,21 @@
+import hashlib
+import json
 import os.path
+import threading
 from tempfile import NamedTemporaryFile
 
+from unittest import mock
+
 from PIL import Image
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from airport_api.caching import get_reference_cache, get_reference_state
+from location.images import delete_image_files
 from location.models import Country, City, Airport
 from location.serializers import (
     CountrySerializer,
@@ -15,7 +23,12 @@ from location.serializers import (
     AirportListSerializer,
     AirportDetailSerializer,
 )
-from location.tests.utils import sample_country, sample_city, sample_airport
+from location.tests.utils import (
+    sample_country,
+    sample_city,
+    sample_airport,
+    upload_file,
+)
 from user.tests.utils import sample_user
 
 COUNTRY_URL = reverse("location:country-list")
@@ -69,6 +82,54 @@ class AdminCountryAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
 
+class ReferenceCacheAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        get_reference_cache().clear()
+        self.country = sample_country()
+
+    def test_cache_hit_runs_no_queries(self):
+        first_response = self.client.get(COUNTRY_URL)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(COUNTRY_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, first_response.data)
+
+    def test_conditional_request_not_modified(self):
+        response = self.client.get(COUNTRY_URL)
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(
+            COUNTRY_URL, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_save_invalidates_cache(self):
+        etag = self.client.get(COUNTRY_URL)["ETag"]
+        sample_country(name="US")
+
+        response = self.client.get(COUNTRY_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+
+    def test_delete_invalidates_cache(self):
+        self.client.get(COUNTRY_URL)
+        self.country.delete()
+
+        response = self.client.get(COUNTRY_URL)
+        self.assertEqual(response.data["count"], 0)
+
+    def test_commit_invalidates_cache_again(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            sample_country(name="US")
+            # A response cached now may be built from the rows before
+            # the commit
+            version = get_reference_state()[0]
+
+        self.assertNotEqual(get_reference_state()[0], version)
+
+
 class PublicCityAPITests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -141,6 +202,23 @@ class PublicAirportAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_async_airport_views_match_sync_views(self):
+        sample_airport(**self.payload)
+        for async_url, sync_url in (
+            (reverse("location:airport-async-list"), AIRPORT_URL),
+            (
+                reverse(
+                    "location:airport-async-detail", args=[self.airport.id]
+                ),
+                airport_detail_url(self.airport.id),
+            ),
+        ):
+            async_response = self.client.get(async_url)
+            self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                async_response.json(), self.client.get(sync_url).json()
+            )
+
     def test_create_airport_forbidden_for_anon_users(self):
         response = self.client.post(AIRPORT_URL, self.payload)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -167,7 +245,18 @@ class AdminAirportAPITests(TestCase):
         response = self.client.post(AIRPORT_URL, self.payload, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_stream_airports(self):
+        sample_airport(closest_big_city=City.objects.get())
+
+        response = self.client.get(AIRPORT_URL, {"stream": "true"})
+
+        self.assertEqual(
+            json.loads(b"".join(response.streaming_content)),
+            AirportListSerializer(Airport.objects.all(), many=True).data,
+        )
+
 
+@override_settings(AIRPORT_IMAGE_WORKERS=0)
 class AirportImageUploadTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -180,7 +269,18 @@ class AirportImageUploadTests(TestCase):
         self.airport = sample_airport(closest_big_city=self.city)
 
     def tearDown(self):
-        self.airport.image.delete()
+        self.airport.refresh_from_db()
+        delete_image_files(
+            self.airport.image.name, self.airport.image_variants
+        )
+
+    def upload(self, **params):
+        with upload_file(**params) as temp_file:
+            return self.client.post(
+                airport_image_upload_url(self.airport.id),
+                {"image": temp_file},
+                format="multipart",
+            )
 
     def test_upload_image_to_airport(self):
         url = airport_image_upload_url(self.airport.id)
@@ -246,3 +346,113 @@ class AirportImageUploadTests(TestCase):
 
         response = self.client.get(airport_detail_url(self.airport.id))
         self.assertIn("image", response.data)
+
+    def test_upload_generates_variants(self):
+        response = self.upload(size=(400, 200))
+        self.airport.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(self.airport.image_variants), {"320", "400"})
+        for width, names in self.airport.image_variants.items():
+            self.assertEqual(set(names), {"webp", "jpg"})
+            for name in names.values():
+                with default_storage.open(name) as f, Image.open(f) as image:
+                    self.assertEqual(image.width, int(width))
+        self.assertTrue(
+            response.data["image_variants"]["320"]["webp"].endswith(
+                self.airport.image_variants["320"]["webp"]
+            )
+        )
+
+    def test_image_is_named_after_its_content(self):
+        self.upload(size=(20, 20))
+        self.airport.refresh_from_db()
+        first_name = self.airport.image.name
+        with default_storage.open(first_name) as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+
+        self.assertIn(f"heathrow-{digest[:16]}", first_name)
+
+    def test_new_image_replaces_previous_files(self):
+        self.upload()
+        self.airport.refresh_from_db()
+        previous = [
+            self.airport.image.name,
+            *self.airport.image_variants["10"].values(),
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload(size=(30, 30))
+
+        for name in previous:
+            self.assertFalse(default_storage.exists(name), name)
+
+    def test_upload_rejects_invalid_images(self):
+        with override_settings(AIRPORT_IMAGE_MAX_PIXELS=100):
+            response = self.upload(size=(20, 20))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with NamedTemporaryFile(suffix=".jpg") as temp_file:
+            with upload_file(size=(50, 50)) as image_file:
+                temp_file.write(image_file.read()[:200])
+            temp_file.seek(0)
+            response = self.client.post(
+                airport_image_upload_url(self.airport.id),
+                {"image": temp_file},
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.upload(image_format="BMP", suffix=".bmp")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_variant_urls_in_airport_list_and_detail(self):
+        self.upload(size=(400, 200))
+
+        response = self.client.get(AIRPORT_URL)
+        thumbnail = response.data["results"][0]["thumbnail"]
+        self.assertTrue(thumbnail["webp"].endswith("-320w.webp"))
+        response = self.client.get(airport_detail_url(self.airport.id))
+        self.assertEqual(set(response.data["image_variants"]), {"320", "400"})
+
+    @override_settings(AIRPORT_IMAGE_WORKERS=2)
+    def test_variants_are_generated_in_background_after_commit(self):
+        with mock.patch(
+            "location.images.get_executor"
+        ) as get_executor, mock.patch(
+            "location.images._slots", threading.BoundedSemaphore(1)
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.upload()
+                get_executor.assert_not_called()
+
+        self.assertEqual(response.data["image_variants"], {})
+        submit = get_executor.return_value.submit
+        submit.assert_called_once()
+        self.airport.refresh_from_db()
+        self.assertEqual(submit.call_args.args[1:3], (
+            self.airport.id, self.airport.image.name
+        ))
+
+    @override_settings(AIRPORT_IMAGE_WORKERS=2)
+    def test_variants_are_generated_inline_when_jobs_are_full(self):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        with mock.patch(
+            "location.images.get_executor"
+        ) as get_executor, mock.patch("location.images._slots", slots):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.upload(size=(400, 200))
+
+        get_executor.assert_not_called()
+        self.airport.refresh_from_db()
+        self.assertEqual(set(self.airport.image_variants), {"320", "400"})
+
+    def test_media_is_served_with_long_cache_headers(self):
+        self.upload()
+        self.airport.refresh_from_db()
+
+        response = self.client.get(self.airport.image.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=31536000", response["Cache-Control"])
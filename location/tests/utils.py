@@ -1,3 +1,7 @@
+from tempfile import NamedTemporaryFile
+
+from PIL import Image
+
 from location.models import Country, City, Airport
 
 
@@ -29,3 +33,11 @@ def sample_airport(**params):
     defaults.update(params)
 
     return Airport.objects.create(**defaults)
+
+
+def upload_file(size=(10, 10), image_format="JPEG", suffix=".jpg"):
+    """Create a temporary image file to upload."""
+    temp_file = NamedTemporaryFile(suffix=suffix)
+    Image.new("RGB", size, "navy").save(temp_file, format=image_format)
+    temp_file.seek(0)
+    return temp_file
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from . import async_views
 from .views import CountryViewSet, CityViewSet, AirportViewSet
 
 router = routers.DefaultRouter()
@@ -9,7 +10,17 @@ router.register("cities", CityViewSet)
 router.register("airports", AirportViewSet)
 
 urlpatterns = [
-    path("", include(router.urls))
+    path("", include(router.urls)),
+    path(
+        "async/airports/",
+        async_views.airport_list,
+        name="airport-async-list"
+    ),
+    path(
+        "async/airports/<int:pk>/",
+        async_views.airport_detail,
+        name="airport-async-detail"
+    ),
 ]
 
 app_name = "location"
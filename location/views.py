@@ -1,8 +1,11 @@
+from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
+from airport_api.caching import ReferenceCacheMixin
+from airport_api.streaming import StreamingListMixin, STREAM_PARAMETER
 from .models import Country, City, Airport
 from .serializers import (
     CountrySerializer,
@@ -15,12 +18,12 @@ from .serializers import (
 )
 
 
-class CountryViewSet(viewsets.ModelViewSet):
+class CountryViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     queryset = Country.objects.all()
     serializer_class = CountrySerializer
 
 
-class CityViewSet(viewsets.ModelViewSet):
+class CityViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     queryset = City.objects.select_related("country")
 
     def get_serializer_class(self):
@@ -29,7 +32,10 @@ class CityViewSet(viewsets.ModelViewSet):
         return CitySerializer
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+@extend_schema_view(list=extend_schema(parameters=[STREAM_PARAMETER]))
+class AirportViewSet(
+    StreamingListMixin, ReferenceCacheMixin, viewsets.ModelViewSet
+):
     queryset = Airport.objects.select_related(
         "closest_big_city",
         "closest_big_city__country"
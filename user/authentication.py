@@ -0,0 +1,168 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+USER_CLAIMS = ("is_staff", "is_active")
+
+
+class UserCache:
+    """
+    Users by id, kept for USER_CACHE_TTL seconds in the memory of this
+    process. Saving or deleting a user drops it from the cache of the
+    process that does it; other processes see the change once their entry
+    expires. The cached users are shared between requests and must not be
+    changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = {}
+
+    def get(self, user_id):
+        """Return the user with the given id, None if there is none."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.get(user_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        user = (
+            get_user_model()
+            .objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .first()
+        )
+        if user is not None:
+            with self._lock:
+                if len(self._users) >= settings.USER_CACHE_MAX_SIZE:
+                    self._evict(now)
+                self._users[user_id] = (now + settings.USER_CACHE_TTL, user)
+        return user
+
+    def _evict(self, now):
+        """Drop the expired users, or the oldest one if none has expired."""
+        expired = [
+            user_id
+            for user_id, (expires, user) in self._users.items()
+            if expires <= now
+        ]
+        for user_id in expired or [next(iter(self._users))]:
+            del self._users[user_id]
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache()
+
+
+def get_cached_user(user_id):
+    user = user_cache.get(user_id)
+    if user is None:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+    if not user.is_active:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    return user
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    The user of an access token. Its id and is_staff come from the token,
+    so that authentication and permission checks need no query; reading
+    any other attribute loads the user from the user cache.
+    """
+
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id, is_staff):
+        super().__init__(lambda: get_cached_user(user_id))
+        self.__dict__["pk"] = self.__dict__["id"] = user_id
+        self.__dict__["is_staff"] = is_staff
+
+    def __bool__(self):
+        return True
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    A refresh token whose access tokens carry the is_staff and is_active
+    of their user at the time they are made.
+    """
+
+    user = None
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.user = user
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = self.user
+        if user is None:
+            user_id = self[api_settings.USER_ID_CLAIM]
+            user = (
+                get_user_model()
+                .objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+                .first()
+            )
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(
+                _("No active account found for the given token"),
+                code="no_active_account",
+            )
+        for claim in USER_CLAIMS:
+            access[claim] = getattr(user, claim)
+        return access
+
+
+class JWTClaimsAuthentication(JWTAuthentication):
+    """
+    JWT authentication that takes the user from the token claims on safe
+    requests, and from the user cache when the token has no claims.
+    Unsafe requests load the user from the database, so that writes are
+    checked against its current state.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if request.method not in SAFE_METHODS:
+            return self.get_user(validated_token), validated_token
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return self.get_user(validated_token), validated_token
+
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return get_cached_user(user_id), validated_token
+        if not validated_token["is_active"]:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return ClaimsUser(user_id, validated_token["is_staff"]), validated_token
@@ -0,0 +1,16 @@
+# Generated by Django 5.1 on 2026-10-18 23:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0002_throttlewindow"),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name="ThrottleWindow",
+        ),
+    ]
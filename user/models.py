@@ -48,3 +48,4 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
@@ -1,6 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext as _
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+
+from .authentication import RefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -44,3 +47,11 @@ class UserSerializer(serializers.ModelSerializer):
             representation.pop("is_staff")
 
         return representation
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
@@ -0,0 +1,119 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from flight_ops.tests.utils import sample_flight
+from user.authentication import user_cache
+from user.tests.utils import sample_user
+
+TOKEN_URL = reverse("user:token-obtain-pair")
+TOKEN_REFRESH_URL = reverse("user:token-refresh")
+USER_ACCOUNT_URL = reverse("user:manage")
+COUNTRY_URL = reverse("location:country-list")
+FLIGHT_URL = reverse("flight-ops:flight-list")
+
+
+class JWTClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.client = APIClient()
+        self.user = sample_user()
+
+    def obtain_tokens(self, email="test_user@test.com", password="test1234"):
+        response = self.client.post(
+            TOKEN_URL, {"email": email, "password": password}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def authenticate(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_access_token_carries_user_claims(self):
+        access = AccessToken(self.obtain_tokens()["access"])
+
+        self.assertIs(access["is_staff"], False)
+        self.assertIs(access["is_active"], True)
+
+    def test_safe_requests_do_no_user_query(self):
+        sample_flight()
+        self.authenticate(self.obtain_tokens()["access"])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(FLIGHT_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        table = get_user_model()._meta.db_table
+        self.assertFalse(
+            [query for query in queries if table in query["sql"]]
+        )
+
+    def test_user_is_loaded_once_from_cache(self):
+        self.authenticate(self.obtain_tokens()["access"])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(USER_ACCOUNT_URL)
+        self.assertEqual(response.data["email"], self.user.email)
+        with self.assertNumQueries(0):
+            self.client.get(USER_ACCOUNT_URL)
+
+    def test_saving_user_invalidates_cache(self):
+        self.authenticate(self.obtain_tokens()["access"])
+        self.client.get(USER_ACCOUNT_URL)
+
+        self.user.email = "renamed@test.com"
+        self.user.save()
+
+        response = self.client.get(USER_ACCOUNT_URL)
+        self.assertEqual(response.data["email"], "renamed@test.com")
+
+    def test_unsafe_requests_check_current_user(self):
+        staff = sample_user(email="staff@test.com", is_staff=True)
+        self.authenticate(
+            self.obtain_tokens(email="staff@test.com")["access"]
+        )
+        response = self.client.post(COUNTRY_URL, {"name": "Spain"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        get_user_model().objects.filter(pk=staff.pk).update(is_staff=False)
+        response = self.client.post(COUNTRY_URL, {"name": "France"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_inactive_user_cannot_write_or_refresh(self):
+        tokens = self.obtain_tokens()
+        self.user.is_active = False
+        self.user.save()
+
+        self.authenticate(tokens["access"])
+        response = self.client.patch(USER_ACCOUNT_URL, {"password": "x" * 8})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(
+            TOKEN_REFRESH_URL, {"refresh": tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_updates_claims(self):
+        tokens = self.obtain_tokens()
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.post(
+            TOKEN_REFRESH_URL, {"refresh": tokens["refresh"]}
+        )
+        self.assertIs(AccessToken(response.data["access"])["is_staff"], True)
+
+    def test_token_without_claims_uses_cached_user(self):
+        self.authenticate(RefreshToken.for_user(self.user).access_token)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(USER_ACCOUNT_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("is_staff", response.data)
+        with self.assertNumQueries(0):
+            self.client.get(USER_ACCOUNT_URL)